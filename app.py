@@ -1,5 +1,7 @@
 """Main Streamlit application entry point."""
 
+from datetime import datetime, timedelta
+
 import streamlit as st
 from apscheduler.schedulers.background import BackgroundScheduler
 
@@ -32,22 +34,40 @@ def start_background_scheduler():
         return
 
     from jobs.collect_insights import run_collection
-    from jobs.refresh_tokens import run_token_refresh
+    from jobs.collect_media import run_media_collection
+    from jobs.refresh_tokens import schedule_token_refreshes
 
     scheduler = BackgroundScheduler()
 
     # Collect insights every 6 hours
     scheduler.add_job(run_collection, "interval", hours=6, id="collect_insights")
 
-    # Refresh tokens daily
-    scheduler.add_job(run_token_refresh, "interval", days=1, id="refresh_tokens")
+    # Collect media insights for recent posts, offset from the insights run
+    # so both do not draw on the same rate-limit window
+    scheduler.add_job(
+        run_media_collection,
+        "interval",
+        hours=6,
+        id="collect_media",
+        next_run_time=datetime.now() + timedelta(hours=3),
+    )
+
+    # Plan jittered refresh-ahead jobs for tokens due in the next day
+    scheduler.add_job(
+        schedule_token_refreshes,
+        "interval",
+        days=1,
+        args=[scheduler],
+        id="plan_token_refreshes",
+        next_run_time=datetime.now(),
+    )
 
     scheduler.start()
     st.session_state.scheduler_started = True
 
 
 # Start scheduler (only in production)
-if config.SUPABASE_URL:
+if config.SUPABASE_URL or config.DATABASE_BACKEND != "supabase":
     start_background_scheduler()
 
 
@@ -58,6 +78,8 @@ st.title("📊 인스타그램 인사이트 대시보드")
 missing = config.validate()
 if missing:
     st.error(f"⚠️ 설정 누락: {', '.join(missing)}")
+elif config.ADMIN_INSTAGRAM_IDS and not config.can_read_fleet_overview():
+    st.warning("⚠️ 관리자 페이지를 쓰려면 SUPABASE_KEY에 service role 키를 설정해야 합니다.")
     st.info("필수 환경 변수를 설정해주세요.")
     st.stop()
 
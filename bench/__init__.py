@@ -0,0 +1 @@
+# Offline load-testing and benchmark tooling
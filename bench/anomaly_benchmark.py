@@ -0,0 +1,108 @@
+"""Post-collection anomaly detection time for the whole fleet.
+
+Seeds an in-memory SQLite database with ``--accounts`` x ``--days`` of
+daily reach, impressions, profile_views and follower_count, then times:
+
+- fleet: ``run_anomaly_detection`` (one fleet-wide scan, one NumPy pass,
+  one replace of the anomalies table)
+- per_user: the same detection fed by one ``get_insights_frame`` query per
+  account, the way per-account analysis would read it (skip with
+  ``--no-baseline``)
+
+Usage:
+    python -m bench.anomaly_benchmark --accounts 10000 --days 30
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from bench.memory_store import seed_backend
+from src import database
+from src.anomaly_detection import ANOMALY_SERIES, detect_anomalies, run_anomaly_detection
+from src.config import config
+from src.sql_backend import SQLiteBackend
+
+
+def _seed(backend: SQLiteBackend, accounts: int, days: int, seed: int = 0) -> int:
+    rng = np.random.default_rng(seed)
+    seed_backend(backend, accounts)
+    end = datetime.now(timezone.utc)
+    stamps = [backend._ts(end - timedelta(days=days - 1 - d)) for d in range(days)]
+    levels = {"reach": 2000, "impressions": 5000, "profile_views": 100}
+    rows = []
+    for user_id in range(1, accounts + 1):
+        series = {m: np.abs(rng.normal(v, v * 0.1, days)) for m, v in levels.items()}
+        series["follower_count"] = 5000 + np.cumsum(rng.normal(10, 5, days))
+        if user_id % 100 == 0:
+            series["reach"][-1] *= 0.05  # 1% of accounts collapse on the last day
+        for metric, values in series.items():
+            rows.extend((user_id, metric, float(v), "day", stamps[d]) for d, v in enumerate(values))
+    with backend._cursor() as cur:
+        cur.executemany(
+            "INSERT INTO insights (user_id, metric_name, metric_value, period, collected_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    return len(rows)
+
+
+def _per_user(accounts: int) -> dict:
+    started = time.perf_counter()
+    since = datetime.now(timezone.utc) - timedelta(
+        days=config.ANOMALY_WINDOW_DAYS + config.ANOMALY_EVALUATE_DAYS
+    )
+    frames = [database.get_insights_frame(uid, since) for uid in range(1, accounts + 1)]
+    insights = pd.concat(frames, ignore_index=True)
+    insights = insights[insights["metric_name"].isin(list(ANOMALY_SERIES))]
+    read_s = time.perf_counter() - started
+    rows, _ = detect_anomalies(insights)
+    return {
+        "anomalies": len(rows),
+        "read_s": round(read_s, 3),
+        "total_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet anomaly detection benchmark.")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the per-user reads")
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(":memory:")
+    database.set_backend(backend)
+    rows = _seed(backend, args.accounts, args.days)
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "accounts": args.accounts,
+        "days": args.days,
+        "insight_rows": rows,
+    }
+    print(f"seeded {rows:,} insight rows", file=sys.stderr)
+
+    results = [{**meta, "mode": "fleet", **run_anomaly_detection()}]
+    if not args.no_baseline:
+        results.append({**meta, "mode": "per_user", **_per_user(args.accounts)})
+    for r in results:
+        print(
+            f"{r['mode']:>9}: {r['anomalies']} anomalies, read {r['read_s']}s, "
+            f"total {r['total_s']}s",
+            file=sys.stderr,
+        )
+    sys.stdout.write("\n".join(json.dumps(r, default=str) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Requests/sec of the read-only HTTP API against a local SQLite backend.
+
+Seeds a SQLite file with ``--accounts`` x ``--days`` of 6-hourly insights
+(plus one audience breakdown per account), serves ``src.http_api`` from a
+separate ``python -m src.http_api`` process on a local port and drives it
+with ``--concurrency`` keep-alive clients for ``--duration`` seconds per
+scenario, over a mix of /users, latest insights, 90-day series and audience
+URLs for random accounts:
+
+- uncached: API cache disabled, every request queries the database
+- cached: responses served from the TTL cache
+- conditional: clients send If-None-Match and get 304s
+
+Usage:
+    python -m bench.api_load_test --accounts 200 --days 90 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from bench.memory_store import seed_backend
+from src import database
+from src.sql_backend import SQLiteBackend
+
+
+def _seed(backend: SQLiteBackend, accounts: int, days: int) -> int:
+    seed_backend(backend, accounts)
+    end = datetime.now(timezone.utc)
+    samples = days * 4
+    stamps = [backend._ts(end - timedelta(hours=6 * s)) for s in range(samples)]
+    metrics = ("reach", "impressions", "profile_views", "follower_count")
+    rows = [
+        (user_id, metric, float(s), stamps[s])
+        for user_id in range(1, accounts + 1)
+        for metric in metrics
+        for s in range(samples)
+    ]
+    with backend._cursor() as cur:
+        cur.executemany(
+            "INSERT INTO insights (user_id, metric_name, metric_value, period, collected_at) "
+            "VALUES (?, ?, ?, 'day', ?)",
+            rows,
+        )
+    for user_id in range(1, accounts + 1):
+        database.save_audience_data(
+            user_id, "follower_demographics_city", {f"City {i}": i * user_id for i in range(40)}
+        )
+    return len(rows)
+
+
+def _urls(accounts: int, count: int = 500) -> list[str]:
+    rng = random.Random(0)
+    start = (datetime.now(timezone.utc) - timedelta(days=90)).date().isoformat()
+    paths = [
+        lambda u: "/users",
+        lambda u: f"/users/{u}/insights/latest",
+        lambda u: f"/users/{u}/insights?start={start}&metrics=reach,impressions&max_points=200",
+        lambda u: f"/users/{u}/audience",
+        lambda u: f"/users/{u}/audience/top?limit=10",
+    ]
+    return [rng.choice(paths)(rng.randint(1, accounts)) for _ in range(count)]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(db_path: str, port: int, cache_ttl: int) -> subprocess.Popen:
+    """Start the API in its own process so client and server don't share a GIL."""
+    env = {
+        **os.environ,
+        "DATABASE_BACKEND": "sqlite",
+        "SQLITE_PATH": db_path,
+        "API_HOST": "127.0.0.1",
+        "API_PORT": str(port),
+        "API_TOKENS": "",
+        "API_CACHE_TTL_SECONDS": str(cache_ttl),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.http_api"],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("API server did not start")
+
+
+async def _drive(base_url: str, urls: list[str], concurrency: int, duration: float, conditional: bool):
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    etags: dict[str, str] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int, client: httpx.AsyncClient):
+        i = offset
+        while time.perf_counter() < deadline:
+            url = urls[i % len(urls)]
+            i += concurrency
+            headers = {"Accept-Encoding": "gzip"}
+            if conditional and url in etags:
+                headers["If-None-Match"] = etags[url]
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if "etag" in response.headers:
+                etags[url] = response.headers["etag"]
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n, client) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API load test.")
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "api.db")
+        backend = SQLiteBackend(db_path)
+        database.set_backend(backend)
+        rows = _seed(backend, args.accounts, args.days)
+        backend.close()
+        urls = _urls(args.accounts)
+        meta = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "accounts": args.accounts,
+            "insight_rows": rows,
+            "concurrency": args.concurrency,
+        }
+        print(f"seeded {rows:,} insight rows", file=sys.stderr)
+
+        results = []
+        for scenario in ("uncached", "cached", "conditional"):
+            port = _free_port()
+            server = _serve(db_path, port, 0 if scenario == "uncached" else 3600)
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                if scenario != "uncached":
+                    # Warm the cache so the run measures hits
+                    with httpx.Client(base_url=base_url) as client:
+                        for url in set(urls):
+                            client.get(url)
+                stats = asyncio.run(
+                    _drive(base_url, urls, args.concurrency, args.duration, scenario == "conditional")
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            result = {**meta, "scenario": scenario, **stats}
+            results.append(result)
+            print(
+                f"{scenario:>11}: {result['requests_per_s']} req/s, p50 {result['p50_ms']} ms, "
+                f"p99 {result['p99_ms']} ms, {result['statuses']}",
+                file=sys.stderr,
+            )
+
+    sys.stdout.write("\n".join(json.dumps(r) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
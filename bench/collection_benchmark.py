@@ -0,0 +1,266 @@
+"""End-to-end throughput benchmark for collection and token refresh.
+
+Runs ``collect_all_users`` and ``run_token_refresh`` against the local Graph
+API simulator and either an in-memory store (``--store memory``) or the
+embedded SQLite backend (``--store sqlite``), and reports per size:
+
+- accounts/minute
+- p50/p95 per-account latency (ms)
+- Graph requests per account
+- DB round trips per account
+
+Results are written as JSON lines for regression tracking.
+
+Usage:
+    python -m bench.collection_benchmark --sizes 10,100,1000 --latency-ms 20 --output bench_results.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.graph_simulator import GraphSimulator, SimulatorConfig
+from bench.memory_store import CountingBackend, MemoryStore, patched_store, seed_backend
+from src import database, insights_collector, instagram_api, oauth
+from src.sql_backend import SQLiteBackend
+from src.rate_limiter import RateLimiter
+from jobs import refresh_tokens
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+class _AccountTimer:
+    """Records wall time between a per-account start hook and end hook."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._starts: dict = {}
+        self.latencies_ms: list[float] = []
+
+    def start(self, key):
+        with self._lock:
+            self._starts[key] = time.perf_counter()
+
+    def end(self, key):
+        now = time.perf_counter()
+        with self._lock:
+            started = self._starts.pop(key, None)
+            if started is not None:
+                self.latencies_ms.append((now - started) * 1000)
+
+
+@contextlib.contextmanager
+def _patched(module, name, value):
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+def _summarize(scenario: str, accounts: int, elapsed: float, timer: _AccountTimer, graph_requests: int, round_trips: int, extra: dict) -> dict:
+    return {
+        "scenario": scenario,
+        "accounts": accounts,
+        "elapsed_s": round(elapsed, 4),
+        "accounts_per_minute": round(accounts / elapsed * 60, 2) if elapsed else None,
+        "latency_p50_ms": round(_percentile(timer.latencies_ms, 50), 3),
+        "latency_p95_ms": round(_percentile(timer.latencies_ms, 95), 3),
+        "graph_requests_per_account": round(graph_requests / accounts, 3),
+        "db_round_trips_per_account": round(round_trips / accounts, 3),
+        **extra,
+    }
+
+
+@contextlib.contextmanager
+def _seeded_store(kind: str, accounts: int, *modules, tier: str = "standard"):
+    """Yield a freshly seeded store of ``kind`` exposing ``round_trips``."""
+    if kind == "memory":
+        store = MemoryStore()
+        store.seed_accounts(accounts, tier=tier)
+        with patched_store(store, *modules):
+            yield store
+        return
+
+    backend = CountingBackend(SQLiteBackend(":memory:"))
+    seed_backend(backend, accounts, tier=tier)
+    backend.round_trips = 0
+    database.set_backend(backend)
+    try:
+        yield backend
+    finally:
+        database.set_backend(None)
+        backend.close()
+
+
+def bench_collection(
+    simulator: GraphSimulator, accounts: int, store_kind: str = "memory", tier: str = "standard"
+) -> dict:
+    """Benchmark ``collect_all_users`` over ``accounts`` synthetic users of ``tier``."""
+    timer = _AccountTimer()
+
+    collect_insights = insights_collector.collect_insights_for_user
+    collect_audience = insights_collector.collect_audience_for_user
+
+    def timed_insights(user_id, *args, **kwargs):
+        timer.start(user_id)
+        return collect_insights(user_id, *args, **kwargs)
+
+    def timed_audience(user_id, *args, **kwargs):
+        try:
+            return collect_audience(user_id, *args, **kwargs)
+        finally:
+            timer.end(user_id)
+
+    simulator.stats.reset()
+    with _seeded_store(store_kind, accounts, insights_collector, tier=tier) as store, \
+            _patched(insights_collector, "collect_insights_for_user", timed_insights), \
+            _patched(insights_collector, "collect_audience_for_user", timed_audience):
+        started = time.perf_counter()
+        results = insights_collector.collect_all_users()
+        elapsed = time.perf_counter() - started
+
+    return _summarize(
+        "collect_all_users",
+        accounts,
+        elapsed,
+        timer,
+        simulator.stats.total_requests,
+        store.round_trips,
+        {
+            "insights_failed": results["insights_failed"],
+            "audience_failed": results["audience_failed"],
+            "graph_retries": results["retries"],
+            "graph_errors": simulator.stats.snapshot()["errors_by_code"],
+        },
+    )
+
+
+def bench_token_refresh(
+    simulator: GraphSimulator, accounts: int, store_kind: str = "memory", tier: str = "standard"
+) -> dict:
+    """Benchmark ``run_token_refresh`` with every user token due."""
+    timer = _AccountTimer()
+    refresh_one = refresh_tokens.refresh_user_token
+
+    def timed_refresh(user, token):
+        timer.start(user.id)
+        try:
+            return refresh_one(user, token)
+        finally:
+            timer.end(user.id)
+
+    simulator.stats.reset()
+    with _seeded_store(store_kind, accounts, refresh_tokens, tier=tier) as store, \
+            _patched(refresh_tokens, "refresh_user_token", timed_refresh), \
+            contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        results = refresh_tokens.run_token_refresh(days_before_expiry=7)
+        elapsed = time.perf_counter() - started
+
+    return _summarize(
+        "run_token_refresh",
+        accounts,
+        elapsed,
+        timer,
+        simulator.stats.total_requests,
+        store.round_trips,
+        {"refresh_failed": results["failed"]},
+    )
+
+
+def run_benchmarks(
+    sizes: list[int],
+    latency_ms: float = 0.0,
+    error_rate: float = 0.0,
+    store_kind: str = "memory",
+    tier: str = "standard",
+) -> list[dict]:
+    """Run every scenario at every size against a fresh simulator."""
+    sim_config = SimulatorConfig(
+        num_accounts=max(sizes),
+        latency_ms=latency_ms,
+        error_rate=error_rate,
+    )
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "latency_ms": latency_ms,
+        "error_rate": error_rate,
+        "store": store_kind,
+        "tier": tier,
+    }
+
+    results = []
+    with GraphSimulator(sim_config) as simulator, \
+            _patched(instagram_api, "rate_limiter", RateLimiter(10**9, 3600)), \
+            _patched(instagram_api.config, "GRAPH_API_BASE_URL", simulator.base_url), \
+            _patched(oauth.config, "GRAPH_API_BASE_URL", simulator.base_url):
+        for size in sizes:
+            for bench in (bench_collection, bench_token_refresh):
+                result = {**meta, **bench(simulator, size, store_kind, tier)}
+                results.append(result)
+                print(
+                    f"{result['scenario']:>18} n={size:<6} "
+                    f"{result['accounts_per_minute']:>10} acct/min  "
+                    f"p50={result['latency_p50_ms']}ms p95={result['latency_p95_ms']}ms  "
+                    f"graph/acct={result['graph_requests_per_account']} "
+                    f"db/acct={result['db_round_trips_per_account']}",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collection throughput benchmark.")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated account counts, e.g. 10,100,1000,10000")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated Graph API latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of Graph requests that fail")
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory", help="Storage the jobs write to")
+    parser.add_argument("--tier", default="standard", help="Collection tier of the seeded accounts (Config.COLLECTION_TIERS)")
+    parser.add_argument("--output", help="Append JSON lines here instead of printing to stdout")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run_benchmarks(sizes, args.latency_ms, args.error_rate, args.store, args.tier)
+
+    lines = "\n".join(json.dumps(r, ensure_ascii=False) for r in results) + "\n"
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(lines)
+    else:
+        sys.stdout.write(lines)
+
+
+if __name__ == "__main__":
+    main()
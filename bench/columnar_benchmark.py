@@ -0,0 +1,166 @@
+"""Model path vs columnar path for bulk reads.
+
+Builds rows shaped like PostgREST responses (ISO timestamp strings) and
+times turning them into a DataFrame two ways:
+
+- model: one pydantic model per row, then flattened back into dicts for
+  ``pd.DataFrame`` (what the Dashboard used to do)
+- columnar: ``rows_to_columns`` + ``to_format`` with vectorized timestamp parsing
+
+Usage:
+    python -m bench.columnar_benchmark --rows 100000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from src.columnar import rows_to_columns, to_format
+from src.database import (
+    INSIGHT_COLUMNS,
+    _insight_from_row,
+    _user_from_row,
+)
+
+PAGE_SIZE = 1000
+USER_COLUMNS = [
+    "id",
+    "instagram_id",
+    "instagram_username",
+    "facebook_page_id",
+    "tier",
+    "created_at",
+    "updated_at",
+]
+
+
+def _insight_rows(n: int) -> list[dict]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    metrics = ["impressions", "reach", "profile_views", "follower_count"]
+    return [
+        {
+            "id": i,
+            "user_id": i % 500,
+            "metric_name": metrics[i % len(metrics)],
+            "metric_value": float(i % 10_000),
+            "period": "day",
+            "collected_at": (start + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def _user_rows(n: int) -> list[dict]:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc).isoformat()
+    return [
+        {
+            "id": i,
+            "instagram_id": f"ig-{i}",
+            "instagram_username": f"user_{i}",
+            "facebook_page_id": f"page-{i}",
+            "created_at": created,
+            "updated_at": created,
+        }
+        for i in range(n)
+    ]
+
+
+def _pages(rows: list[dict]) -> list[list[dict]]:
+    return [rows[i:i + PAGE_SIZE] for i in range(0, len(rows), PAGE_SIZE)]
+
+
+def _time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_insights(rows: list[dict], repeat: int) -> dict:
+    pages = _pages(rows)
+
+    def model_path():
+        insights = [_insight_from_row(r) for r in rows]
+        return pd.DataFrame(
+            [
+                {"date": i.collected_at, "metric": i.metric_name, "value": i.metric_value}
+                for i in insights
+            ]
+        )
+
+    def columnar_path():
+        columns = rows_to_columns(
+            pages,
+            INSIGHT_COLUMNS,
+            datetime_columns=("collected_at",),
+            float_columns=("metric_value",),
+            int_columns=("id", "user_id"),
+        )
+        return to_format(columns, "pandas", datetime_columns=("collected_at",))
+
+    return {"model_s": _time(model_path, repeat), "columnar_s": _time(columnar_path, repeat)}
+
+
+def bench_users(rows: list[dict], repeat: int) -> dict:
+    def model_path():
+        users = [_user_from_row(r) for r in rows]
+        return pd.DataFrame([u.model_dump() for u in users])
+
+    def columnar_path():
+        columns = rows_to_columns(
+            [rows],
+            USER_COLUMNS,
+            datetime_columns=("created_at", "updated_at"),
+            int_columns=("id",),
+        )
+        return to_format(columns, "pandas", datetime_columns=("created_at", "updated_at"))
+
+    return {"model_s": _time(model_path, repeat), "columnar_s": _time(columnar_path, repeat)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model vs columnar bulk read benchmark.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing")
+    args = parser.parse_args()
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "rows": args.rows,
+    }
+    results = []
+    for name, bench, rows in (
+        ("insights", bench_insights, _insight_rows(args.rows)),
+        ("users", bench_users, _user_rows(args.rows)),
+    ):
+        timing = bench(rows, args.repeat)
+        result = {
+            **meta,
+            "read": name,
+            "model_s": round(timing["model_s"], 4),
+            "columnar_s": round(timing["columnar_s"], 4),
+            "speedup": round(timing["model_s"] / timing["columnar_s"], 2),
+        }
+        results.append(result)
+        print(
+            f"{name:>9} rows={args.rows}: model {result['model_s']}s, "
+            f"columnar {result['columnar_s']}s ({result['speedup']}x)",
+            file=sys.stderr,
+        )
+
+    sys.stdout.write("\n".join(json.dumps(r) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
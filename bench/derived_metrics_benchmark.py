@@ -0,0 +1,149 @@
+"""Derived-metrics throughput over a synthetic fleet history.
+
+Generates ``--accounts`` x ``--days`` of daily follower_count, reach and
+total_interactions (``--samples-per-day`` collections each, as the 6-hourly
+schedule stores) and times, best of N:
+
+- vectorized: ``compute_derived_metrics`` (NumPy arrays over accounts x days)
+- pandas: the same metrics with pivot + ``groupby().rolling()/diff()``, the
+  spreadsheet-style implementation it replaces (skip with ``--no-baseline``)
+
+Usage:
+    python -m bench.derived_metrics_benchmark --accounts 10000 --days 365
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from src.derived_metrics import WEEK_DAYS, compute_derived_metrics
+
+
+def _history(accounts: int, days: int, samples_per_day: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2025-01-01T00:00", "ns")
+    offsets = (
+        np.arange(days)[:, None] * 86_400 + np.arange(samples_per_day)[None, :] * 21_600
+    ).ravel() * 1_000_000_000
+    times = start + offsets.astype("timedelta64[ns]")
+    n = days * samples_per_day
+
+    frames = []
+    for metric, base, noise in (
+        ("follower_count", 5000, 30),
+        ("reach", 2000, 400),
+        ("total_interactions", 150, 40),
+    ):
+        if metric == "follower_count":
+            values = base + np.cumsum(rng.normal(5, noise, (accounts, n)), axis=1)
+        else:
+            values = np.abs(rng.normal(base, noise, (accounts, n)))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "user_id": np.repeat(np.arange(1, accounts + 1), n),
+                    "metric_name": pd.Categorical([metric] * (accounts * n)),
+                    "metric_value": values.ravel(),
+                    "period": pd.Categorical(["day"] * (accounts * n)),
+                    "collected_at": pd.DatetimeIndex(np.tile(times, accounts), tz="UTC"),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def pandas_derived_metrics(insights: pd.DataFrame, window: int = WEEK_DAYS) -> pd.DataFrame:
+    """Reference implementation with pandas groupby operations."""
+    df = insights[insights["period"] == "day"].assign(
+        date=insights["collected_at"].dt.floor("D")
+    )
+    daily = (
+        df.sort_values("collected_at")
+        .groupby(["user_id", "date", "metric_name"], observed=True)["metric_value"]
+        .last()
+        .unstack("metric_name")
+    )
+    # Complete calendar per account so windows count days, not rows
+    daily = daily.groupby(level="user_id", group_keys=False).apply(
+        lambda g: g.droplevel("user_id")
+        .asfreq("D")
+        .assign(user_id=g.index[0][0])
+        .set_index("user_id", append=True)
+        .swaplevel()
+    )
+    daily["engagement_rate"] = daily["total_interactions"] / daily["reach"].where(daily["reach"] > 0)
+    by_user = daily.groupby(level="user_id")
+    result = pd.DataFrame(index=daily.index)
+    result["follower_growth"] = by_user["follower_count"].diff()
+    result["engagement_rate"] = daily["engagement_rate"]
+    for metric in ("follower_count", "reach", "total_interactions", "engagement_rate"):
+        result[f"{metric}_ma{window}"] = (
+            by_user[metric].rolling(window, min_periods=1).mean().droplevel(0)
+        )
+    for metric in ("follower_count", "reach", "total_interactions", "engagement_rate"):
+        result[f"{metric}_wow"] = by_user[metric].diff(WEEK_DAYS)
+    return result.reset_index()
+
+
+def _best(func, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derived metrics benchmark.")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--samples-per-day", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the pandas baseline")
+    args = parser.parse_args()
+
+    insights = _history(args.accounts, args.days, args.samples_per_day)
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "accounts": args.accounts,
+        "days": args.days,
+        "insight_rows": len(insights),
+    }
+    print(f"{len(insights):,} insight rows", file=sys.stderr)
+
+    results = []
+    implementations = {"vectorized": compute_derived_metrics}
+    if not args.no_baseline:
+        implementations["pandas"] = pandas_derived_metrics
+    for name, func in implementations.items():
+        seconds, derived = _best(lambda: func(insights), args.repeat)
+        result = {
+            **meta,
+            "implementation": name,
+            "derived_rows": len(derived),
+            "seconds": round(seconds, 3),
+            "accounts_per_s": round(args.accounts / seconds),
+        }
+        results.append(result)
+        print(
+            f"{name:>10}: {result['seconds']}s, {result['derived_rows']:,} rows, "
+            f"{result['accounts_per_s']:,} accounts/s",
+            file=sys.stderr,
+        )
+
+    sys.stdout.write("\n".join(json.dumps(r) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Trend chart payload and build time with and without downsampling.
+
+Builds the Dashboard's trend chart (``px.line`` over metric series) from
+synthetic history and reports, per series length and method:
+
+- payload_bytes: size of the figure JSON Streamlit sends to the browser
+- build_s: downsampling + ``px.line`` + JSON serialization, best of N
+- points: points plotted across all series
+
+Browser render time scales with the points plotted, so ``points`` is the
+proxy for it here.
+
+Usage:
+    python -m bench.downsampling_benchmark --points 1000,10000,100000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from src.downsampling import downsample_frame
+
+METRICS = ["impressions", "reach", "profile_views"]
+
+
+def _history(points: int, seed: int = 0) -> pd.DataFrame:
+    """``points`` observations per metric: a daily cycle, a trend, noise and spikes."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=points, freq="15min", tz="UTC")
+    frames = []
+    for i, metric in enumerate(METRICS):
+        t = np.arange(points)
+        values = 1000 * (i + 1) + 300 * np.sin(t / 96 * 2 * np.pi) + t * 0.05
+        values += rng.normal(0, 40, points)
+        spikes = rng.choice(points, size=max(1, points // 5000), replace=False)
+        values[spikes] *= 4
+        frames.append(pd.DataFrame({"date": dates, "metric": metric, "value": values}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _build(df: pd.DataFrame, method: str, max_points: int) -> tuple[str, int]:
+    if method != "none":
+        df = downsample_frame(df, "date", "value", "metric", max_points, method)
+    fig = px.line(df, x="date", y="value", color="metric")
+    fig.update_layout(hovermode="x unified")
+    return fig.to_json(), len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trend chart downsampling benchmark.")
+    parser.add_argument("--points", default="1000,10000,100000", help="Points per series")
+    parser.add_argument("--max-points", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing")
+    args = parser.parse_args()
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "series": len(METRICS),
+        "max_points": args.max_points,
+    }
+    results = []
+    for points in [int(p) for p in args.points.split(",") if p]:
+        df = _history(points)
+        for method in ("none", "lttb", "minmax"):
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                payload, plotted = _build(df, method, args.max_points)
+                best = min(best, time.perf_counter() - started)
+            result = {
+                **meta,
+                "points_per_series": points,
+                "method": method,
+                "points": plotted,
+                "payload_bytes": len(payload.encode("utf-8")),
+                "build_s": round(best, 4),
+            }
+            results.append(result)
+            print(
+                f"{points:>8}/series {method:>6}: {plotted:>7} points, "
+                f"{result['payload_bytes'] / 1024:>9.1f} KiB, {result['build_s']}s",
+                file=sys.stderr,
+            )
+
+    sys.stdout.write("\n".join(json.dumps(r) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
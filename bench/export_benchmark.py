@@ -0,0 +1,112 @@
+"""History export time and peak memory for one account.
+
+Seeds an in-memory SQLite database with ``--rows`` insight rows for a single
+account and exports them to a temporary file, reporting wall time and, in a
+second traced run, the peak Python allocation (``tracemalloc``) for:
+
+- csv / parquet: ``export_history`` (keyset pages written as they arrive)
+- naive: ``get_insights`` into a DataFrame, then ``to_csv``, the load-it-all
+  export it replaces (skip with ``--no-baseline``)
+
+Usage:
+    python -m bench.export_benchmark --rows 500000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from bench.memory_store import seed_backend
+from src import database
+from src.export import export_history
+from src.sql_backend import SQLiteBackend
+
+
+def _seed(backend: SQLiteBackend, rows: int):
+    seed_backend(backend, 1)
+    end = datetime.now(timezone.utc)
+    metrics = ("reach", "impressions", "profile_views", "follower_count")
+    with backend._cursor() as cur:
+        cur.executemany(
+            "INSERT INTO insights (user_id, metric_name, metric_value, period, collected_at) "
+            "VALUES (1, ?, ?, 'day', ?)",
+            (
+                (metrics[i % 4], float(i), backend._ts(end - timedelta(hours=6 * (i // 4))))
+                for i in range(rows)
+            ),
+        )
+
+
+def _naive(out):
+    insights = database.get_insights(1)
+    pd.DataFrame([i.model_dump() for i in insights]).to_csv(out, index=False)
+    return len(insights)
+
+
+def _measure(func) -> dict:
+    with tempfile.TemporaryFile() as out:
+        started = time.perf_counter()
+        rows = func(out)
+        seconds = time.perf_counter() - started
+        size = out.tell()
+    # Tracing slows allocation-heavy code down, so peak memory gets its own run
+    with tempfile.TemporaryFile() as out:
+        tracemalloc.start()
+        func(out)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "peak_mb": round(peak / 2**20, 1),
+        "file_mb": round(size / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History export benchmark.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the naive export")
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(":memory:")
+    database.set_backend(backend)
+    _seed(backend, args.rows)
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "insight_rows": args.rows,
+    }
+    print(f"seeded {args.rows:,} insight rows", file=sys.stderr)
+
+    modes = {
+        "csv": lambda out: export_history(1, "insights", "csv", out),
+        "parquet": lambda out: export_history(1, "insights", "parquet", out),
+    }
+    if not args.no_baseline:
+        modes["naive"] = _naive
+
+    results = []
+    for mode, func in modes.items():
+        result = {**meta, "mode": mode, **_measure(func)}
+        results.append(result)
+        print(
+            f"{mode:>8}: {result['seconds']}s, peak {result['peak_mb']} MB, "
+            f"file {result['file_mb']} MB",
+            file=sys.stderr,
+        )
+    sys.stdout.write("\n".join(json.dumps(r) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+"""Local stand-in for the Facebook Graph API used in load tests.
+
+Serves the subset of endpoints that ``src/oauth.py`` and
+``src/instagram_api.py`` call, backed by deterministic synthetic accounts:
+synthetic account ``i`` has user token ``user-token-{i}``, Facebook Page
+``page-{i}`` (page token ``page-token-{i}``), Business ``biz-{i}``, an
+Instagram Business account ``ig-{i}`` and media ``media-{i}-{j}``, newest
+first. Graph batch requests (``POST /`` with ``batch=[...]``) are supported;
+every sub-request counts against the call budget like a separate call.
+
+Point the app at it with ``GRAPH_API_BASE_URL=http://127.0.0.1:<port>/v22.0``.
+
+Usage:
+    python -m bench.graph_simulator --accounts 5000 --latency-ms 80 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+GRAPH_ERRORS = {
+    1: ("OAuthException", "An unknown error has occurred."),
+    2: ("OAuthException", "An unexpected error has occurred. Please retry your request later."),
+    4: ("OAuthException", "(#4) Application request limit reached"),
+    17: ("OAuthException", "(#17) User request limit reached"),
+    32: ("OAuthException", "(#32) Page request limit reached"),
+    100: ("OAuthException", "(#100) Invalid parameter"),
+    190: ("OAuthException", "Error validating access token: The session is invalid."),
+    613: ("OAuthException", "(#613) Calls to this api have exceeded the rate limit."),
+}
+
+THROTTLING_CODES = (4, 17, 32, 613)
+
+INSIGHT_METRICS = {
+    "impressions",
+    "reach",
+    "profile_views",
+    "accounts_engaged",
+    "total_interactions",
+    "likes",
+    "comments",
+    "shares",
+    "saves",
+    "replies",
+    "follows_and_unfollows",
+    "follower_count",
+}
+
+AUDIENCE_METRICS = {
+    "engaged_audience_demographics",
+    "reached_audience_demographics",
+    "follower_demographics",
+}
+
+MEDIA_METRICS = {"reach", "saved", "shares", "likes", "comments", "total_interactions", "views"}
+
+MAX_BATCH_SIZE = 50
+
+_MEDIA_TYPES = [("IMAGE", "FEED"), ("VIDEO", "REELS"), ("CAROUSEL_ALBUM", "FEED")]
+
+_CITIES = ["Seoul, Korea", "Busan, Korea", "Incheon, Korea", "Tokyo, Japan", "Los Angeles, California"]
+_COUNTRIES = ["KR", "JP", "US", "TW", "VN", "TH"]
+_AGES = ["13-17", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+
+
+@dataclass
+class SimulatorConfig:
+    """Behaviour knobs for the simulated Graph API."""
+
+    num_accounts: int = 1000
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # Fraction of requests answered with a random code from ``error_codes``
+    error_rate: float = 0.0
+    error_codes: tuple[int, ...] = THROTTLING_CODES
+    # Per-token call budget per window; exceeding it returns code 613
+    calls_per_window: Optional[int] = None
+    window_seconds: int = 3600
+    # Every Nth account is only reachable through Business Manager
+    bm_only_every: int = 0
+    # Metrics answered with code 100 "not compatible"
+    incompatible_metrics: set[str] = field(default_factory=set)
+    # Account indexes whose IG object is gone (code 100, subcode 33)
+    deleted_accounts: set[int] = field(default_factory=set)
+    # Account indexes too small for demographics (code 10 "not enough followers")
+    small_audience_accounts: set[int] = field(default_factory=set)
+    # Account indexes whose insights permission was revoked (code 10)
+    revoked_insights_accounts: set[int] = field(default_factory=set)
+    # Media per account, one post every ``media_interval_hours`` back from start-up
+    media_per_account: int = 30
+    media_interval_hours: float = 24
+    seed: int = 0
+
+
+class SimulatorStats:
+    """Thread-safe request counters, keyed by endpoint kind."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_endpoint: dict[str, int] = defaultdict(int)
+        self.errors_by_code: dict[int, int] = defaultdict(int)
+
+    def record(self, endpoint: str, error_code: Optional[int] = None):
+        with self._lock:
+            self.by_endpoint[endpoint] += 1
+            if error_code is not None:
+                self.errors_by_code[error_code] += 1
+
+    @property
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.by_endpoint.values())
+
+    def reset(self):
+        with self._lock:
+            self.by_endpoint.clear()
+            self.errors_by_code.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "total_requests": sum(self.by_endpoint.values()),
+                "by_endpoint": dict(self.by_endpoint),
+                "errors_by_code": dict(self.errors_by_code),
+            }
+
+
+class _GraphError(Exception):
+    def __init__(
+        self,
+        code: int,
+        message: Optional[str] = None,
+        headers: Optional[dict] = None,
+        subcode: Optional[int] = None,
+    ):
+        error_type, default_message = GRAPH_ERRORS.get(code, ("OAuthException", "Error"))
+        super().__init__(message or default_message)
+        self.code = code
+        self.subcode = subcode
+        self.error_type = error_type
+        self.headers = headers or {}
+
+
+class GraphSimulator:
+    """Threaded HTTP server emulating the Graph API endpoints used by the app."""
+
+    def __init__(self, sim_config: Optional[SimulatorConfig] = None, host: str = "127.0.0.1", port: int = 0, version: str = "v22.0"):
+        self.config = sim_config or SimulatorConfig()
+        self.version = version
+        self.stats = SimulatorStats()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._usage: dict[str, deque] = defaultdict(deque)
+        self._usage_lock = threading.Lock()
+        # Media timestamps are anchored here so paging sees a stable timeline
+        self._epoch = time.time()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{self.version}"
+
+    def start(self) -> "GraphSimulator":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "GraphSimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Synthetic account helpers
+    # ------------------------------------------------------------------
+    def _index(self, value: str, prefix: str) -> Optional[int]:
+        if not value.startswith(prefix):
+            return None
+        try:
+            index = int(value[len(prefix):])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.config.num_accounts else None
+
+    def _is_bm_only(self, index: int) -> bool:
+        every = self.config.bm_only_every
+        return bool(every) and index % every == 0
+
+    def _page(self, index: int) -> dict:
+        return {
+            "id": f"page-{index}",
+            "name": f"Synthetic Page {index}",
+            "access_token": f"page-token-{index}",
+            "instagram_business_account": {"id": f"ig-{index}"},
+        }
+
+    def _media(self, index: int) -> list[dict]:
+        media = []
+        for j in range(self.config.media_per_account):
+            media_type, product_type = _MEDIA_TYPES[j % len(_MEDIA_TYPES)]
+            posted = self._epoch - 3600 - j * self.config.media_interval_hours * 3600
+            media.append(
+                {
+                    "id": f"media-{index}-{j}",
+                    "media_type": media_type,
+                    "media_product_type": product_type,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S+0000", time.gmtime(posted)),
+                }
+            )
+        return media
+
+    def _media_index(self, media_id: str) -> Optional[tuple[int, int]]:
+        parts = media_id.split("-")
+        if len(parts) != 3 or parts[0] != "media":
+            return None
+        index = self._index(f"ig-{parts[1]}", "ig-")
+        try:
+            j = int(parts[2])
+        except ValueError:
+            return None
+        if index is None or not 0 <= j < self.config.media_per_account:
+            return None
+        return index, j
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _value_rng(self, *parts) -> random.Random:
+        # String seeds are hashed stably (unlike hash(), which is salted per process)
+        key = ":".join(str(p) for p in (self.config.seed, int(time.time() // 60), *parts))
+        return random.Random(key)
+
+    # ------------------------------------------------------------------
+    # Rate limiting and fault injection
+    # ------------------------------------------------------------------
+    def _usage_headers(self, token: str, object_id: str) -> dict:
+        budget = self.config.calls_per_window
+        now = time.time()
+        with self._usage_lock:
+            calls = self._usage[token]
+            while calls and calls[0] < now - self.config.window_seconds:
+                calls.popleft()
+            calls.append(now)
+            count = len(calls)
+            oldest = calls[0]
+
+        pct = min(100, int(count * 100 / budget)) if budget else 0
+        regain_minutes = 0
+        if budget and count > budget:
+            regain_minutes = max(1, int((oldest + self.config.window_seconds - now) / 60))
+
+        usage = {"call_count": pct, "total_cputime": pct // 2, "total_time": pct // 2}
+        headers = {
+            "X-App-Usage": json.dumps(usage),
+            "X-Business-Use-Case-Usage": json.dumps(
+                {
+                    object_id: [
+                        {
+                            "type": "instagram",
+                            **usage,
+                            "estimated_time_to_regain_access": regain_minutes,
+                        }
+                    ]
+                }
+            ),
+        }
+        if budget and count > budget:
+            headers["Retry-After"] = str(regain_minutes * 60)
+            raise _GraphError(613, headers=headers)
+        return headers
+
+    def _maybe_inject_error(self):
+        if self.config.error_rate and self._random() < self.config.error_rate:
+            with self._rng_lock:
+                code = self._rng.choice(self.config.error_codes)
+            raise _GraphError(code)
+
+    # ------------------------------------------------------------------
+    # Endpoint implementations
+    # ------------------------------------------------------------------
+    def handle(self, path: str, params: dict[str, str]) -> tuple[str, dict, dict]:
+        """
+        Route a request.
+
+        Returns:
+            (endpoint kind, JSON body, extra headers)
+        """
+        parts = [p for p in path.split("/") if p]
+        if parts and parts[0].startswith("v") and parts[0][1:2].isdigit():
+            parts = parts[1:]
+        if not parts:
+            raise _GraphError(100, "Unknown path")
+
+        token = params.get("access_token", "")
+
+        if parts == ["oauth", "access_token"]:
+            return "oauth_access_token", self._oauth_access_token(params), {}
+
+        if parts[0] == "me":
+            user_index = self._index(token, "user-token-")
+            if user_index is None:
+                raise _GraphError(190)
+            headers = self._usage_headers(token, f"user-{user_index}")
+            self._maybe_inject_error()
+            if parts[1:] == ["accounts"]:
+                pages = [] if self._is_bm_only(user_index) else [self._page(user_index)]
+                return "me_accounts", self._paged(pages, params, path), headers
+            if parts[1:] == ["businesses"]:
+                businesses = [{"id": f"biz-{user_index}", "name": f"Synthetic Business {user_index}"}]
+                return "me_businesses", self._paged(businesses, params, path), headers
+            raise _GraphError(100, f"Unknown edge /me/{'/'.join(parts[1:])}")
+
+        object_id = parts[0]
+        edge = parts[1] if len(parts) > 1 else None
+
+        if object_id.startswith("biz-") and edge in ("owned_pages", "client_pages"):
+            biz_index = self._index(object_id, "biz-")
+            if biz_index is None or self._index(token, "user-token-") != biz_index:
+                raise _GraphError(190)
+            headers = self._usage_headers(token, object_id)
+            self._maybe_inject_error()
+            pages = [self._page(biz_index)] if edge == "owned_pages" else []
+            return edge, self._paged(pages, params, path), headers
+
+        if object_id.startswith("page-") and edge is None:
+            page_index = self._index(object_id, "page-")
+            if page_index is None or token not in (f"user-token-{page_index}", f"page-token-{page_index}"):
+                raise _GraphError(190)
+            headers = self._usage_headers(token, object_id)
+            self._maybe_inject_error()
+            return "page_fields", self._page_fields(page_index, params.get("fields", "")), headers
+
+        if object_id.startswith("ig-"):
+            ig_index = self._index(object_id, "ig-")
+            if ig_index is None or token != f"page-token-{ig_index}":
+                raise _GraphError(190)
+            headers = self._usage_headers(token, object_id)
+            self._maybe_inject_error()
+            if ig_index in self.config.deleted_accounts:
+                raise _GraphError(
+                    100,
+                    f"Unsupported get request. Object with ID '{object_id}' does not exist, "
+                    "cannot be loaded due to missing permissions, or does not support this operation.",
+                    subcode=33,
+                )
+            if edge is None:
+                return "account_fields", self._account_fields(ig_index, params.get("fields", "")), headers
+            if edge == "insights":
+                return "insights", self._insights(ig_index, params), headers
+            if edge == "media":
+                return "media", self._paged(self._media(ig_index), params, path), headers
+            raise _GraphError(100, f"Unknown edge {edge}")
+
+        if object_id.startswith("media-") and edge == "insights":
+            media_index = self._media_index(object_id)
+            if media_index is None or token != f"page-token-{media_index[0]}":
+                raise _GraphError(190)
+            headers = self._usage_headers(token, f"ig-{media_index[0]}")
+            self._maybe_inject_error()
+            return "media_insights", self._media_insights(object_id, params), headers
+
+        raise _GraphError(100, f"Unsupported path /{'/'.join(parts)}")
+
+    def _oauth_access_token(self, params: dict) -> dict:
+        if params.get("grant_type") == "fb_exchange_token":
+            token = params.get("fb_exchange_token", "")
+            if self._index(token, "user-token-") is None:
+                raise _GraphError(190)
+            return {"access_token": token, "token_type": "bearer", "expires_in": 5184000}
+
+        index = self._index(params.get("code", ""), "code-")
+        if index is None:
+            raise _GraphError(100, "Invalid verification code format.")
+        return {"access_token": f"user-token-{index}", "token_type": "bearer", "expires_in": 3600}
+
+    def _paged(self, items: list[dict], params: dict, path: str) -> dict:
+        limit = int(params.get("limit", 25) or 25)
+        start = int(params.get("after", 0) or 0)
+        page = items[start:start + limit]
+        body: dict = {"data": page}
+        if items:
+            body["paging"] = {"cursors": {"before": str(start), "after": str(start + len(page))}}
+            if start + limit < len(items):
+                next_params = {**params, "after": str(start + limit), "limit": str(limit)}
+                host, port = self._server.server_address[:2]
+                body["paging"]["next"] = f"http://{host}:{port}{path}?{urlencode(next_params)}"
+        return body
+
+    def _page_fields(self, index: int, fields: str) -> dict:
+        body: dict = {"id": f"page-{index}"}
+        if "access_token" in fields:
+            body["access_token"] = f"page-token-{index}"
+        if "instagram_business_account" in fields:
+            account = self._account_fields(index, "id,username,name,profile_picture_url,followers_count,media_count")
+            body["instagram_business_account"] = account
+        return body
+
+    def _account_fields(self, index: int, fields: str) -> dict:
+        rng = random.Random(f"{self.config.seed}:account:{index}")
+        available = {
+            "id": f"ig-{index}",
+            "username": f"synthetic_{index}",
+            "name": f"Synthetic Account {index}",
+            "profile_picture_url": f"https://example.invalid/ig-{index}.jpg",
+            "followers_count": rng.randint(100, 500_000),
+            "follows_count": rng.randint(10, 2_000),
+            "media_count": rng.randint(1, 3_000),
+            "biography": "Synthetic account served by the local Graph API simulator.",
+        }
+        requested = [f for f in fields.split(",") if f] or ["id"]
+        return {f: available[f] for f in requested if f in available}
+
+    def _insights(self, index: int, params: dict) -> dict:
+        metrics = [m for m in params.get("metric", "").split(",") if m]
+        period = params.get("period", "day")
+        if not metrics:
+            raise _GraphError(100, "(#100) The value must be a valid insights metric")
+        if index in self.config.revoked_insights_accounts:
+            raise _GraphError(10, "(#10) Application does not have permission for this action")
+        if index in self.config.small_audience_accounts and set(metrics) & AUDIENCE_METRICS:
+            raise _GraphError(
+                10, "(#10) Not enough followers: demographics need at least 100 followers"
+            )
+
+        incompatible = [m for m in metrics if m in self.config.incompatible_metrics]
+        unknown = [m for m in metrics if m not in INSIGHT_METRICS | AUDIENCE_METRICS]
+        if incompatible or unknown:
+            raise _GraphError(
+                100,
+                f"(#100) The following metrics are not compatible with period {period}: "
+                + ", ".join(incompatible + unknown),
+            )
+
+        data = []
+        for metric in metrics:
+            rng = self._value_rng(index, metric, period)
+            item = {
+                "name": metric,
+                "period": period,
+                "title": metric.replace("_", " ").title(),
+                "id": f"ig-{index}/insights/{metric}/{period}",
+            }
+            if metric in AUDIENCE_METRICS:
+                item["total_value"] = {
+                    "breakdowns": [
+                        self._breakdown(rng, "city", _CITIES),
+                        self._breakdown(rng, "country", _COUNTRIES),
+                        self._breakdown(rng, "age", _AGES),
+                    ]
+                }
+            else:
+                item["total_value"] = {"value": rng.randint(0, 50_000)}
+            data.append(item)
+        return {"data": data}
+
+    def _media_insights(self, media_id: str, params: dict) -> dict:
+        metrics = [m for m in params.get("metric", "").split(",") if m]
+        unknown = [m for m in metrics if m not in MEDIA_METRICS]
+        if not metrics or unknown:
+            raise _GraphError(100, "(#100) metric[0] must be one of the following values: " + ", ".join(sorted(MEDIA_METRICS)))
+        return {
+            "data": [
+                {
+                    "name": metric,
+                    "period": "lifetime",
+                    "values": [{"value": self._value_rng(media_id, metric).randint(0, 20_000)}],
+                    "id": f"{media_id}/insights/{metric}/lifetime",
+                }
+                for metric in metrics
+            ]
+        }
+
+    def dispatch(self, path: str, params: dict[str, str]) -> tuple[int, dict, dict]:
+        """Handle one request; returns (HTTP status, JSON body, headers) and records stats."""
+        try:
+            endpoint, body, headers = self.handle(path, params)
+            self.stats.record(endpoint)
+            return 200, body, headers
+        except _GraphError as e:
+            self.stats.record("error", e.code)
+            body = {
+                "error": {
+                    "message": str(e),
+                    "type": e.error_type,
+                    "code": e.code,
+                    "fbtrace_id": "simulated",
+                }
+            }
+            if e.subcode is not None:
+                body["error"]["error_subcode"] = e.subcode
+            return 400, body, e.headers
+
+    def batch(self, params: dict[str, str]) -> tuple[int, object, dict]:
+        """Handle a Graph batch request; each sub-request is dispatched on its own."""
+        try:
+            requests = json.loads(params.get("batch", ""))
+        except ValueError:
+            requests = None
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH_SIZE:
+            return self.dispatch("/", {})  # Unknown path -> code 100
+
+        self.stats.record("batch")
+        include_headers = params.get("include_headers", "true") != "false"
+        results = []
+        for item in requests:
+            relative = urlparse(str(item.get("relative_url", "")))
+            sub_params = {k: v[-1] for k, v in parse_qs(relative.query).items()}
+            sub_params.setdefault("access_token", params.get("access_token", ""))
+            status, body, headers = self.dispatch("/" + relative.path.lstrip("/"), sub_params)
+            result = {"code": status, "body": json.dumps(body)}
+            if include_headers:
+                result["headers"] = [{"name": k, "value": v} for k, v in headers.items()]
+            results.append(result)
+        return 200, results, {}
+
+    @staticmethod
+    def _breakdown(rng: random.Random, dimension: str, keys: list[str]) -> dict:
+        return {
+            "dimension_keys": [dimension],
+            "results": [
+                {"dimension_values": [key], "value": rng.randint(1, 5_000)} for key in keys
+            ],
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+    def _delay(self):
+        latency = self.config.latency_ms
+        if self.config.latency_jitter_ms:
+            latency += self._random() * self.config.latency_jitter_ms
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Keep-alive clients would otherwise stall on delayed ACKs between
+            # the header and body writes
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                simulator._delay()
+                self._send(*simulator.dispatch(parsed.path, params))
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                params.update({k: v[-1] for k, v in form.items()})
+                simulator._delay()
+                if "batch" in params:
+                    self._send(*simulator.batch(params))
+                else:
+                    self._send(*simulator.dispatch(parsed.path, params))
+
+            def _send(self, status: int, body, headers: dict):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):  # noqa: A002 - silence per-request logs
+                return
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Graph API simulator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--error-codes",
+        default=",".join(str(c) for c in THROTTLING_CODES),
+        help="Comma-separated Graph error codes to inject",
+    )
+    parser.add_argument("--calls-per-window", type=int, default=None)
+    parser.add_argument("--window-seconds", type=int, default=3600)
+    parser.add_argument("--bm-only-every", type=int, default=0)
+    parser.add_argument("--incompatible-metrics", default="")
+    args = parser.parse_args()
+
+    sim_config = SimulatorConfig(
+        num_accounts=args.accounts,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        error_codes=tuple(int(c) for c in args.error_codes.split(",") if c),
+        calls_per_window=args.calls_per_window,
+        window_seconds=args.window_seconds,
+        bm_only_every=args.bm_only_every,
+        incompatible_metrics={m for m in args.incompatible_metrics.split(",") if m},
+    )
+    simulator = GraphSimulator(sim_config, host=args.host, port=args.port)
+    print(f"Graph API simulator listening on {simulator.base_url}")
+    print(f"Set GRAPH_API_BASE_URL={simulator.base_url} to use it.")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
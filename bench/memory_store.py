@@ -0,0 +1,208 @@
+"""Stores used by the benchmarks.
+
+``MemoryStore`` is an in-memory stand-in for ``src/database.py`` that counts
+one round trip per query the Supabase implementation would issue.
+``CountingBackend`` wraps a real ``StorageBackend`` (e.g. SQLite) and counts
+one round trip per backend call.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from typing import Optional
+
+from src.models import AccountHealth, TokenRecord, UserRecord
+from src.storage import StorageBackend
+
+
+class MemoryStore:
+    """Dict-backed users/tokens/insights/audience/log store with round-trip counting."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self.users: dict[int, UserRecord] = {}
+        self.tokens: dict[tuple[int, str], TokenRecord] = {}
+        self.insights: list[dict] = []
+        self.media_insights: list[dict] = []
+        self.audience: list[dict] = []
+        self.logs: list[dict] = []
+        self.account_health: dict[int, AccountHealth] = {}
+        self.metric_capabilities: dict[int, dict[tuple[str, str], bool]] = {}
+        self.round_trips = 0
+
+    def _trip(self, n: int = 1):
+        with self._lock:
+            self.round_trips += n
+
+    def seed_accounts(
+        self,
+        n: int,
+        user_token_expires_in: timedelta = timedelta(days=1),
+        tier: str = "standard",
+    ):
+        """Create ``n`` users matching the simulator's synthetic accounts."""
+        expires_at = datetime.now(timezone.utc) + user_token_expires_in
+        for i in range(n):
+            user_id = next(self._ids)
+            self.users[user_id] = UserRecord(
+                id=user_id,
+                instagram_id=f"ig-{i}",
+                instagram_username=f"synthetic_{i}",
+                facebook_page_id=f"page-{i}",
+                tier=tier,
+            )
+            self.tokens[(user_id, "user")] = TokenRecord(
+                id=next(self._ids),
+                user_id=user_id,
+                token_type="user",
+                access_token=f"user-token-{i}",
+                expires_at=expires_at,
+            )
+            self.tokens[(user_id, "page")] = TokenRecord(
+                id=next(self._ids),
+                user_id=user_id,
+                token_type="page",
+                access_token=f"page-token-{i}",
+            )
+
+    # Functions mirroring src/database.py
+    def init_db(self):
+        self._trip()
+
+    def get_all_user_records(self) -> list[UserRecord]:
+        self._trip()
+        return list(self.users.values())
+
+    def get_user_by_id(self, user_id: int) -> Optional[UserRecord]:
+        self._trip()
+        return self.users.get(user_id)
+
+    def get_user_token_record(self, user_id: int, token_type: str) -> Optional[TokenRecord]:
+        self._trip()
+        return self.tokens.get((user_id, token_type))
+
+    def save_token(self, user_id: int, token_type: str, access_token: str, expires_at=None):
+        self._trip(2)  # delete + insert
+        with self._lock:
+            self.tokens[(user_id, token_type)] = TokenRecord(
+                id=next(self._ids),
+                user_id=user_id,
+                token_type=token_type,
+                access_token=access_token,
+                expires_at=expires_at,
+            )
+
+    def get_expiring_token_records(self, days: float = 7) -> list[tuple[UserRecord, TokenRecord]]:
+        self._trip()
+        threshold = datetime.now(timezone.utc) + timedelta(days=days)
+        return [
+            (self.users[user_id], token)
+            for (user_id, token_type), token in self.tokens.items()
+            if token_type == "user" and token.expires_at and token.expires_at < threshold
+        ]
+
+    def save_insights(self, user_id: int, insights: list[dict]):
+        self._trip()
+        with self._lock:
+            self.insights.extend({"user_id": user_id, **i} for i in insights)
+
+    def save_media_insights(self, user_id: int, media_insights: list[dict]):
+        self._trip()
+        with self._lock:
+            self.media_insights.extend({"user_id": user_id, **m} for m in media_insights)
+
+    def save_audience_data(self, user_id: int, data_type: str, data: dict) -> bool:
+        self._trip()
+        with self._lock:
+            self.audience.append({"user_id": user_id, "data_type": data_type, "data": data})
+        return True
+
+    def get_all_account_health(self) -> dict[int, AccountHealth]:
+        self._trip()
+        return dict(self.account_health)
+
+    def save_account_health(self, health: AccountHealth):
+        self._trip()
+        with self._lock:
+            self.account_health[health.user_id] = health
+
+    def get_metric_capabilities(self, user_id: Optional[int] = None) -> dict:
+        self._trip()
+        if user_id is None:
+            return {uid: dict(caps) for uid, caps in self.metric_capabilities.items()}
+        return {user_id: dict(self.metric_capabilities.get(user_id, {}))}
+
+    def save_metric_capabilities(self, user_id: int, capabilities: dict[tuple[str, str], bool]):
+        self._trip()
+        with self._lock:
+            self.metric_capabilities.setdefault(user_id, {}).update(capabilities)
+
+    def log_collection(self, user_id: int, collection_type: str, status: str, error_message=None):
+        self._trip()
+        with self._lock:
+            self.logs.append(
+                {
+                    "user_id": user_id,
+                    "collection_type": collection_type,
+                    "status": status,
+                    "error_message": error_message,
+                }
+            )
+
+
+@contextmanager
+def patched_store(store: MemoryStore, *modules):
+    """Point the database names imported by ``modules`` at ``store``."""
+    originals = []
+    for module in modules:
+        for name in dir(store):
+            if name.startswith("_") or not hasattr(module, name):
+                continue
+            if not callable(getattr(store, name)):
+                continue
+            originals.append((module, name, getattr(module, name)))
+            setattr(module, name, getattr(store, name))
+    try:
+        yield store
+    finally:
+        for module, name, value in reversed(originals):
+            setattr(module, name, value)
+
+
+class CountingBackend:
+    """Proxy around a ``StorageBackend`` counting calls as round trips."""
+
+    def __init__(self, backend: StorageBackend):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            with self._lock:
+                self.round_trips += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def seed_backend(
+    backend: StorageBackend,
+    n: int,
+    user_token_expires_in: timedelta = timedelta(days=1),
+    tier: str = "standard",
+):
+    """Create ``n`` users matching the simulator's synthetic accounts in ``backend``."""
+    expires_at = datetime.now(timezone.utc) + user_token_expires_in
+    for i in range(n):
+        row = backend.upsert_user(f"ig-{i}", f"synthetic_{i}", f"page-{i}")
+        if tier != "standard":
+            backend.update_user_tier(row["id"], tier)
+        backend.replace_token(row["id"], "user", f"user-token-{i}", expires_at)
+        backend.replace_token(row["id"], "page", f"page-token-{i}", None)
@@ -0,0 +1,113 @@
+"""Pydantic models vs slotted records: per-object memory and construction cost.
+
+Builds users and tokens from rows shaped like backend results, once through
+the pydantic ``User``/``Token`` models and once through ``UserRecord``/
+``TokenRecord``, and reports construction time and retained bytes per object
+(tracemalloc; field values shared with the source rows are not counted).
+
+Usage:
+    python -m bench.model_benchmark --accounts 100000
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.collection_benchmark import _git_commit
+from src.database import (
+    _token_from_row,
+    _token_record_from_row,
+    _user_from_row,
+    _user_record_from_row,
+)
+
+
+def _user_rows(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "instagram_id": f"ig-{i}",
+            "instagram_username": f"synthetic_{i}",
+            "facebook_page_id": f"page-{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def _token_rows(n: int) -> list[dict]:
+    expires_at = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+    return [
+        {
+            "id": i,
+            "user_id": i,
+            "token_type": "user",
+            "access_token": f"user-token-{i}",
+            "expires_at": expires_at,
+        }
+        for i in range(n)
+    ]
+
+
+def _measure(build, rows: list[dict]) -> dict:
+    """Return construction time and retained bytes per object for ``build``."""
+    gc.collect()
+    started = time.perf_counter()
+    objects = [build(r) for r in rows]
+    elapsed = time.perf_counter() - started
+    del objects
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    objects = [build(r) for r in rows]
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del objects
+
+    return {
+        "construct_us_per_object": round(elapsed / len(rows) * 1e6, 3),
+        "bytes_per_object": round(retained / len(rows), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model vs record memory/CPU benchmark.")
+    parser.add_argument("--accounts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "accounts": args.accounts,
+    }
+    user_rows = _user_rows(args.accounts)
+    token_rows = _token_rows(args.accounts)
+
+    results = []
+    for kind, build, rows in (
+        ("User", _user_from_row, user_rows),
+        ("UserRecord", _user_record_from_row, user_rows),
+        ("Token", _token_from_row, token_rows),
+        ("TokenRecord", _token_record_from_row, token_rows),
+    ):
+        result = {**meta, "type": kind, **_measure(build, rows)}
+        results.append(result)
+        print(
+            f"{kind:>12}: {result['construct_us_per_object']}us/object, "
+            f"{result['bytes_per_object']} bytes/object",
+            file=sys.stderr,
+        )
+
+    sys.stdout.write("\n".join(json.dumps(r) for r in results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
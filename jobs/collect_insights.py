@@ -6,7 +6,8 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.database import init_db
+from src.anomaly_detection import run_anomaly_detection
+from src.database import init_db, refresh_fleet_overview
 from src.insights_collector import collect_all_users
 
 
@@ -20,11 +21,36 @@ def run_collection():
     # Run collection
     results = collect_all_users()
 
+    # Admin overview reflects the cycle that just finished
+    try:
+        refresh_fleet_overview()
+        print("Fleet overview refreshed")
+    except Exception as e:
+        print(f"Fleet overview refresh failed: {e}")
+
+    try:
+        anomalies = run_anomaly_detection()
+        print(
+            f"Anomaly detection: {anomalies['anomalies']} anomalies across "
+            f"{anomalies['accounts']} accounts in {anomalies['total_s']}s"
+        )
+        for metric, count in anomalies["by_metric"].items():
+            print(f"  - {metric}: {count}")
+    except Exception as e:
+        print(f"Anomaly detection failed: {e}")
+
     # Print summary
     print(f"\n=== Collection Summary ===")
     print(f"Total users: {results['total_users']}")
     print(f"Insights: {results['insights_success']} success, {results['insights_failed']} failed")
     print(f"Audience: {results['audience_success']} success, {results['audience_failed']} failed")
+    print(f"Quarantined (skipped): {results['quarantined']}")
+    print(f"Graph API retries: {results['retries']}")
+
+    if results["retries_by_account"]:
+        print(f"\nRetries by account:")
+        for username, retries in results["retries_by_account"].items():
+            print(f"  - {username}: {retries}")
 
     if results["errors"]:
         print(f"\nErrors:")
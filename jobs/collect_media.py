@@ -0,0 +1,42 @@
+"""Scheduled job for collecting media-level insights."""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import init_db
+from src.media_collector import collect_media_all_users
+
+
+def run_media_collection():
+    """Run the media insights collection job."""
+    print("Starting media insights collection...")
+
+    # Ensure database is initialized
+    init_db()
+
+    # Run collection
+    results = collect_media_all_users()
+
+    # Print summary
+    print(f"\n=== Media Collection Summary ===")
+    print(f"Total users: {results['total_users']}")
+    print(f"Accounts: {results['success']} success, {results['failed']} failed")
+    print(f"Quarantined (skipped): {results['quarantined']}")
+    print(f"Deferred (rate budget spent): {results['deferred']}")
+    print(f"Posts: {results['media']} collected, {results['media_errors']} failed")
+    print(f"Rows saved: {results['rows']}")
+    print(f"Graph API retries: {results['retries']}")
+
+    if results["errors"]:
+        print(f"\nErrors:")
+        for error in results["errors"]:
+            print(f"  - {error}")
+
+    return results
+
+
+if __name__ == "__main__":
+    run_media_collection()
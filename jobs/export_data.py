@@ -0,0 +1,75 @@
+"""Command-line export of a user's insights, audience or derived-metrics history.
+
+Usage:
+    python jobs/export_data.py --instagram-id 1784... --dataset insights --format parquet -o insights.parquet
+    python jobs/export_data.py --user-id 3 --dataset audience --since 2025-01-01 > audience.csv
+    python jobs/export_data.py --user-id 3 --dataset derived --since 2025-01-01 > derived.csv
+"""
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import init_db, get_user_by_id, get_user_by_instagram_id
+from src.export import DATASETS, EXPORT_FORMATS, export_history
+
+
+def _date(value: str) -> datetime:
+    """Parse an ISO date or datetime (naive means UTC)."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def run_export(
+    user_id: int,
+    dataset: str,
+    format: str,
+    output: str = "-",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> int:
+    """Export one dataset of a user's history to ``output`` ("-" is stdout)."""
+    init_db()
+
+    if output == "-":
+        rows = export_history(user_id, dataset, format, sys.stdout.buffer, start_date, end_date)
+        sys.stdout.flush()
+    else:
+        with open(output, "wb") as out:
+            rows = export_history(user_id, dataset, format, out, start_date, end_date)
+
+    # Progress goes to stderr so stdout can carry the export itself
+    print(f"Exported {rows} {dataset} rows ({format}) to {output}", file=sys.stderr)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a user's insights, audience or derived-metrics history.")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--user-id", type=int)
+    who.add_argument("--instagram-id")
+    parser.add_argument("--dataset", choices=list(DATASETS), default="insights")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout")
+    parser.add_argument("--since", type=_date, help="ISO start date (UTC)")
+    parser.add_argument("--until", type=_date, help="ISO end date (UTC)")
+    args = parser.parse_args()
+
+    init_db()
+    if args.user_id is not None:
+        user = get_user_by_id(args.user_id)
+    else:
+        user = get_user_by_instagram_id(args.instagram_id)
+    if not user:
+        parser.error("user not found")
+
+    run_export(user.id, args.dataset, args.format, args.output, args.since, args.until)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,82 @@
 """Scheduled job for refreshing expiring tokens."""
 
+import random
 import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.database import init_db, get_expiring_tokens, save_token
+from src.database import (
+    init_db,
+    get_expiring_token_records,
+    get_user_by_id,
+    get_user_token_record,
+    save_token,
+)
 from src.oauth import get_user_pages, refresh_long_lived_token
 
 
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC so they compare with aware ones."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def refresh_user_token(user, token) -> dict:
+    """
+    Refresh one user's long-lived token and re-sync its linked page token.
+
+    Raises:
+        Exception: If the user token itself could not be refreshed.
+    """
+    # Refresh the token
+    new_token_data = refresh_long_lived_token(token.access_token)
+
+    # Save the new token
+    save_token(
+        user_id=user.id,
+        token_type="user",
+        access_token=new_token_data["access_token"],
+        expires_at=new_token_data["expires_at"],
+    )
+
+    print(f"  ✓ Token refreshed, expires: {new_token_data['expires_at']}")
+
+    # Refresh the page token for the same page currently linked to this user.
+    try:
+        pages = get_user_pages(new_token_data["access_token"])
+        matching_page = next(
+            (
+                page
+                for page in pages
+                if page.get("id") == user.facebook_page_id
+                and isinstance(page.get("access_token"), str)
+            ),
+            None,
+        )
+
+        if matching_page and user.id is not None:
+            save_token(
+                user_id=user.id,
+                token_type="page",
+                access_token=matching_page["access_token"],
+                expires_at=None,
+            )
+            print(f"  ✓ Page token synced for page {user.facebook_page_id}")
+        else:
+            print(
+                "  ! Page token sync skipped: "
+                f"linked page {user.facebook_page_id} not found."
+            )
+    except Exception as page_error:
+        print(f"  ! Page token sync failed: {page_error}")
+
+    return new_token_data
+
+
 def run_token_refresh(days_before_expiry: int = 7):
     """
     Refresh tokens that will expire within the specified days.
@@ -23,7 +90,7 @@ def run_token_refresh(days_before_expiry: int = 7):
     init_db()
 
     # Get expiring tokens
-    expiring = get_expiring_tokens(days_before_expiry)
+    expiring = get_expiring_token_records(days_before_expiry)
 
     if not expiring:
         print("No tokens need refreshing.")
@@ -35,48 +102,7 @@ def run_token_refresh(days_before_expiry: int = 7):
         print(f"Refreshing token for {user.instagram_username}...")
 
         try:
-            # Refresh the token
-            new_token_data = refresh_long_lived_token(token.access_token)
-
-            # Save the new token
-            save_token(
-                user_id=user.id,
-                token_type="user",
-                access_token=new_token_data["access_token"],
-                expires_at=new_token_data["expires_at"],
-            )
-
-            print(f"  ✓ Token refreshed, expires: {new_token_data['expires_at']}")
-
-            # Refresh the page token for the same page currently linked to this user.
-            try:
-                pages = get_user_pages(new_token_data["access_token"])
-                matching_page = next(
-                    (
-                        page
-                        for page in pages
-                        if page.get("id") == user.facebook_page_id
-                        and isinstance(page.get("access_token"), str)
-                    ),
-                    None,
-                )
-
-                if matching_page and user.id is not None:
-                    save_token(
-                        user_id=user.id,
-                        token_type="page",
-                        access_token=matching_page["access_token"],
-                        expires_at=None,
-                    )
-                    print(f"  ✓ Page token synced for page {user.facebook_page_id}")
-                else:
-                    print(
-                        "  ! Page token sync skipped: "
-                        f"linked page {user.facebook_page_id} not found."
-                    )
-            except Exception as page_error:
-                print(f"  ! Page token sync failed: {page_error}")
-
+            refresh_user_token(user, token)
             results["refreshed"] += 1
 
         except Exception as e:
@@ -92,5 +118,115 @@ def run_token_refresh(days_before_expiry: int = 7):
     return results
 
 
+def refresh_token_for_user(
+    user_id: int,
+    days_before_expiry: int = 7,
+    planning_window_hours: int = 24,
+    now: datetime | None = None,
+) -> bool:
+    """
+    Refresh a single user's token if it is still due.
+
+    Used as the target of refresh-ahead jobs. A job may run up to
+    ``planning_window_hours`` before the token's ideal refresh time, so a
+    token counts as due when it expires within that window plus
+    ``days_before_expiry``. The token is re-read at run time, so a token
+    that was already refreshed (manually or by an earlier job) is skipped
+    instead of being refreshed twice.
+
+    Returns:
+        True if the token was refreshed
+    """
+    user = get_user_by_id(user_id)
+    token = get_user_token_record(user_id, "user")
+    if not user or not token or not token.expires_at:
+        return False
+
+    now = _as_utc(now or datetime.now(timezone.utc))
+    threshold = now + timedelta(days=days_before_expiry, hours=planning_window_hours)
+    if _as_utc(token.expires_at) > threshold:
+        return False
+
+    print(f"Refreshing token for {user.instagram_username} (refresh-ahead)...")
+    try:
+        refresh_user_token(user, token)
+    except Exception as e:
+        print(f"  ✗ Failed to refresh token for {user.instagram_username}: {e}")
+        return False
+    return True
+
+
+def plan_token_refreshes(
+    days_before_expiry: int = 7,
+    planning_window_hours: int = 24,
+    overdue_spread_minutes: int = 60,
+    now: datetime | None = None,
+    rng: random.Random | None = None,
+) -> list[tuple[int, datetime]]:
+    """
+    Pick a jittered refresh time for every token due within the next window.
+
+    Each token's ideal refresh time is ``days_before_expiry`` before it expires;
+    the actual run time is drawn uniformly from the ``planning_window_hours``
+    leading up to it, so tokens issued in the same burst are refreshed spread
+    out instead of all at once. Tokens already past their ideal time are spread
+    across the next ``overdue_spread_minutes``.
+
+    Returns:
+        List of (user_id, run_at) pairs with timezone-aware UTC run times
+    """
+    now = _as_utc(now or datetime.now(timezone.utc))
+    rng = rng or random.Random()
+    window = timedelta(hours=planning_window_hours)
+    lead = timedelta(days=days_before_expiry)
+
+    expiring = get_expiring_token_records(days_before_expiry + planning_window_hours / 24)
+
+    plan = []
+    for user, token in expiring:
+        if user.id is None or token.expires_at is None:
+            continue
+
+        ideal = _as_utc(token.expires_at) - lead
+        run_at = ideal - window * rng.random()
+        if run_at <= now:
+            run_at = now + timedelta(minutes=overdue_spread_minutes * rng.random())
+        plan.append((user.id, run_at))
+
+    return plan
+
+
+def schedule_token_refreshes(
+    scheduler,
+    days_before_expiry: int = 7,
+    planning_window_hours: int = 24,
+) -> int:
+    """
+    Enqueue one refresh-ahead job per due token on an APScheduler scheduler.
+
+    Run this once per ``planning_window_hours``; jobs are keyed by user, so
+    re-planning replaces a pending job rather than duplicating it.
+
+    Returns:
+        Number of jobs scheduled
+    """
+    init_db()
+
+    plan = plan_token_refreshes(days_before_expiry, planning_window_hours)
+    for user_id, run_at in plan:
+        scheduler.add_job(
+            refresh_token_for_user,
+            "date",
+            run_date=run_at,
+            args=[user_id, days_before_expiry, planning_window_hours],
+            id=f"refresh_token_{user_id}",
+            replace_existing=True,
+            misfire_grace_time=3600,
+        )
+
+    print(f"Scheduled {len(plan)} refresh-ahead token jobs.")
+    return len(plan)
+
+
 if __name__ == "__main__":
     run_token_refresh()
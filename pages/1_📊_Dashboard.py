@@ -4,17 +4,26 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import time
 from datetime import datetime, timedelta
 
+from src import background_jobs
+from src.config import config
 from src.database import (
     init_db,
+    get_anomalies,
     get_user_by_id,
-    get_insights,
+    get_insights_frame,
     get_latest_insights,
     get_latest_audience_data,
+    get_audience_top,
+    get_audience_trend,
     get_user_token,
 )
-from src.insights_collector import collect_insights_for_user, collect_audience_for_user
+from src.derived_metrics import get_derived_metrics
+from src.downsampling import downsample_frame
+from src.export import EXPORT_FORMATS, MIME_TYPES, export_to_bytes
+from src.insights_collector import refresh_user
 from src.permission_badge import show_permission_badge
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
@@ -48,60 +57,92 @@ days_map = {"최근 7일": 7, "최근 30일": 30, "최근 90일": 90}
 days = days_map[date_range]
 start_date = datetime.utcnow() - timedelta(days=days)
 
-# Manual refresh button
-st.sidebar.markdown("---")
-if st.sidebar.button("🔄 데이터 새로고침"):
+# Collections run on the shared background executor; the page renders stored
+# data right away and a polling fragment follows the job
+refresh_key = ("refresh", selected_user_id)
+
+
+def start_refresh() -> bool:
     token = get_user_token(selected_user_id, "page")
-    if token:
-        with st.spinner("인사이트 수집 중..."):
-            result = collect_insights_for_user(
-                selected_user_id, selected_user.instagram_id, token.access_token
-            )
-            if result["success"]:
-                st.sidebar.success(f"{result['insights_count']}개 지표 수집 완료!")
-            else:
-                st.sidebar.error(result["error"])
+    if not token:
+        return False
+    background_jobs.submit(
+        refresh_key,
+        refresh_user,
+        selected_user_id,
+        token.access_token,
+    )
+    return True
 
-            audience_result = collect_audience_for_user(
-                selected_user_id, selected_user.instagram_id, token.access_token
-            )
-            if audience_result["success"]:
-                st.sidebar.success("오디언스 데이터 업데이트 완료!")
+
+def show_refresh_result(result: dict):
+    insights_result = result["insights"]
+    if insights_result["success"] and insights_result["insights_count"] > 0:
+        st.success(f"✅ {insights_result['insights_count']}개 지표 수집 완료!")
+    elif insights_result["success"]:
+        st.warning("인사이트 데이터가 아직 없습니다. 비즈니스 계정 활동 후 다시 시도하세요.")
     else:
+        st.error(f"인사이트 수집 실패: {insights_result['error']}")
+    if result["audience"]["success"]:
+        st.success("✅ 오디언스 데이터 업데이트 완료!")
+
+
+def refresh_status():
+    job = background_jobs.get_job(refresh_key)
+    if job is None:
+        return
+    if not job.finished:
+        with st.status("데이터 수집 중...", expanded=True):
+            for message in job.progress:
+                st.write(message)
+        return
+    if st.session_state.get("refresh_seen") != job.submitted_at:
+        # Reload the page data once, then show the outcome
+        st.session_state.refresh_seen = job.submitted_at
+        st.rerun()
+    if time.time() - job.finished_at < 60:
+        if job.status == background_jobs.FAILED:
+            st.error(f"수집 실패: {job.error}")
+        else:
+            show_refresh_result(job.result)
+
+
+st.sidebar.markdown("---")
+if st.sidebar.button("🔄 데이터 새로고침"):
+    if not start_refresh():
         st.sidebar.error("유효한 토큰이 없습니다. 다시 로그인해주세요.")
 
 # Get data
-insights = get_insights(selected_user_id, start_date=start_date)
+insights_df = get_insights_frame(selected_user_id, start_date=start_date)
 latest = get_latest_insights(selected_user_id)
 audience = get_latest_audience_data(selected_user_id)
+anomalies = get_anomalies(selected_user_id, (datetime.utcnow() - timedelta(days=7)).date())
 
 # Auto-collect if no data exists (first login)
-if not insights and not latest:
-    token = get_user_token(selected_user_id, "page")
-    if token:
-        with st.spinner("첫 로그인 데이터를 수집하고 있습니다..."):
-            result = collect_insights_for_user(
-                selected_user_id, selected_user.instagram_id, token.access_token
-            )
-            if result["success"] and result["insights_count"] > 0:
-                st.success(f"✅ {result['insights_count']}개 인사이트 수집 완료!")
-            elif result["success"]:
-                st.warning(
-                    "인사이트 데이터가 아직 없습니다. 비즈니스 계정 활동 후 다시 시도하세요."
-                )
-            else:
-                st.warning(f"인사이트 수집 실패: {result['error']}")
-
-            audience_result = collect_audience_for_user(
-                selected_user_id, selected_user.instagram_id, token.access_token
-            )
-            if audience_result["success"]:
-                st.success("✅ 오디언스 데이터 수집 완료!")
-
-        # Re-fetch data after collection
-        insights = get_insights(selected_user_id, start_date=start_date)
-        latest = get_latest_insights(selected_user_id)
-        audience = get_latest_audience_data(selected_user_id)
+if insights_df.empty and not latest and background_jobs.get_job(refresh_key) is None:
+    if start_refresh():
+        st.info("첫 로그인 데이터를 수집하고 있습니다. 완료되면 자동으로 표시됩니다.")
+
+# Poll only while a job is running
+refresh_job = background_jobs.get_job(refresh_key)
+with st.sidebar:
+    st.fragment(run_every=2 if refresh_job and not refresh_job.finished else None)(refresh_status)()
+
+# Anomalies flagged by the post-collection analysis
+if anomalies:
+    labels = {
+        "reach": "도달",
+        "impressions": "노출",
+        "profile_views": "프로필 조회",
+        "follower_growth": "일일 팔로워 증감",
+    }
+    lines = [
+        f"- {a.day:%m/%d} {labels.get(a.metric_name, a.metric_name)} "
+        f"{'급감' if a.direction == 'drop' else '급증'}: {a.value:,.0f} "
+        f"(평소 {a.baseline:,.0f})"
+        for a in anomalies
+    ]
+    st.warning("⚠️ 최근 7일 이상 징후\n\n" + "\n".join(lines))
 
 # Summary metrics
 st.subheader("📈 주요 지표")
@@ -127,17 +168,14 @@ with col4:
 st.markdown("---")
 
 # Trends chart
-if insights:
+if not insights_df.empty:
     st.subheader("📊 시간별 추이")
     show_permission_badge("instagram_manage_insights")
 
-    # Convert to DataFrame
-    df = pd.DataFrame(
-        [
-            {"date": i.collected_at, "metric": i.metric_name, "value": i.metric_value}
-            for i in insights
-        ]
-    )
+    # Daily values only; week/days_28 totals are not on the same scale
+    df = insights_df[insights_df["period"] == "day"].rename(
+        columns={"collected_at": "date", "metric_name": "metric", "metric_value": "value"}
+    )[["date", "metric", "value"]]
 
     if not df.empty:
         # Metric selection
@@ -151,7 +189,14 @@ if insights:
         )
 
         if selected_metrics:
-            filtered_df = df[df["metric"].isin(selected_metrics)]
+            # Cap points per series at about the chart's pixel width
+            filtered_df = downsample_frame(
+                df[df["metric"].isin(selected_metrics)],
+                "date",
+                "value",
+                "metric",
+                config.CHART_MAX_POINTS,
+            )
 
             fig = px.line(
                 filtered_df,
@@ -168,6 +213,49 @@ else:
         "아직 인사이트 데이터가 없습니다. '데이터 새로고침' 버튼을 클릭하여 수집하세요."
     )
 
+# Derived metrics (growth, engagement rate, moving averages, weekly deltas)
+derived_df = get_derived_metrics([selected_user_id], start_date)
+if not derived_df.empty:
+    st.markdown("---")
+    st.subheader("📐 파생 지표")
+    show_permission_badge("instagram_manage_insights")
+
+    def latest_value(column: str):
+        values = derived_df[column].dropna()
+        return values.iloc[-1] if not values.empty else None
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        value = latest_value("engagement_rate")
+        st.metric("참여율", f"{value:.2%}" if value is not None else "N/A")
+    with col2:
+        value = latest_value("follower_count_wow")
+        st.metric("팔로워 증감 (전주 대비)", f"{int(value):+,}" if value is not None else "N/A")
+    with col3:
+        value = latest_value("reach_ma7")
+        st.metric("도달 7일 평균", f"{int(value):,}" if value is not None else "N/A")
+
+    derived_metrics = [c for c in derived_df.columns if c not in ("user_id", "date")]
+    selected_derived = st.multiselect(
+        "표시할 파생 지표 선택",
+        derived_metrics,
+        default=["reach_ma7", "total_interactions_ma7"],
+    )
+    if selected_derived:
+        chart_df = derived_df.melt(
+            id_vars="date", value_vars=selected_derived, var_name="metric", value_name="value"
+        ).dropna()
+        fig = px.line(
+            chart_df,
+            x="date",
+            y="value",
+            color="metric",
+            title="파생 지표 추이",
+            labels={"date": "날짜", "value": "값", "metric": "지표"},
+        )
+        fig.update_layout(hovermode="x unified")
+        st.plotly_chart(fig, use_container_width=True)
+
 st.markdown("---")
 
 # Audience demographics
@@ -176,35 +264,53 @@ show_permission_badge("instagram_manage_insights")
 show_permission_badge("pages_read_engagement")
 
 if audience:
+    # Breakdowns are stored per metric (follower / engaged / reached audience)
+    metrics = sorted({key.rpartition("_")[0] for key in audience})
+    audience_metric = st.selectbox(
+        "오디언스 기준",
+        metrics,
+        index=metrics.index("follower_demographics") if "follower_demographics" in metrics else 0,
+    )
+
     col1, col2 = st.columns(2)
 
     with col1:
-        # Find city or country data
-        for key in audience:
-            if "city" in key.lower():
-                data = audience[key]
-                if data:
-                    df = pd.DataFrame(list(data.items()), columns=["위치", "수"])
-                    df = df.nlargest(10, "수")
-                    fig = px.bar(df, x="위치", y="수", title="상위 도시")
-                    st.plotly_chart(fig, use_container_width=True)
-                break
+        top_cities = get_audience_top(selected_user_id, audience_metric, "city", 10)
+        if top_cities:
+            df = pd.DataFrame(top_cities, columns=["위치", "수"])
+            fig = px.bar(df, x="위치", y="수", title="상위 도시")
+            st.plotly_chart(fig, use_container_width=True)
 
     with col2:
-        # Find country data
-        for key in audience:
-            if "country" in key.lower():
-                data = audience[key]
-                if data:
-                    df = pd.DataFrame(list(data.items()), columns=["국가", "수"])
-                    df = df.nlargest(10, "수")
-                    fig = px.pie(df, names="국가", values="수", title="상위 국가")
-                    st.plotly_chart(fig, use_container_width=True)
-                break
+        top_countries = get_audience_top(selected_user_id, audience_metric, "country", 10)
+        if top_countries:
+            df = pd.DataFrame(top_countries, columns=["국가", "수"])
+            fig = px.pie(df, names="국가", values="수", title="상위 국가")
+            st.plotly_chart(fig, use_container_width=True)
+
+    # Top cities across the snapshots of the selected period
+    if top_cities:
+        trend_df = get_audience_trend(
+            selected_user_id,
+            audience_metric,
+            "city",
+            [city for city, _ in top_cities[:5]],
+            start_date,
+        )
+        if trend_df["collected_at"].nunique() > 1:
+            fig = px.line(
+                trend_df,
+                x="collected_at",
+                y="value",
+                color="key",
+                title="상위 도시 추이",
+                labels={"collected_at": "날짜", "value": "수", "key": "위치"},
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
     # Age/gender breakdown
     for key in audience:
-        if "age" in key.lower() or "gender" in key.lower():
+        if key.startswith(audience_metric) and ("age" in key.lower() or "gender" in key.lower()):
             data = audience[key]
             if data:
                 df = pd.DataFrame(list(data.items()), columns=["인구통계", "수"])
@@ -216,6 +322,55 @@ else:
         "아직 오디언스 데이터가 없습니다. '데이터 새로고침' 버튼을 클릭하여 수집하세요."
     )
 
+# Full history export, built on the background executor (streamed page by
+# page through a temporary file) and offered for download when it finishes
+st.markdown("---")
+st.subheader("📥 데이터 내보내기")
+st.caption("선택한 기간과 관계없이 전체 수집 기록을 내보냅니다.")
+
+export_datasets = {"insights": "인사이트", "audience": "오디언스 인구통계", "derived": "파생 지표"}
+col1, col2 = st.columns(2)
+with col1:
+    export_dataset = st.radio(
+        "데이터", list(export_datasets), format_func=export_datasets.get, horizontal=True
+    )
+with col2:
+    export_format = st.radio("형식", EXPORT_FORMATS, format_func=str.upper, horizontal=True)
+
+export_key = ("export", selected_user_id, export_dataset, export_format)
+if st.button("내보내기 파일 만들기"):
+    background_jobs.submit(
+        export_key, export_to_bytes, selected_user_id, export_dataset, export_format
+    )
+
+
+def export_status():
+    job = background_jobs.get_job(export_key)
+    if job is None:
+        return
+    if not job.finished:
+        st.info("파일을 만드는 중...")
+        return
+    if st.session_state.get("export_seen") != job.submitted_at:
+        # Stop polling once, then show the download button
+        st.session_state.export_seen = job.submitted_at
+        st.rerun()
+    if job.status == background_jobs.FAILED:
+        st.error(f"내보내기 실패: {job.error}")
+        return
+    data, rows = job.result
+    file_name = f"{export_dataset}_{datetime.fromtimestamp(job.finished_at):%Y%m%d}.{export_format}"
+    st.download_button(
+        f"⬇️ {file_name} ({rows:,}행)",
+        data,
+        file_name=file_name,
+        mime=MIME_TYPES[export_format],
+    )
+
+
+export_job = background_jobs.get_job(export_key)
+st.fragment(run_every=2 if export_job and not export_job.finished else None)(export_status)()
+
 # Permission usage summary (for Meta App Review)
 st.markdown("---")
 st.subheader("🔑 Permission Usage Summary")
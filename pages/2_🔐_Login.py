@@ -2,7 +2,7 @@
 
 import streamlit as st
 
-from src.database import init_db, create_or_update_user, save_token
+from src.database import init_db, create_or_update_user, reset_account_health, save_token
 from src.oauth import get_oauth_url, validate_state, complete_oauth_flow
 from src.permission_badge import show_permission_badge
 from src.config import config
@@ -59,6 +59,8 @@ if "code" in params:
                     access_token=result["page_token"],
                     expires_at=None,  # Page tokens don't expire while user token is valid
                 )
+                # Fresh tokens: lift any collection quarantine
+                reset_account_health(user.id)
 
                 # Update session state
                 st.session_state.user_id = user.id
@@ -3,8 +3,11 @@
 import streamlit as st
 from datetime import datetime
 
+from src import circuit_breaker
+from src.config import config
 from src.database import (
     init_db,
+    get_account_health,
     get_user_by_id,
     get_user_token,
 )
@@ -43,6 +46,10 @@ with st.expander(f"@{selected_user.instagram_username}", expanded=True):
     with col1:
         st.write(f"**Instagram ID:** {selected_user.instagram_id}")
         st.write(f"**Facebook 페이지 ID:** {selected_user.facebook_page_id}")
+        st.write(
+            f"**수집 등급:** {selected_user.tier} "
+            f"({', '.join(config.periods_for_tier(selected_user.tier))})"
+        )
         st.write(
             f"**연결일:** {selected_user.created_at.strftime('%Y-%m-%d') if selected_user.created_at else 'N/A'}"
         )
@@ -104,6 +111,30 @@ else:
 
 st.markdown("---")
 
+# Collection health (circuit breaker)
+st.subheader("🩺 데이터 수집 상태")
+
+health = get_account_health(selected_user_id)
+collection_state = circuit_breaker.current_state(health)
+if collection_state == circuit_breaker.CLOSED:
+    st.success("✅ 정상적으로 수집 중입니다")
+    if health and health.consecutive_failures:
+        st.caption(f"최근 연속 오류 {health.consecutive_failures}회: {health.last_error}")
+else:
+    st.error(
+        f"⛔ 반복된 오류로 자동 수집이 일시 중지되었습니다 (연속 {health.consecutive_failures}회)"
+    )
+    st.write(f"**마지막 오류:** {health.last_error or 'N/A'}")
+    if health.opened_at:
+        st.write(f"**중지 시각:** {health.opened_at.strftime('%Y-%m-%d %H:%M')} UTC")
+    if collection_state == circuit_breaker.HALF_OPEN:
+        st.info("다음 수집 주기에 한 번 재시도합니다.")
+    elif health.next_probe_at:
+        st.info(f"다음 재시도: {health.next_probe_at.strftime('%Y-%m-%d %H:%M')} UTC")
+    st.caption("다시 로그인하면 새 토큰으로 즉시 수집이 재개됩니다.")
+
+st.markdown("---")
+
 # App info
 st.subheader("ℹ️ 정보")
 st.markdown("""
@@ -1,10 +1,13 @@
 """Live Insights - Real-time API demonstration for Meta App Review."""
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 import pandas as pd
 
+from src.cache import live_cache
 from src.database import init_db, get_user_by_id, get_user_token
-from src.instagram_api import InstagramAPI, InstagramAPIError
+from src.instagram_api import InstagramAPI
 from src.oauth import get_user_pages
 from src.permission_badge import show_permission_badge
 
@@ -38,14 +41,47 @@ if not page_token:
     st.stop()
 
 api = InstagramAPI(page_token.access_token, selected_user.instagram_id)
+user_token = get_user_token(selected_user_id, "user")
+
+SECTIONS = {
+    "account_info": api.get_account_info,
+    "insights": lambda: api.get_insights(period="day"),
+    "audience": api.get_audience_data,
+    "pages": lambda: get_user_pages(user_token.access_token) if user_token else None,
+}
+
+if st.button("🔄 새로고침 / Refresh"):
+    for section in SECTIONS:
+        live_cache.discard((selected_user_id, section))
 
 st.markdown("---")
 
-# Section 1: Profile Information (instagram_basic)
-st.subheader("1. 프로필 정보 / Profile Information")
-show_permission_badge("instagram_basic")
-try:
-    info = api.get_account_info()
+# Section containers in page order; each is filled as its Graph calls finish
+
+
+def section(title: str, *permissions: str):
+    container = st.container()
+    with container:
+        st.subheader(title)
+        for permission in permissions:
+            show_permission_badge(permission)
+    st.markdown("---")
+    return container
+
+
+containers = {
+    "account_info": section("1. 프로필 정보 / Profile Information", "instagram_basic"),
+    "insights": section("2. 비즈니스 인사이트 / Business Insights", "instagram_manage_insights"),
+    "audience": section(
+        "3. 오디언스 인구통계 / Audience Demographics",
+        "instagram_manage_insights",
+        "pages_read_engagement",
+    ),
+    "pages": section("4. 연결된 Facebook 페이지 / Connected Facebook Pages", "pages_show_list"),
+}
+
+
+def render_account_info(info: dict):
     col1, col2 = st.columns(2)
     with col1:
         st.write(f"**사용자명 / Username:** @{info.get('username', 'N/A')}")
@@ -59,16 +95,9 @@ try:
         st.code(
             f"GET /{selected_user.instagram_id}?fields=id,username,name,profile_picture_url,followers_count,follows_count,media_count,biography"
         )
-except InstagramAPIError as e:
-    st.error(f"API Error: {e}")
 
-st.markdown("---")
 
-# Section 2: Business Insights (instagram_manage_insights)
-st.subheader("2. 비즈니스 인사이트 / Business Insights")
-show_permission_badge("instagram_manage_insights")
-try:
-    insights = api.get_insights(period="day")
+def render_insights(insights: list[dict]):
     if insights:
         df = pd.DataFrame(insights)
         st.dataframe(df, use_container_width=True, hide_index=True)
@@ -78,17 +107,9 @@ try:
         st.code(
             f"GET /{selected_user.instagram_id}/insights?metric=impressions,reach,profile_views,follower_count&period=day&metric_type=total_value"
         )
-except InstagramAPIError as e:
-    st.error(f"API Error: {e}")
 
-st.markdown("---")
 
-# Section 3: Audience Demographics (instagram_manage_insights + pages_read_engagement)
-st.subheader("3. 오디언스 인구통계 / Audience Demographics")
-show_permission_badge("instagram_manage_insights")
-show_permission_badge("pages_read_engagement")
-try:
-    audience = api.get_audience_data()
+def render_audience(audience: dict):
     if audience:
         for key, data in audience.items():
             st.write(f"**{key}:**")
@@ -102,40 +123,57 @@ try:
         st.code(
             f"GET /{selected_user.instagram_id}/insights?metric=follower_demographics&period=lifetime&metric_type=total_value"
         )
-except InstagramAPIError as e:
-    st.error(f"API Error: {e}")
 
-st.markdown("---")
 
-# Section 4: Connected Facebook Pages (pages_show_list)
-st.subheader("4. 연결된 Facebook 페이지 / Connected Facebook Pages")
-show_permission_badge("pages_show_list")
-user_token = get_user_token(selected_user_id, "user")
-if user_token:
-    try:
-        pages = get_user_pages(user_token.access_token)
-        if pages:
-            page_data = []
-            for page in pages:
-                page_data.append(
-                    {
-                        "Page Name": page.get("name", "N/A"),
-                        "Page ID": page.get("id", "N/A"),
-                        "Has Instagram": "✅"
-                        if "instagram_business_account" in page
-                        else "❌",
-                    }
-                )
-            st.dataframe(
-                pd.DataFrame(page_data), use_container_width=True, hide_index=True
+def render_pages(pages: list[dict]):
+    if pages is None:
+        st.warning("유효한 사용자 토큰이 없습니다.")
+        return
+    if pages:
+        page_data = []
+        for page in pages:
+            page_data.append(
+                {
+                    "Page Name": page.get("name", "N/A"),
+                    "Page ID": page.get("id", "N/A"),
+                    "Has Instagram": "✅"
+                    if "instagram_business_account" in page
+                    else "❌",
+                }
             )
-        else:
-            st.info("연결된 Facebook 페이지가 없습니다.")
-        with st.expander("API Details"):
-            st.code(
-                "GET /me/accounts?fields=id,name,access_token,instagram_business_account"
-            )
-    except Exception as e:
-        st.error(f"API Error: {e}")
-else:
-    st.warning("유효한 사용자 토큰이 없습니다.")
+        st.dataframe(
+            pd.DataFrame(page_data), use_container_width=True, hide_index=True
+        )
+    else:
+        st.info("연결된 Facebook 페이지가 없습니다.")
+    with st.expander("API Details"):
+        st.code(
+            "GET /me/accounts?fields=id,name,access_token,instagram_business_account"
+        )
+
+
+RENDERERS = {
+    "account_info": render_account_info,
+    "insights": render_insights,
+    "audience": render_audience,
+    "pages": render_pages,
+}
+
+# All sections load concurrently, so the page takes as long as the slowest
+# call instead of their sum; results are reused for LIVE_CACHE_TTL_SECONDS
+placeholders = {name: containers[name].empty() for name in SECTIONS}
+for placeholder in placeholders.values():
+    placeholder.caption("불러오는 중... / Loading...")
+
+with ThreadPoolExecutor(max_workers=len(SECTIONS)) as pool:
+    futures = {
+        pool.submit(live_cache.get_or_load, (selected_user_id, name), load): name
+        for name, load in SECTIONS.items()
+    }
+    for future in as_completed(futures):
+        name = futures[future]
+        with placeholders[name].container():
+            try:
+                RENDERERS[name](future.result())
+            except Exception as e:
+                st.error(f"API Error: {e}")
@@ -0,0 +1,113 @@
+"""Admin - Cross-account overview of the whole fleet."""
+
+import math
+
+import streamlit as st
+import pandas as pd
+
+from src.config import config
+from src.database import (
+    init_db,
+    get_user_by_id,
+    get_fleet_overview,
+    refresh_fleet_overview,
+)
+
+st.set_page_config(page_title="Admin", page_icon="🛡️", layout="wide")
+init_db()
+
+st.title("🛡️ 전체 계정 현황")
+
+user_id = st.session_state.get("user_id")
+if not user_id:
+    st.warning(
+        "로그인이 필요합니다. 로그인 페이지에서 인스타그램 계정을 먼저 연결해주세요."
+    )
+    st.stop()
+
+current_user = get_user_by_id(user_id)
+if not current_user or not config.is_admin(current_user.instagram_id):
+    st.error("관리자만 볼 수 있는 페이지입니다.")
+    st.stop()
+
+if not config.can_read_fleet_overview():
+    st.error("관리자 페이지에는 Supabase service role 키가 필요합니다 (SUPABASE_KEY).")
+    st.stop()
+
+SORT_LABELS = {
+    "followers": "팔로워",
+    "followers_delta": "팔로워 증감",
+    "reach": "도달",
+    "reach_delta": "도달 증감",
+    "error_rate_7d": "오류율 (7일)",
+    "failures_7d": "실패 (7일)",
+    "last_success_at": "마지막 성공 수집",
+    "last_collected_at": "마지막 수집",
+    "instagram_username": "계정",
+    "tier": "등급",
+    "circuit_state": "차단기 상태",
+}
+
+col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+with col1:
+    sort_by = st.selectbox(
+        "정렬 기준", list(SORT_LABELS), format_func=SORT_LABELS.get
+    )
+with col2:
+    descending = st.radio("정렬 방향", ["내림차순", "오름차순"], horizontal=True) == "내림차순"
+with col3:
+    page_size = st.selectbox("페이지당 계정 수", [25, 50, 100, 200], index=1)
+with col4:
+    if st.button("🔄 지금 갱신"):
+        with st.spinner("집계를 갱신하는 중..."):
+            refresh_fleet_overview()
+
+# The page widget is drawn after the query (it needs the total), so the
+# current page is read from its session state; clamp it if the fleet shrank
+page_number = st.session_state.get("admin_page", 1)
+accounts, total = get_fleet_overview(
+    sort_by, descending, limit=page_size, offset=(page_number - 1) * page_size
+)
+pages = max(1, math.ceil(total / page_size))
+if page_number > pages:
+    page_number = st.session_state["admin_page"] = pages
+    accounts, total = get_fleet_overview(
+        sort_by, descending, limit=page_size, offset=(page_number - 1) * page_size
+    )
+
+if total == 0:
+    st.info("집계된 계정이 없습니다. 수집이 한 번 실행된 뒤 또는 '지금 갱신' 후에 표시됩니다.")
+    st.stop()
+
+st.number_input(
+    f"페이지 (총 {pages}페이지, {total}개 계정)",
+    min_value=1,
+    max_value=pages,
+    key="admin_page",
+)
+
+df = pd.DataFrame([a.model_dump() for a in accounts])
+df["error_rate_7d"] = df["error_rate_7d"] * 100
+st.dataframe(
+    df.drop(columns=["user_id", "refreshed_at"]),
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        "instagram_username": "계정",
+        "tier": "등급",
+        "followers": st.column_config.NumberColumn("팔로워", format="%d"),
+        "followers_delta": st.column_config.NumberColumn("팔로워 증감", format="%+d"),
+        "reach": st.column_config.NumberColumn("도달", format="%d"),
+        "reach_delta": st.column_config.NumberColumn("도달 증감", format="%+d"),
+        "last_collected_at": st.column_config.DatetimeColumn("마지막 수집"),
+        "last_success_at": st.column_config.DatetimeColumn("마지막 성공 수집"),
+        "attempts_7d": "수집 시도 (7일)",
+        "failures_7d": "실패 (7일)",
+        "error_rate_7d": st.column_config.NumberColumn("오류율 (7일)", format="%.1f%%"),
+        "circuit_state": "차단기 상태",
+    },
+)
+
+refreshed_at = accounts[0].refreshed_at
+if refreshed_at:
+    st.caption(f"집계 시각: {refreshed_at.strftime('%Y-%m-%d %H:%M')} UTC (수집 주기마다 자동 갱신)")
@@ -0,0 +1,184 @@
+"""Anomaly detection across the whole fleet after each collection run.
+
+Every account's recent daily series are read with one fleet-wide scan and
+laid out as ``(accounts, days)`` arrays (``derived_metrics.daily_values``).
+Each of the latest days is compared with the window of days before it
+using robust statistics, for every account at once:
+
+- baseline: median of the preceding window
+- spread: median absolute deviation (MAD), scaled by 1.4826 to match a
+  standard deviation. MAD collapses on flat or small-count series, so the
+  spread is floored at a fraction of the baseline and at its square root
+  (counting noise); small wobbles then don't turn into anomalies
+- score: ``(value - baseline) / spread``; ``|score| >= threshold`` is an
+  anomaly, a negative score is a drop
+
+Levels are scored for reach-style metrics. follower_count is a running
+total, so its day-over-day change is scored instead and is reported as
+``follower_growth``.
+"""
+
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .config import config
+from .database import get_fleet_insights_frame, save_anomalies
+from .derived_metrics import daily_values, lag_delta
+
+# Insight metric -> how it is scored
+ANOMALY_SERIES = {
+    "reach": "level",
+    "impressions": "level",
+    "profile_views": "level",
+    "follower_count": "change",
+}
+CHANGE_NAMES = {"follower_count": "follower_growth"}
+MAD_TO_SIGMA = 1.4826
+# Spread floor as a fraction of |baseline|
+MIN_RELATIVE_SPREAD = 0.05
+
+
+def nanmedian_last_axis(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Median over the last axis ignoring NaN, without a Python-level loop.
+
+    Returns:
+        (medians, non-NaN counts); medians are NaN where the count is 0
+    """
+    ordered = np.sort(values, axis=-1)  # NaN sorts last
+    counts = np.count_nonzero(~np.isnan(values), axis=-1)
+    lo = np.maximum((counts - 1) // 2, 0)[..., None]
+    hi = np.maximum(counts // 2, 0)[..., None]
+    with np.errstate(invalid="ignore"):
+        medians = (
+            np.take_along_axis(ordered, lo, axis=-1) + np.take_along_axis(ordered, hi, axis=-1)
+        )[..., 0] / 2
+    medians[counts == 0] = np.nan
+    return medians, counts
+
+
+def score_latest(
+    values: np.ndarray,
+    window: int,
+    evaluate_days: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Robust z-scores of the last ``evaluate_days`` columns of ``values``.
+
+    Args:
+        values: ``(accounts, days)`` array, NaN where there is no value
+        window: Preceding days that form each day's baseline
+        evaluate_days: Trailing days to score
+
+    Returns:
+        (scores, baselines, observations), each ``(accounts, evaluate_days)``;
+        scores are NaN where the day has no value
+    """
+    n_days = values.shape[1]
+    evaluate_days = min(evaluate_days, n_days)
+    # Window for day d is values[:, d - window:d]; pad so early days have one
+    padded = np.concatenate([np.full((values.shape[0], window), np.nan), values], axis=1)
+    windows = sliding_window_view(padded, window, axis=1)[:, n_days - evaluate_days:n_days]
+    current = values[:, n_days - evaluate_days:]
+
+    baselines, observations = nanmedian_last_axis(windows)
+    with np.errstate(invalid="ignore"):
+        mad, _ = nanmedian_last_axis(np.abs(windows - baselines[..., None]))
+        magnitude = np.abs(baselines)
+        floor = np.maximum(np.maximum(MIN_RELATIVE_SPREAD * magnitude, np.sqrt(magnitude)), 1.0)
+        spread = np.fmax(MAD_TO_SIGMA * mad, floor)
+        scores = (current - baselines) / spread
+    return scores, baselines, observations
+
+
+def detect_anomalies(
+    insights,
+    window: Optional[int] = None,
+    evaluate_days: Optional[int] = None,
+    threshold: Optional[float] = None,
+    min_observations: Optional[int] = None,
+) -> tuple[list[dict], Optional[datetime]]:
+    """
+    Find anomalies in the latest days of every account in ``insights``.
+
+    Args:
+        insights: Fleet insights frame (user_id, metric_name, metric_value,
+            collected_at); defaults for the rest come from config
+
+    Returns:
+        (anomaly rows for ``save_anomalies``, first evaluated day or None
+        if there was no data)
+    """
+    window = window or config.ANOMALY_WINDOW_DAYS
+    evaluate_days = evaluate_days or config.ANOMALY_EVALUATE_DAYS
+    threshold = threshold or config.ANOMALY_THRESHOLD
+    min_observations = min_observations or config.ANOMALY_MIN_OBSERVATIONS
+
+    user_ids, days, daily = daily_values(insights, ANOMALY_SERIES)
+    if len(days) == 0:
+        return [], None
+    evaluated = days[-min(evaluate_days, len(days)):]
+
+    rows = []
+    for metric, kind in ANOMALY_SERIES.items():
+        values = daily[metric]
+        name = metric
+        if kind == "change":
+            values, name = lag_delta(values, 1), CHANGE_NAMES[metric]
+        scores, baselines, observations = score_latest(values, window, evaluate_days)
+        current = values[:, -len(evaluated):]
+        with np.errstate(invalid="ignore"):
+            flagged = (np.abs(scores) >= threshold) & (observations >= min_observations)
+        for account, day in zip(*np.nonzero(flagged)):
+            score = float(scores[account, day])
+            rows.append(
+                {
+                    "user_id": int(user_ids[account]),
+                    "metric_name": name,
+                    "day": evaluated[day].date(),
+                    "value": float(current[account, day]),
+                    "baseline": float(baselines[account, day]),
+                    "score": round(score, 3),
+                    "direction": "drop" if score < 0 else "spike",
+                }
+            )
+    return rows, evaluated[0].to_pydatetime()
+
+
+def run_anomaly_detection(now: Optional[datetime] = None) -> dict:
+    """
+    Detect and store anomalies for the whole fleet (run after a collection).
+
+    Anomalies of the evaluated days are replaced, so a day that stops being
+    anomalous after a later collection is cleared.
+
+    Returns:
+        Summary with accounts, anomalies, by_metric and timings
+    """
+    now = now or datetime.now(timezone.utc)
+    started = time.perf_counter()
+    start = now - timedelta(days=config.ANOMALY_WINDOW_DAYS + config.ANOMALY_EVALUATE_DAYS)
+    insights = get_fleet_insights_frame(
+        start.replace(hour=0, minute=0, second=0, microsecond=0), list(ANOMALY_SERIES)
+    )
+    read_s = time.perf_counter() - started
+
+    rows, first_day = detect_anomalies(insights)
+    detect_s = time.perf_counter() - started - read_s
+    if first_day is not None:
+        save_anomalies(first_day.date(), rows)
+
+    return {
+        "accounts": int(insights["user_id"].nunique()) if not insights.empty else 0,
+        "insight_rows": len(insights),
+        "anomalies": len(rows),
+        "by_metric": dict(Counter(r["metric_name"] for r in rows)),
+        "read_s": round(read_s, 3),
+        "detect_s": round(detect_s, 3),
+        "total_s": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,94 @@
+"""Shared background executor for work started from the UI.
+
+Streamlit reruns the page script on every interaction, so anything slow
+(a manual refresh, the first-login collection) is submitted here instead of
+running inline: the page renders stored data immediately and polls the job
+(``get_job``) until it finishes. Jobs are keyed, so a second click or a
+second tab while a job is running attaches to the running job instead of
+starting another one.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from .config import config
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """State of a submitted job; updated by the worker, read by the page."""
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.status = PENDING
+        self.progress: list[str] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def report(self, message: str):
+        """Append a progress message (called from the job)."""
+        self.progress.append(message)
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=config.BACKGROUND_WORKERS, thread_name_prefix="background-job"
+)
+_jobs: dict[Hashable, Job] = {}
+_lock = threading.Lock()
+
+
+def _run(job: Job, func: Callable, args: tuple, kwargs: dict):
+    job.status = RUNNING
+    try:
+        job.result = func(*args, progress=job.report, **kwargs)
+        job.status = DONE
+    except Exception as e:
+        job.error = str(e)
+        job.status = FAILED
+    finally:
+        job.finished_at = time.time()
+
+
+def _prune(now: float):
+    expired = [
+        key
+        for key, job in _jobs.items()
+        if job.finished and now - job.finished_at > config.BACKGROUND_JOB_TTL_SECONDS
+    ]
+    for key in expired:
+        del _jobs[key]
+
+
+def submit(key: Hashable, func: Callable, *args, **kwargs) -> Job:
+    """
+    Run ``func(*args, progress=callback, **kwargs)`` on the shared executor.
+
+    Returns:
+        The new job, or the unfinished job already submitted under ``key``
+    """
+    with _lock:
+        _prune(time.time())
+        job = _jobs.get(key)
+        if job is not None and not job.finished:
+            return job
+        job = _jobs[key] = Job(key)
+    _executor.submit(_run, job, func, args, kwargs)
+    return job
+
+
+def get_job(key: Hashable) -> Optional[Job]:
+    """Return the latest job submitted under ``key`` (kept for a while after it finishes)."""
+    with _lock:
+        return _jobs.get(key)
@@ -0,0 +1,58 @@
+"""Short-lived in-process cache for live Graph reads.
+
+Entries expire ``ttl_seconds`` after they were loaded. Misses go through a
+``SingleFlight`` so a burst of page loads for the same key runs the loader
+once. Exceptions are never cached.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from .config import config
+from .singleflight import SingleFlight
+
+
+class TTLCache:
+    """Thread-safe TTL cache with a bounded number of entries (oldest evicted)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._flight = SingleFlight()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` if it has not expired, else ``default``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return default
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, loading and storing it on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        value = self._flight.do(key, loader)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def discard(self, key: Hashable):
+        """Drop ``key`` so the next read loads it again."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# Live Insights page sections, keyed by (user_id, section)
+live_cache = TTLCache(config.LIVE_CACHE_TTL_SECONDS)
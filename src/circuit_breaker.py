@@ -0,0 +1,103 @@
+"""Per-account circuit breaker for scheduled collection.
+
+An account whose collection fails with permanent Graph errors (revoked token,
+disconnected Instagram account, missing permission) ``CIRCUIT_FAILURE_THRESHOLD``
+cycles in a row is quarantined: the breaker opens and the collector skips it.
+Once ``next_probe_at`` passes the account is half-open and gets one probe
+collection; success closes the breaker, another permanent failure reopens it
+with a doubled probe interval (capped at ``CIRCUIT_PROBE_MAX_HOURS``).
+
+The functions here are pure; the collector persists the returned state with
+``save_account_health``.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .config import config
+from .instagram_api import PERMANENT
+from .models import AccountHealth
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def current_state(health: Optional[AccountHealth], now: Optional[datetime] = None) -> str:
+    """Return CLOSED, OPEN, or HALF_OPEN (open and due for a probe)."""
+    if health is None or health.state != OPEN:
+        return CLOSED
+    now = _as_utc(now or datetime.now(timezone.utc))
+    if health.next_probe_at is None or _as_utc(health.next_probe_at) <= now:
+        return HALF_OPEN
+    return OPEN
+
+
+def allows_collection(health: Optional[AccountHealth], now: Optional[datetime] = None) -> bool:
+    """Whether the collector should call the Graph API for this account now."""
+    return current_state(health, now) != OPEN
+
+
+def probe_interval(open_count: int) -> timedelta:
+    """Delay before probing an account opened ``open_count`` times in a row."""
+    hours = config.CIRCUIT_PROBE_BASE_HOURS * 2 ** max(open_count - 1, 0)
+    return timedelta(hours=min(hours, config.CIRCUIT_PROBE_MAX_HOURS))
+
+
+def record_success(health: Optional[AccountHealth]) -> Optional[AccountHealth]:
+    """
+    Close the breaker after a successful collection.
+
+    Returns:
+        The new state, or None if nothing changed (no write needed)
+    """
+    if health is None or (health.state == CLOSED and health.consecutive_failures == 0):
+        return None
+    return AccountHealth(user_id=health.user_id)
+
+
+def record_failure(
+    health: Optional[AccountHealth],
+    user_id: int,
+    error_class: Optional[str],
+    error_message: str,
+    now: Optional[datetime] = None,
+) -> Optional[AccountHealth]:
+    """
+    Count a failed collection; only permanent errors move the breaker.
+
+    Returns:
+        The new state, or None if nothing changed (no write needed)
+    """
+    if error_class != PERMANENT:
+        return None
+
+    now = _as_utc(now or datetime.now(timezone.utc))
+    health = health or AccountHealth(user_id=user_id)
+    failures = health.consecutive_failures + 1
+
+    if health.state == OPEN or failures >= config.CIRCUIT_FAILURE_THRESHOLD:
+        # Threshold reached, or a half-open probe failed: (re)open
+        open_count = health.open_count + 1
+        return AccountHealth(
+            user_id=user_id,
+            state=OPEN,
+            consecutive_failures=failures,
+            open_count=open_count,
+            last_error=error_message,
+            opened_at=health.opened_at if health.state == OPEN else now,
+            next_probe_at=now + probe_interval(open_count),
+        )
+
+    return AccountHealth(
+        user_id=user_id,
+        state=CLOSED,
+        consecutive_failures=failures,
+        last_error=error_message,
+    )
@@ -1,6 +1,10 @@
 """Configuration management for urlinsta."""
 
+import base64
+import json
 import os
+from typing import Optional
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,18 +18,138 @@ class Config:
     OAUTH_REDIRECT_URI: str = os.getenv("OAUTH_REDIRECT_URI", "")
     CONTACT_EMAIL: str = os.getenv("CONTACT_EMAIL", "")
 
+    # Storage backend: "supabase", "postgres" or "sqlite"
+    DATABASE_BACKEND: str = os.getenv("DATABASE_BACKEND", "supabase")
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "urlinsta.db")
+    # Direct Postgres connection (DATABASE_BACKEND=postgres)
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    DATABASE_POOL_MIN: int = int(os.getenv("DATABASE_POOL_MIN", "1"))
+    DATABASE_POOL_MAX: int = int(os.getenv("DATABASE_POOL_MAX", "10"))
+    # Rows per page for streamed history reads (keep <= PostgREST max-rows)
+    DB_PAGE_SIZE: int = int(os.getenv("DB_PAGE_SIZE", "1000"))
+
     # Supabase
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
 
     # Facebook Graph API
     GRAPH_API_VERSION: str = "v22.0"
-    GRAPH_API_BASE_URL: str = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+    # Override to point at a local stand-in (see bench/graph_simulator.py)
+    GRAPH_API_BASE_URL: str = os.getenv(
+        "GRAPH_API_BASE_URL", f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+    )
+
+    # Items per page requested from Graph list edges (see iter_graph_pages)
+    GRAPH_PAGE_LIMIT: int = int(os.getenv("GRAPH_PAGE_LIMIT", "100"))
+
+    # Shared executor for UI-triggered work (see src/background_jobs.py)
+    BACKGROUND_WORKERS: int = int(os.getenv("BACKGROUND_WORKERS", "4"))
+    BACKGROUND_JOB_TTL_SECONDS: int = 3600  # Finished jobs kept for polling pages
+
+    # Points per series sent to trend charts (about a wide chart's pixel width)
+    CHART_MAX_POINTS: int = int(os.getenv("CHART_MAX_POINTS", "800"))
+
+    # Seconds Live Insights reuses a user's Graph responses (see src/cache.py)
+    LIVE_CACHE_TTL_SECONDS: int = int(os.getenv("LIVE_CACHE_TTL_SECONDS", "60"))
+
+    # Instagram account ids allowed on the Admin page, comma-separated
+    ADMIN_INSTAGRAM_IDS: str = os.getenv("ADMIN_INSTAGRAM_IDS", "")
+
+    # Upper bound on how long derived metrics stay cached; a new collection
+    # invalidates them sooner (see src/derived_metrics.py)
+    DERIVED_CACHE_TTL_SECONDS: int = 6 * 3600
+
+    # Read-only HTTP API (src/http_api.py, needs the "api" extra)
+    API_HOST: str = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT: int = int(os.getenv("API_PORT", "8600"))
+    # Bearer tokens accepted by the API, comma-separated; empty disables auth
+    API_TOKENS: str = os.getenv("API_TOKENS", "")
+    API_CACHE_TTL_SECONDS: int = int(os.getenv("API_CACHE_TTL_SECONDS", "60"))
+    API_MAX_POINTS: int = 5000  # Upper bound for the series max_points parameter
+
+    # Rows buffered per Parquet row group by history exports (see src/export.py)
+    EXPORT_ROW_GROUP_ROWS: int = 50_000
+
+    # Post-collection anomaly detection (see src/anomaly_detection.py)
+    ANOMALY_WINDOW_DAYS: int = 28  # Days before each scored day that form its baseline
+    ANOMALY_EVALUATE_DAYS: int = 2  # Latest days (re)scored after every collection
+    ANOMALY_THRESHOLD: float = float(os.getenv("ANOMALY_THRESHOLD", "3.5"))  # Robust z-score
+    ANOMALY_MIN_OBSERVATIONS: int = 7  # Days of baseline required to score a day
 
     # Rate limiting
     RATE_LIMIT_REQUESTS: int = 180  # Conservative limit (Instagram allows 200/hour)
     RATE_LIMIT_WINDOW: int = 3600  # 1 hour in seconds
 
+    # Graph API retries (see InstagramAPI._request_with_retry)
+    API_MAX_ATTEMPTS: int = 5
+    # Longest server-requested wait (Retry-After) honored inline; longer
+    # throttles fail the call so the account is retried next cycle
+    API_MAX_RETRY_WAIT: int = 60
+
+    # Per-account circuit breaker (see src/circuit_breaker.py)
+    CIRCUIT_FAILURE_THRESHOLD: int = 3  # Consecutive permanent errors before quarantine
+    CIRCUIT_PROBE_BASE_HOURS: float = 6  # First probe delay, doubled on every failed probe
+    CIRCUIT_PROBE_MAX_HOURS: float = 168
+
+    # Days before a metric Graph rejected for an account is tried again
+    METRIC_CAPABILITY_RECHECK_DAYS: int = 7
+
+    # Media insights (see src/media_collector.py)
+    MEDIA_ACTIVE_DAYS: int = int(os.getenv("MEDIA_ACTIVE_DAYS", "7"))  # Re-collect posts this young
+    MEDIA_PAGE_SIZE: int = 50  # Posts per /media page
+    MEDIA_BATCH_SIZE: int = 50  # Posts per Graph batch request (Graph max is 50)
+    # Requests left untouched for insights/audience collection and logins
+    MEDIA_RESERVED_REQUESTS: int = int(os.getenv("MEDIA_RESERVED_REQUESTS", "60"))
+
+    # Insight periods collected per account tier (users.tier), as
+    # "tier:period,period;tier:period", e.g. "standard:day;pro:day,week,days_28"
+    COLLECTION_TIERS: str = os.getenv(
+        "COLLECTION_TIERS", "standard:day;pro:day,week,days_28"
+    )
+
+    def periods_for_tier(self, tier: str) -> list[str]:
+        """Insight periods to collect for an account tier (unknown tiers get "day")."""
+        for entry in self.COLLECTION_TIERS.split(";"):
+            name, _, periods = entry.partition(":")
+            if name.strip() == tier:
+                return [p.strip() for p in periods.split(",") if p.strip()] or ["day"]
+        return ["day"]
+
+    def is_admin(self, instagram_id: str) -> bool:
+        """Whether the account may open the Admin page (ADMIN_INSTAGRAM_IDS)."""
+        admins = {i.strip() for i in self.ADMIN_INSTAGRAM_IDS.split(",") if i.strip()}
+        return instagram_id in admins
+
+    def supabase_key_role(self) -> Optional[str]:
+        """Postgres role of SUPABASE_KEY ("anon", "service_role"), None if unrecognised."""
+        key = self.SUPABASE_KEY
+        if key.startswith("sb_secret_"):
+            return "service_role"
+        if key.startswith("sb_publishable_"):
+            return "anon"
+        # Legacy keys are JWTs; the role is a claim of the (unverified) payload
+        parts = key.split(".")
+        if len(parts) != 3:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+            return json.loads(payload).get("role")
+        except (ValueError, AttributeError):
+            return None
+
+    def can_read_fleet_overview(self) -> bool:
+        """Whether the database connection may read the Admin page's fleet overview.
+
+        On Supabase the fleet_overview view is only granted to the service
+        role, so the Admin page needs SUPABASE_KEY to be the service role key.
+        """
+        return self.DATABASE_BACKEND != "supabase" or self.supabase_key_role() == "service_role"
+
+    def is_api_token(self, token: str) -> bool:
+        """Whether ``token`` may read the HTTP API (always true without API_TOKENS)."""
+        tokens = {t.strip() for t in self.API_TOKENS.split(",") if t.strip()}
+        return not tokens or token in tokens
+
     @classmethod
     def validate(cls) -> list[str]:
         """Validate required configuration. Returns list of missing keys."""
@@ -34,9 +158,11 @@ class Config:
             "FB_APP_SECRET",
             "OAUTH_REDIRECT_URI",
             "CONTACT_EMAIL",
-            "SUPABASE_URL",
-            "SUPABASE_KEY",
         ]
+        if cls.DATABASE_BACKEND == "supabase":
+            required += ["SUPABASE_URL", "SUPABASE_KEY"]
+        elif cls.DATABASE_BACKEND == "postgres":
+            required += ["DATABASE_URL"]
         missing = [key for key in required if not getattr(cls, key)]
         return missing
 
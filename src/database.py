@@ -1,15 +1,38 @@
-"""Database operations for Supabase."""
+"""Database operations.
 
+Public functions here build the pydantic models; the reads and writes are
+delegated to the configured ``StorageBackend`` (Supabase by default, a direct
+Postgres connection pool, or an embedded SQLite database, see
+``Config.DATABASE_BACKEND``).
+"""
+
+import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional
+import pandas as pd
 from supabase import create_client, Client
 
+from .columnar import ColumnarFormat, rows_to_columns, to_format
 from .config import config
-from .models import User, Token, Insight, AudienceData, CollectionLog
+from .models import (
+    User,
+    Token,
+    Insight,
+    CollectionLog,
+    AccountHealth,
+    Anomaly,
+    FleetAccount,
+    UserRecord,
+    TokenRecord,
+)
+from .storage import StorageBackend
+
 
+INSIGHT_COLUMNS = ["id", "user_id", "metric_name", "metric_value", "period", "collected_at"]
 
 _client: Optional[Client] = None
+_backend: Optional[StorageBackend] = None
 
 
 def _parse_datetime(value) -> Optional[datetime]:
@@ -33,17 +56,71 @@ def _parse_datetime(value) -> Optional[datetime]:
     return None
 
 
-def _normalize_data_json(value) -> dict:
-    if isinstance(value, dict):
-        return value
-    if isinstance(value, str):
-        try:
-            parsed = json.loads(value)
-        except Exception:
-            return {}
-        if isinstance(parsed, dict):
-            return parsed
-    return {}
+def _user_from_row(row: dict) -> User:
+    return User(
+        id=row["id"],
+        instagram_id=row["instagram_id"],
+        instagram_username=row["instagram_username"],
+        facebook_page_id=row["facebook_page_id"],
+        tier=row.get("tier") or "standard",
+        created_at=row.get("created_at"),
+        updated_at=row.get("updated_at"),
+    )
+
+
+def _token_from_row(row: dict) -> Token:
+    return Token(
+        id=row["id"],
+        user_id=row["user_id"],
+        token_type=row["token_type"],
+        access_token=row["access_token"],
+        expires_at=_parse_datetime(row.get("expires_at")),
+        created_at=_parse_datetime(row.get("created_at")),
+    )
+
+
+def _user_record_from_row(row: dict) -> UserRecord:
+    return UserRecord(
+        row["id"],
+        row["instagram_id"],
+        row["instagram_username"],
+        row["facebook_page_id"],
+        row.get("tier") or "standard",
+    )
+
+
+def _token_record_from_row(row: dict) -> TokenRecord:
+    return TokenRecord(
+        row["id"],
+        row["user_id"],
+        row["token_type"],
+        row["access_token"],
+        _parse_datetime(row.get("expires_at")),
+    )
+
+
+def _insight_from_row(row: dict) -> Insight:
+    return Insight(
+        id=row["id"],
+        user_id=row["user_id"],
+        metric_name=row["metric_name"],
+        metric_value=row["metric_value"],
+        period=row["period"],
+        collected_at=row.get("collected_at"),
+    )
+
+
+def _account_health_from_row(row: dict) -> AccountHealth:
+    return AccountHealth(
+        user_id=row["user_id"],
+        state=row["state"],
+        consecutive_failures=row["consecutive_failures"],
+        open_count=row["open_count"],
+        last_error=row.get("last_error"),
+        opened_at=_parse_datetime(row.get("opened_at")),
+        next_probe_at=_parse_datetime(row.get("next_probe_at")),
+        updated_at=_parse_datetime(row.get("updated_at")),
+    )
 
 
 def get_client() -> Client:
@@ -54,101 +131,553 @@ def get_client() -> Client:
     return _client
 
 
+class SupabaseBackend(StorageBackend):
+    """Storage through the Supabase (PostgREST) client."""
+
+    def __init__(self, client: Optional[Client] = None):
+        self._client = client
+
+    @property
+    def client(self) -> Client:
+        return self._client or get_client()
+
+    def init(self):
+        # Tables should be created via Supabase Dashboard or SQL Editor
+        # This function just verifies connection
+        try:
+            self.client.table("users").select("id").limit(1).execute()
+        except Exception:
+            pass  # Table might not exist yet
+
+    # User operations
+    def get_user_by_instagram_id(self, instagram_id: str) -> Optional[dict]:
+        result = (
+            self.client.table("users")
+            .select("*")
+            .eq("instagram_id", instagram_id)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    def get_user_by_id(self, user_id: int) -> Optional[dict]:
+        result = self.client.table("users").select("*").eq("id", user_id).execute()
+        return result.data[0] if result.data else None
+
+    def get_all_users(self) -> list[dict]:
+        return self.client.table("users").select("*").execute().data
+
+    def upsert_user(
+        self, instagram_id: str, instagram_username: str, facebook_page_id: str
+    ) -> Optional[dict]:
+        existing = self.get_user_by_instagram_id(instagram_id)
+
+        if existing:
+            self.client.table("users").update(
+                {
+                    "instagram_username": instagram_username,
+                    "facebook_page_id": facebook_page_id,
+                    "updated_at": datetime.utcnow().isoformat(),
+                }
+            ).eq("instagram_id", instagram_id).execute()
+        else:
+            self.client.table("users").insert(
+                {
+                    "instagram_id": instagram_id,
+                    "instagram_username": instagram_username,
+                    "facebook_page_id": facebook_page_id,
+                }
+            ).execute()
+        return self.get_user_by_instagram_id(instagram_id)
+
+    def update_user_tier(self, user_id: int, tier: str):
+        self.client.table("users").update(
+            {"tier": tier, "updated_at": datetime.utcnow().isoformat()}
+        ).eq("id", user_id).execute()
+
+    # Token operations
+    def replace_token(
+        self,
+        user_id: int,
+        token_type: str,
+        access_token: str,
+        expires_at: Optional[datetime],
+    ):
+        # Delete existing token of same type
+        self.client.table("tokens").delete().eq("user_id", user_id).eq(
+            "token_type", token_type
+        ).execute()
+        # Insert new token
+        self.client.table("tokens").insert(
+            {
+                "user_id": user_id,
+                "token_type": token_type,
+                "access_token": access_token,
+                "expires_at": expires_at.isoformat() if expires_at else None,
+            }
+        ).execute()
+
+    def get_user_token(self, user_id: int, token_type: str) -> Optional[dict]:
+        result = (
+            self.client.table("tokens")
+            .select("*")
+            .eq("user_id", user_id)
+            .eq("token_type", token_type)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    def get_expiring_tokens(self, threshold: datetime) -> list[dict]:
+        result = (
+            self.client.table("tokens")
+            .select("*, users(*)")
+            .eq("token_type", "user")
+            .lt("expires_at", threshold.isoformat())
+            .order("expires_at")
+            .execute()
+        )
+        return result.data
+
+    # Insights operations
+    def insert_insights(self, rows: list[dict]):
+        self.client.table("insights").insert(rows).execute()
+
+    def insert_media_insights(self, rows: list[dict]):
+        self.client.table("media_insights").insert(
+            [{**r, "posted_at": r["posted_at"].isoformat()} for r in rows]
+        ).execute()
+
+    def iter_insight_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        metric_name: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        cursor = None
+        while True:
+            query = self.client.table("insights").select("*").eq("user_id", user_id)
+
+            if start_date:
+                query = query.gte("collected_at", start_date.isoformat())
+            if end_date:
+                query = query.lte("collected_at", end_date.isoformat())
+            if metric_name:
+                query = query.eq("metric_name", metric_name)
+            if cursor:
+                collected_at, last_id = cursor
+                query = query.or_(
+                    f'collected_at.lt."{collected_at}",'
+                    f'and(collected_at.eq."{collected_at}",id.lt.{last_id})'
+                )
+
+            rows = (
+                query.order("collected_at", desc=True)
+                .order("id", desc=True)
+                .limit(page_size)
+                .execute()
+                .data
+            )
+            # PostgREST may cap a page below page_size (db-max-rows), so only
+            # an empty page marks the end
+            if not rows:
+                return
+            yield rows
+            cursor = (rows[-1]["collected_at"], rows[-1]["id"])
+
+    def iter_fleet_insight_pages(
+        self,
+        start_date: datetime,
+        metric_names: list[str],
+        period: str = "day",
+        page_size: int = 1000,
+        user_ids: Optional[list[int]] = None,
+    ) -> Iterator[list[dict]]:
+        last_id = 0
+        while True:
+            query = (
+                self.client.table("insights")
+                .select("id,user_id,metric_name,metric_value,collected_at")
+                .gte("collected_at", start_date.isoformat())
+                .in_("metric_name", metric_names)
+                .eq("period", period)
+            )
+            if user_ids is not None:
+                query = query.in_("user_id", user_ids)
+            rows = query.gt("id", last_id).order("id").limit(page_size).execute().data
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    def get_latest_insights(self, user_id: int, period: str = "day") -> list[dict]:
+        # One row per metric and period, picked server-side by the latest_insights view
+        return (
+            self.client.table("latest_insights")
+            .select("*")
+            .eq("user_id", user_id)
+            .eq("period", period)
+            .execute()
+            .data
+        )
+
+    def get_last_collected_at(self, user_ids: list[int]) -> list[dict]:
+        # At most one row per user from the last_collected_at function; the
+        # ids go in the request body, chunked to stay under PostgREST max-rows
+        rows = []
+        for i in range(0, len(user_ids), config.DB_PAGE_SIZE):
+            chunk = user_ids[i : i + config.DB_PAGE_SIZE]
+            rows.extend(
+                self.client.rpc("last_collected_at", {"p_user_ids": chunk}).execute().data
+            )
+        return rows
+
+    # Audience data operations
+    def save_audience_snapshot(
+        self,
+        user_id: int,
+        metric: str,
+        dimension: str,
+        values: dict[str, float],
+        content_hash: str,
+    ) -> bool:
+        # One transaction server-side: a snapshot never becomes "latest"
+        # (and matches the dedup hash) without its values
+        return bool(
+            self.client.rpc(
+                "save_audience_snapshot",
+                {
+                    "p_user_id": user_id,
+                    "p_metric": metric,
+                    "p_dimension": dimension,
+                    "p_values": values,
+                    "p_content_hash": content_hash,
+                },
+            )
+            .execute()
+            .data
+        )
+
+    def get_latest_audience(self, user_id: int) -> list[dict]:
+        snapshots = {
+            s["id"]: s
+            for s in self.client.table("latest_audience_snapshots")
+            .select("*")
+            .eq("user_id", user_id)
+            .execute()
+            .data
+        }
+        if not snapshots:
+            return []
+        values = (
+            self.client.table("audience_values")
+            .select("*")
+            .in_("snapshot_id", list(snapshots))
+            .order("value", desc=True)
+            .execute()
+            .data
+        )
+        rows = [
+            {
+                "metric": snapshots[v["snapshot_id"]]["metric"],
+                "dimension": snapshots[v["snapshot_id"]]["dimension"],
+                "key": v["key"],
+                "value": v["value"],
+                "collected_at": snapshots[v["snapshot_id"]]["collected_at"],
+            }
+            for v in values
+        ]
+        return sorted(rows, key=lambda r: (r["metric"], r["dimension"]))
+
+    def get_audience_top(
+        self, user_id: int, metric: str, dimension: str, limit: int
+    ) -> list[dict]:
+        latest = (
+            self.client.table("latest_audience_snapshots")
+            .select("id")
+            .eq("user_id", user_id)
+            .eq("metric", metric)
+            .eq("dimension", dimension)
+            .execute()
+            .data
+        )
+        if not latest:
+            return []
+        return (
+            self.client.table("audience_values")
+            .select("key,value")
+            .eq("snapshot_id", latest[0]["id"])
+            .order("value", desc=True)
+            .order("key")
+            .limit(limit)
+            .execute()
+            .data
+        )
+
+    def get_audience_trend(
+        self,
+        user_id: int,
+        metric: str,
+        dimension: str,
+        keys: list[str],
+        start_date: Optional[datetime] = None,
+    ) -> list[dict]:
+        if not keys:
+            return []
+        query = (
+            self.client.table("audience_snapshots")
+            .select("id,collected_at,last_confirmed_at")
+            .eq("user_id", user_id)
+            .eq("metric", metric)
+            .eq("dimension", dimension)
+        )
+        if start_date:
+            query = query.gte("last_confirmed_at", start_date.isoformat())
+        snapshots = {s["id"]: s for s in query.execute().data}
+        if not snapshots:
+            return []
+        values = (
+            self.client.table("audience_values")
+            .select("*")
+            .in_("snapshot_id", list(snapshots))
+            .in_("key", keys)
+            .execute()
+            .data
+        )
+        rows = [
+            {
+                "collected_at": snapshots[v["snapshot_id"]]["collected_at"],
+                "last_confirmed_at": snapshots[v["snapshot_id"]]["last_confirmed_at"],
+                "key": v["key"],
+                "value": v["value"],
+                "id": v["snapshot_id"],
+            }
+            for v in values
+        ]
+        rows.sort(key=lambda r: (r["collected_at"], r.pop("id"), r["key"]))
+        return rows
+
+    def iter_audience_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        cursor = None
+        while True:
+            # Inner embed so the snapshot filters apply to the value rows
+            query = (
+                self.client.table("audience_values")
+                .select(
+                    "snapshot_id,key,value,"
+                    "audience_snapshots!inner(metric,dimension,collected_at,last_confirmed_at)"
+                )
+                .eq("audience_snapshots.user_id", user_id)
+            )
+            # Snapshots still current at start_date overlap the range
+            if start_date:
+                query = query.gte("audience_snapshots.last_confirmed_at", start_date.isoformat())
+            if end_date:
+                query = query.lte("audience_snapshots.collected_at", end_date.isoformat())
+            if cursor:
+                snapshot_id, key = cursor
+                key = key.replace("\\", "\\\\").replace('"', '\\"')
+                query = query.or_(
+                    f'snapshot_id.gt.{snapshot_id},and(snapshot_id.eq.{snapshot_id},key.gt."{key}")'
+                )
+
+            rows = query.order("snapshot_id").order("key").limit(page_size).execute().data
+            if not rows:
+                return
+            yield [
+                {
+                    "snapshot_id": r["snapshot_id"],
+                    **r["audience_snapshots"],
+                    "key": r["key"],
+                    "value": r["value"],
+                }
+                for r in rows
+            ]
+            cursor = (rows[-1]["snapshot_id"], rows[-1]["key"])
+
+    # Account health (circuit breaker) operations
+    def get_account_health(self, user_id: int) -> Optional[dict]:
+        result = (
+            self.client.table("account_health").select("*").eq("user_id", user_id).execute()
+        )
+        return result.data[0] if result.data else None
+
+    def get_all_account_health(self) -> list[dict]:
+        return self.client.table("account_health").select("*").execute().data
+
+    def upsert_account_health(self, row: dict):
+        self.client.table("account_health").upsert(
+            {
+                "user_id": row["user_id"],
+                "state": row["state"],
+                "consecutive_failures": row["consecutive_failures"],
+                "open_count": row["open_count"],
+                "last_error": row.get("last_error"),
+                "opened_at": row["opened_at"].isoformat() if row.get("opened_at") else None,
+                "next_probe_at": (
+                    row["next_probe_at"].isoformat() if row.get("next_probe_at") else None
+                ),
+                "updated_at": datetime.utcnow().isoformat(),
+            },
+            on_conflict="user_id",
+        ).execute()
+
+    # Metric capability operations
+    def get_metric_capabilities(self, user_id: Optional[int] = None) -> list[dict]:
+        query = self.client.table("metric_capabilities").select("*")
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        return query.execute().data
+
+    def upsert_metric_capabilities(self, rows: list[dict]):
+        now = datetime.utcnow().isoformat()
+        self.client.table("metric_capabilities").upsert(
+            [
+                {
+                    "user_id": r["user_id"],
+                    "metric_name": r["metric_name"],
+                    "period": r["period"],
+                    "supported": r["supported"],
+                    "checked_at": now,
+                }
+                for r in rows
+            ],
+            on_conflict="user_id,metric_name,period",
+        ).execute()
+
+    # Fleet overview operations
+    def refresh_fleet_overview(self):
+        self.client.rpc("refresh_fleet_overview").execute()
+
+    def get_fleet_overview(
+        self, sort_by: str, descending: bool, limit: int, offset: int
+    ) -> tuple[list[dict], int]:
+        result = (
+            self.client.table("fleet_overview")
+            .select("*", count="exact")
+            .order(sort_by, desc=descending, nullsfirst=False)
+            .order("user_id")
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
+        return result.data, result.count or 0
+
+    # Anomaly operations
+    def replace_anomalies(self, since_day: date, rows: list[dict]):
+        self.client.table("anomalies").delete().gte("day", since_day.isoformat()).execute()
+        if rows:
+            self.client.table("anomalies").insert(
+                [{**r, "day": r["day"].isoformat()} for r in rows]
+            ).execute()
+
+    def get_anomalies(self, user_id: int, since_day: date) -> list[dict]:
+        return (
+            self.client.table("anomalies")
+            .select("*")
+            .eq("user_id", user_id)
+            .gte("day", since_day.isoformat())
+            .order("day", desc=True)
+            .order("metric_name")
+            .execute()
+            .data
+        )
+
+    # Collection log operations
+    def insert_collection_log(
+        self,
+        user_id: int,
+        collection_type: str,
+        status: str,
+        error_message: Optional[str] = None,
+    ):
+        self.client.table("collection_log").insert(
+            {
+                "user_id": user_id,
+                "collection_type": collection_type,
+                "status": status,
+                "error_message": error_message,
+            }
+        ).execute()
+
+
+def _create_backend() -> StorageBackend:
+    backend = config.DATABASE_BACKEND.lower()
+    if backend == "supabase":
+        return SupabaseBackend()
+    if backend == "postgres":
+        from .postgres_backend import PostgresBackend
+
+        return PostgresBackend(
+            config.DATABASE_URL,
+            min_size=config.DATABASE_POOL_MIN,
+            max_size=config.DATABASE_POOL_MAX,
+        )
+    if backend == "sqlite":
+        from .sql_backend import SQLiteBackend
+
+        return SQLiteBackend(config.SQLITE_PATH)
+    raise ValueError(f"Unknown DATABASE_BACKEND: {config.DATABASE_BACKEND}")
+
+
+def get_backend() -> StorageBackend:
+    """Get or create the configured storage backend."""
+    global _backend
+    if _backend is None:
+        _backend = _create_backend()
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]):
+    """Replace the storage backend (tests, benchmarks). ``None`` resets to config."""
+    global _backend
+    _backend = backend
+
+
 def init_db():
-    """Initialize database tables. Run this SQL in Supabase SQL Editor first."""
-    # Tables should be created via Supabase Dashboard or SQL Editor
-    # This function just verifies connection
-    client = get_client()
-    # Test connection by checking if users table exists
-    try:
-        client.table("users").select("id").limit(1).execute()
-    except Exception:
-        pass  # Table might not exist yet
+    """Initialize database tables. For Supabase, run supabase_schema.sql in the SQL Editor first."""
+    get_backend().init()
 
 
 # User operations
 def get_user_by_instagram_id(instagram_id: str) -> Optional[User]:
     """Get user by Instagram ID."""
-    client = get_client()
-    result = (
-        client.table("users").select("*").eq("instagram_id", instagram_id).execute()
-    )
-    if result.data:
-        row = result.data[0]
-        return User(
-            id=row["id"],
-            instagram_id=row["instagram_id"],
-            instagram_username=row["instagram_username"],
-            facebook_page_id=row["facebook_page_id"],
-            created_at=row.get("created_at"),
-            updated_at=row.get("updated_at"),
-        )
-    return None
+    row = get_backend().get_user_by_instagram_id(instagram_id)
+    return _user_from_row(row) if row else None
 
 
 def get_user_by_id(user_id: int) -> Optional[User]:
     """Get user by internal ID."""
-    client = get_client()
-    result = client.table("users").select("*").eq("id", user_id).execute()
-    if result.data:
-        row = result.data[0]
-        return User(
-            id=row["id"],
-            instagram_id=row["instagram_id"],
-            instagram_username=row["instagram_username"],
-            facebook_page_id=row["facebook_page_id"],
-            created_at=row.get("created_at"),
-            updated_at=row.get("updated_at"),
-        )
-    return None
+    row = get_backend().get_user_by_id(user_id)
+    return _user_from_row(row) if row else None
 
 
 def get_all_users() -> list[User]:
     """Get all users."""
-    client = get_client()
-    result = client.table("users").select("*").execute()
-    return [
-        User(
-            id=r["id"],
-            instagram_id=r["instagram_id"],
-            instagram_username=r["instagram_username"],
-            facebook_page_id=r["facebook_page_id"],
-            created_at=r.get("created_at"),
-            updated_at=r.get("updated_at"),
-        )
-        for r in result.data
-    ]
+    return [_user_from_row(r) for r in get_backend().get_all_users()]
+
+
+def get_all_user_records() -> list[UserRecord]:
+    """Get all users as lightweight records (collector hot path)."""
+    return [_user_record_from_row(r) for r in get_backend().get_all_users()]
 
 
 def create_or_update_user(
     instagram_id: str, instagram_username: str, facebook_page_id: str
 ) -> User:
     """Create or update a user."""
-    client = get_client()
-    existing = get_user_by_instagram_id(instagram_id)
+    row = get_backend().upsert_user(instagram_id, instagram_username, facebook_page_id)
+    return _user_from_row(row) if row else None
 
-    if existing:
-        client.table("users").update(
-            {
-                "instagram_username": instagram_username,
-                "facebook_page_id": facebook_page_id,
-                "updated_at": datetime.utcnow().isoformat(),
-            }
-        ).eq("instagram_id", instagram_id).execute()
-        return get_user_by_instagram_id(instagram_id)
-    else:
-        result = (
-            client.table("users")
-            .insert(
-                {
-                    "instagram_id": instagram_id,
-                    "instagram_username": instagram_username,
-                    "facebook_page_id": facebook_page_id,
-                }
-            )
-            .execute()
-        )
-        return get_user_by_instagram_id(instagram_id)
+
+def set_user_tier(user_id: int, tier: str):
+    """Set a user's collection tier (see ``Config.COLLECTION_TIERS``)."""
+    get_backend().update_user_tier(user_id, tier)
 
 
 # Token operations
@@ -159,82 +688,33 @@ def save_token(
     expires_at: Optional[datetime] = None,
 ):
     """Save or update a token."""
-    client = get_client()
-    # Delete existing token of same type
-    client.table("tokens").delete().eq("user_id", user_id).eq(
-        "token_type", token_type
-    ).execute()
-    # Insert new token
-    client.table("tokens").insert(
-        {
-            "user_id": user_id,
-            "token_type": token_type,
-            "access_token": access_token,
-            "expires_at": expires_at.isoformat() if expires_at else None,
-        }
-    ).execute()
+    get_backend().replace_token(user_id, token_type, access_token, expires_at)
 
 
 def get_user_token(user_id: int, token_type: str) -> Optional[Token]:
     """Get token for a user."""
-    client = get_client()
-    result = (
-        client.table("tokens")
-        .select("*")
-        .eq("user_id", user_id)
-        .eq("token_type", token_type)
-        .execute()
-    )
-    if result.data:
-        row = result.data[0]
-        return Token(
-            id=row["id"],
-            user_id=row["user_id"],
-            token_type=row["token_type"],
-            access_token=row["access_token"],
-            expires_at=_parse_datetime(row.get("expires_at")),
-            created_at=_parse_datetime(row.get("created_at")),
-        )
-    return None
+    row = get_backend().get_user_token(user_id, token_type)
+    return _token_from_row(row) if row else None
 
 
-def get_expiring_tokens(days: int = 7) -> list[tuple[User, Token]]:
-    """Get tokens expiring within specified days."""
-    client = get_client()
-    threshold = (datetime.utcnow() + timedelta(days=days)).isoformat()
+def get_user_token_record(user_id: int, token_type: str) -> Optional[TokenRecord]:
+    """Get token for a user as a lightweight record."""
+    row = get_backend().get_user_token(user_id, token_type)
+    return _token_record_from_row(row) if row else None
 
-    result = (
-        client.table("tokens")
-        .select("*, users(*)")
-        .eq("token_type", "user")
-        .lt("expires_at", threshold)
-        .execute()
-    )
 
+def get_expiring_token_records(days: float = 7) -> list[tuple[UserRecord, TokenRecord]]:
+    """Get expiring user tokens as lightweight records, soonest first."""
+    threshold = datetime.utcnow() + timedelta(days=days)
     return [
-        (
-            User(
-                id=r["users"]["id"],
-                instagram_id=r["users"]["instagram_id"],
-                instagram_username=r["users"]["instagram_username"],
-                facebook_page_id=r["users"]["facebook_page_id"],
-            ),
-            Token(
-                id=r["id"],
-                user_id=r["user_id"],
-                token_type=r["token_type"],
-                access_token=r["access_token"],
-                expires_at=_parse_datetime(r.get("expires_at")),
-            ),
-        )
-        for r in result.data
+        (_user_record_from_row(r["users"]), _token_record_from_row(r))
+        for r in get_backend().get_expiring_tokens(threshold)
     ]
 
 
 # Insights operations
 def save_insights(user_id: int, insights: list[dict]):
     """Save multiple insight records."""
-    client = get_client()
     rows = [
         {
             "user_id": user_id,
@@ -245,7 +725,56 @@ def save_insights(user_id: int, insights: list[dict]):
         for insight in insights
     ]
     if rows:
-        client.table("insights").insert(rows).execute()
+        get_backend().insert_insights(rows)
+
+
+def save_media_insights(user_id: int, media_insights: list[dict]):
+    """
+    Save media insight records in one bulk insert.
+
+    Each record carries media_id, media_type, media_product_type, posted_at
+    (datetime), metric_name and metric_value.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "media_id": m["media_id"],
+            "media_type": m.get("media_type"),
+            "media_product_type": m.get("media_product_type"),
+            "posted_at": m["posted_at"],
+            "metric_name": m["metric_name"],
+            "metric_value": m["metric_value"],
+        }
+        for m in media_insights
+    ]
+    if rows:
+        get_backend().insert_media_insights(rows)
+
+
+def iter_insight_pages(
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    metric_name: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[list[dict]]:
+    """Stream raw insights rows newest first, one keyset-paginated page at a time."""
+    return get_backend().iter_insight_pages(
+        user_id, start_date, end_date, metric_name, page_size or config.DB_PAGE_SIZE
+    )
+
+
+def iter_insights(
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    metric_name: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[Insight]:
+    """Stream insights newest first without loading the whole range."""
+    for page in iter_insight_pages(user_id, start_date, end_date, metric_name, page_size):
+        for r in page:
+            yield _insight_from_row(r)
 
 
 def get_insights(
@@ -255,84 +784,299 @@ def get_insights(
     metric_name: Optional[str] = None,
 ) -> list[Insight]:
     """Get insights with optional filters."""
-    client = get_client()
-    query = client.table("insights").select("*").eq("user_id", user_id)
+    return list(iter_insights(user_id, start_date, end_date, metric_name))
 
-    if start_date:
-        query = query.gte("collected_at", start_date.isoformat())
-    if end_date:
-        query = query.lte("collected_at", end_date.isoformat())
-    if metric_name:
-        query = query.eq("metric_name", metric_name)
 
-    result = query.order("collected_at", desc=True).execute()
+def get_insights_columns(
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    metric_name: Optional[str] = None,
+    format: ColumnarFormat = "numpy",
+    page_size: Optional[int] = None,
+):
+    """
+    Get insights as columns, skipping per-row ``Insight`` validation.
 
-    return [
-        Insight(
-            id=r["id"],
-            user_id=r["user_id"],
-            metric_name=r["metric_name"],
-            metric_value=r["metric_value"],
-            period=r["period"],
-            collected_at=r.get("collected_at"),
-        )
-        for r in result.data
-    ]
+    Returns dict of NumPy arrays (``format="numpy"``), a DataFrame (``"pandas"``)
+    or a pyarrow Table (``"arrow"``) with columns id, user_id, metric_name,
+    metric_value, period, collected_at, newest first.
+    """
+    columns = rows_to_columns(
+        iter_insight_pages(user_id, start_date, end_date, metric_name, page_size),
+        INSIGHT_COLUMNS,
+        datetime_columns=("collected_at",),
+        float_columns=("metric_value",),
+        int_columns=("id", "user_id"),
+    )
+    return to_format(columns, format, datetime_columns=("collected_at",))
 
 
-def get_latest_insights(user_id: int) -> dict[str, Insight]:
-    """Get the latest value for each metric."""
-    client = get_client()
-    # Get all insights and group by metric_name, taking the latest
-    result = (
-        client.table("insights")
-        .select("*")
-        .eq("user_id", user_id)
-        .order("collected_at", desc=True)
-        .execute()
+def get_insights_frame(
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    metric_name: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> pd.DataFrame:
+    """Get insights as a DataFrame (UTC ``collected_at``), newest first."""
+    return get_insights_columns(
+        user_id, start_date, end_date, metric_name, format="pandas", page_size=page_size
     )
 
-    latest = {}
-    for r in result.data:
-        metric = r["metric_name"]
-        if metric not in latest:
-            latest[metric] = Insight(
-                id=r["id"],
-                user_id=r["user_id"],
-                metric_name=r["metric_name"],
-                metric_value=r["metric_value"],
-                period=r["period"],
-                collected_at=r.get("collected_at"),
-            )
-    return latest
+
+def get_fleet_insights_frame(
+    start_date: datetime,
+    metric_names: list[str],
+    period: str = "day",
+    page_size: Optional[int] = None,
+    user_ids: Optional[list[int]] = None,
+) -> pd.DataFrame:
+    """
+    Get every account's insights since ``start_date`` as one DataFrame (one scan).
+
+    Args:
+        user_ids: Only these accounts (default: the whole fleet)
+    """
+    columns = ["user_id", "metric_name", "metric_value", "collected_at"]
+    pages = get_backend().iter_fleet_insight_pages(
+        start_date,
+        metric_names,
+        period,
+        page_size or config.DB_PAGE_SIZE,
+        list(user_ids) if user_ids is not None else None,
+    )
+    return to_format(
+        rows_to_columns(
+            pages,
+            columns,
+            datetime_columns=("collected_at",),
+            float_columns=("metric_value",),
+            int_columns=("user_id",),
+        ),
+        "pandas",
+        datetime_columns=("collected_at",),
+    )
+
+
+def get_last_collected_at(user_ids: list[int]) -> dict[int, datetime]:
+    """Time of each user's newest stored insight, by user ID (users without any omitted)."""
+    return {
+        r["user_id"]: _parse_datetime(r["collected_at"])
+        for r in get_backend().get_last_collected_at(list(user_ids))
+    }
+
+
+def get_latest_insights(user_id: int, period: str = "day") -> dict[str, Insight]:
+    """Get the latest value of ``period`` (daily by default) for each metric."""
+    return {
+        r["metric_name"]: _insight_from_row(r)
+        for r in get_backend().get_latest_insights(user_id, period)
+    }
 
 
 # Audience data operations
-def save_audience_data(user_id: int, data_type: str, data: dict):
-    """Save audience data."""
-    client = get_client()
-    client.table("audience_data").insert(
-        {"user_id": user_id, "data_type": data_type, "data_json": json.dumps(data)}
-    ).execute()
+def audience_content_hash(values: dict[str, float]) -> str:
+    """Hash of a breakdown's key/value pairs, independent of key order."""
+    canonical = json.dumps(sorted(values.items()), separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def save_audience_data(user_id: int, data_type: str, data: dict) -> bool:
+    """
+    Save one audience breakdown (``data_type`` is ``{metric}_{dimension}``).
+
+    A breakdown identical to the newest stored one is not stored again; the
+    newest snapshot's ``last_confirmed_at`` is updated instead.
+
+    Returns:
+        True if a new snapshot was stored, False if it was unchanged
+    """
+    metric, _, dimension = data_type.rpartition("_")
+    values = {str(k): float(v) for k, v in data.items()}
+    return get_backend().save_audience_snapshot(
+        user_id, metric, dimension, values, audience_content_hash(values)
+    )
 
 
 def get_latest_audience_data(user_id: int) -> dict[str, dict]:
-    """Get latest audience data by type."""
-    client = get_client()
-    result = (
-        client.table("audience_data")
-        .select("*")
-        .eq("user_id", user_id)
-        .order("collected_at", desc=True)
-        .execute()
+    """Get the latest breakdown of each type, largest values first."""
+    audience: dict[str, dict] = {}
+    for r in get_backend().get_latest_audience(user_id):
+        audience.setdefault(f"{r['metric']}_{r['dimension']}", {})[r["key"]] = r["value"]
+    return audience
+
+
+def get_audience_top(
+    user_id: int, metric: str, dimension: str, limit: int = 10
+) -> list[tuple[str, float]]:
+    """Get the ``limit`` largest keys of the latest breakdown (indexed query)."""
+    return [
+        (r["key"], r["value"])
+        for r in get_backend().get_audience_top(user_id, metric, dimension, limit)
+    ]
+
+
+def get_audience_trend(
+    user_id: int,
+    metric: str,
+    dimension: str,
+    keys: list[str],
+    start_date: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    Get the values of ``keys`` across snapshots (collected_at, key, value), oldest first.
+
+    An unchanged snapshot also yields its values at ``last_confirmed_at``, so
+    a breakdown that stayed the same still spans the whole period; snapshots
+    collected before ``start_date`` but confirmed after it start at
+    ``start_date``.
+    """
+    rows = []
+    for r in get_backend().get_audience_trend(user_id, metric, dimension, keys, start_date):
+        rows.append(r)
+        confirmed = r.get("last_confirmed_at")
+        if confirmed and confirmed != r["collected_at"]:
+            rows.append({**r, "collected_at": confirmed})
+    trend = to_format(
+        rows_to_columns(
+            [rows],
+            ["collected_at", "key", "value"],
+            datetime_columns=("collected_at",),
+            float_columns=("value",),
+        ),
+        "pandas",
+        datetime_columns=("collected_at",),
+    )
+    if start_date:
+        start = pd.Timestamp(start_date)
+        start = start.tz_localize("UTC") if start.tzinfo is None else start.tz_convert("UTC")
+        trend["collected_at"] = trend["collected_at"].clip(lower=start)
+    return trend.sort_values(["collected_at", "key"], kind="stable", ignore_index=True)
+
+
+def iter_audience_pages(
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[list[dict]]:
+    """Stream a user's audience history rows oldest first, one keyset-paginated page at a time."""
+    return get_backend().iter_audience_pages(
+        user_id, start_date, end_date, page_size or config.DB_PAGE_SIZE
+    )
+
+
+# Account health (circuit breaker) operations
+def get_account_health(user_id: int) -> Optional[AccountHealth]:
+    """Get a user's circuit breaker state (None means healthy)."""
+    row = get_backend().get_account_health(user_id)
+    return _account_health_from_row(row) if row else None
+
+
+def get_all_account_health() -> dict[int, AccountHealth]:
+    """Get circuit breaker state for every account that has one, by user ID."""
+    return {
+        r["user_id"]: _account_health_from_row(r)
+        for r in get_backend().get_all_account_health()
+    }
+
+
+def save_account_health(health: AccountHealth):
+    """Persist a user's circuit breaker state."""
+    get_backend().upsert_account_health(health.model_dump())
+
+
+def reset_account_health(user_id: int):
+    """Close a user's circuit breaker (e.g. after they log in again)."""
+    save_account_health(AccountHealth(user_id=user_id))
+
+
+# Metric capability operations
+def get_metric_capabilities(
+    user_id: Optional[int] = None,
+) -> dict[int, dict[tuple[str, str], bool]]:
+    """
+    Get learned metric/period support, by user ID.
+
+    Unsupported entries older than ``METRIC_CAPABILITY_RECHECK_DAYS`` are
+    dropped so the metric is tried again (accounts gain audience metrics as
+    they grow, and Graph changes metric availability between versions).
+    """
+    recheck_before = datetime.now(timezone.utc) - timedelta(
+        days=config.METRIC_CAPABILITY_RECHECK_DAYS
     )
+    capabilities: dict[int, dict[tuple[str, str], bool]] = {}
+    for r in get_backend().get_metric_capabilities(user_id):
+        checked_at = _parse_datetime(r.get("checked_at"))
+        if checked_at and checked_at.tzinfo is None:
+            checked_at = checked_at.replace(tzinfo=timezone.utc)
+        if not r["supported"] and (checked_at is None or checked_at < recheck_before):
+            continue
+        capabilities.setdefault(r["user_id"], {})[(r["metric_name"], r["period"])] = r["supported"]
+    return capabilities
 
-    latest = {}
-    for r in result.data:
-        data_type = r["data_type"]
-        if data_type not in latest:
-            latest[data_type] = _normalize_data_json(r.get("data_json"))
-    return latest
+
+def save_metric_capabilities(user_id: int, capabilities: dict[tuple[str, str], bool]):
+    """Persist learned metric/period support for a user."""
+    if not capabilities:
+        return
+    get_backend().upsert_metric_capabilities(
+        [
+            {"user_id": user_id, "metric_name": metric, "period": period, "supported": supported}
+            for (metric, period), supported in capabilities.items()
+        ]
+    )
+
+
+# Fleet overview operations
+FLEET_SORT_COLUMNS = (
+    "instagram_username",
+    "tier",
+    "followers",
+    "followers_delta",
+    "reach",
+    "reach_delta",
+    "last_collected_at",
+    "last_success_at",
+    "error_rate_7d",
+    "failures_7d",
+    "circuit_state",
+)
+
+
+def refresh_fleet_overview():
+    """Recompute the fleet overview (run after each collection cycle)."""
+    get_backend().refresh_fleet_overview()
+
+
+def get_fleet_overview(
+    sort_by: str = "followers",
+    descending: bool = True,
+    limit: int = 50,
+    offset: int = 0,
+) -> tuple[list[FleetAccount], int]:
+    """
+    Get one page of the fleet overview, sorted server-side.
+
+    Returns:
+        (accounts on this page, total accounts)
+    """
+    if sort_by not in FLEET_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort fleet overview by {sort_by!r}")
+    rows, total = get_backend().get_fleet_overview(sort_by, descending, limit, offset)
+    return [FleetAccount(**row) for row in rows], total
+
+
+# Anomaly operations
+def save_anomalies(since_day: date, anomalies: list[dict]):
+    """Replace every anomaly from ``since_day`` on with the latest detection run's."""
+    get_backend().replace_anomalies(since_day, anomalies)
+
+
+def get_anomalies(user_id: int, since_day: date) -> list[Anomaly]:
+    """Get a user's anomalies from ``since_day`` on, newest day first."""
+    return [Anomaly(**r) for r in get_backend().get_anomalies(user_id, since_day)]
 
 
 # Collection log operations
@@ -340,12 +1084,4 @@ def log_collection(
     user_id: int, collection_type: str, status: str, error_message: Optional[str] = None
 ):
     """Log a collection attempt."""
-    client = get_client()
-    client.table("collection_log").insert(
-        {
-            "user_id": user_id,
-            "collection_type": collection_type,
-            "status": status,
-            "error_message": error_message,
-        }
-    ).execute()
+    get_backend().insert_collection_log(user_id, collection_type, status, error_message)
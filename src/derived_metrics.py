@@ -0,0 +1,200 @@
+"""Derived metrics computed from the stored insights time series.
+
+Insights are collected several times a day; derived metrics work on one
+value per account, metric and UTC day (the day's last collection). The
+daily values are laid out as ``(accounts, days)`` NumPy arrays so every
+metric below is a whole-array operation, for one account or the fleet:
+
+- ``follower_growth``: followers gained since the previous day
+- ``engagement_rate``: ``total_interactions / reach`` for the day
+- ``<metric>_ma<window>``: trailing moving average over ``window`` days
+  (days without data are skipped, not counted as zero)
+- ``<metric>_wow``: change against the same day a week earlier
+
+Results are cached until a new collection lands for one of the accounts.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import TTLCache
+from .config import config
+from .database import get_fleet_insights_frame, get_last_collected_at
+
+BASE_METRICS = ("follower_count", "reach", "total_interactions")
+# Metrics that get a moving average and a week-over-week delta
+TREND_METRICS = ("follower_count", "reach", "total_interactions", "engagement_rate")
+WEEK_DAYS = 7
+# Reads without a start date begin here
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+derived_cache = TTLCache(config.DERIVED_CACHE_TTL_SECONDS, max_entries=256)
+
+
+def daily_values(
+    insights: pd.DataFrame, metrics: Iterable[str] = BASE_METRICS
+) -> tuple[np.ndarray, pd.DatetimeIndex, dict[str, np.ndarray]]:
+    """
+    Lay out ``period == "day"`` insights as one ``(accounts, days)`` array per metric.
+
+    Args:
+        insights: Frame with user_id, metric_name, metric_value, collected_at
+            (and optionally period), e.g. ``get_insights_frame``
+        metrics: Metrics to lay out; missing ones are all-NaN
+
+    Returns:
+        (sorted user ids, consecutive UTC days, metric -> array); cells
+        without a collection are NaN
+    """
+    metrics = list(metrics)
+    df = insights
+    if "period" in df:
+        df = df[df["period"] == "day"]
+    # Factorizing once is much cheaper than isin + Categorical on string columns
+    names, found = pd.factorize(df["metric_name"])
+    # Trailing -1 maps factorize's missing-value code (-1) to "not wanted"
+    lookup = np.array([metrics.index(m) if m in metrics else -1 for m in found] + [-1])
+    metric_codes = lookup[names]
+    df = df[metric_codes >= 0]
+    metric_codes = metric_codes[metric_codes >= 0]
+    if df.empty:
+        return np.array([], dtype=np.int64), pd.DatetimeIndex([], tz="UTC"), {
+            m: np.empty((0, 0)) for m in metrics
+        }
+
+    collected = pd.to_datetime(df["collected_at"], utc=True).dt.tz_convert(None)
+    ns = collected.to_numpy(dtype="datetime64[ns]")
+
+    users, user_ids = pd.factorize(df["user_id"].to_numpy(dtype=np.int64), sort=True)
+    day = ns.astype("datetime64[D]").astype(np.int64)
+    first_day = day.min()
+    n_users, n_days = len(user_ids), int(day.max() - first_day) + 1
+    n_cells = len(metrics) * n_users * n_days
+
+    # Keep each cell's last collection: the rows whose time equals the
+    # cell's latest time (no sort needed)
+    cell = (metric_codes * n_users + users) * n_days + (day - first_day)
+    ns = ns.astype(np.int64)
+    latest = np.full(n_cells, np.iinfo(np.int64).min)
+    np.maximum.at(latest, cell, ns)
+    last = ns == latest[cell]
+
+    cube = np.full(n_cells, np.nan)
+    cube[cell[last]] = df["metric_value"].to_numpy(dtype=np.float64)[last]
+    cube = cube.reshape(len(metrics), n_users, n_days)
+
+    days = pd.date_range(
+        pd.Timestamp(int(first_day), unit="D", tz="UTC"), periods=n_days, freq="D"
+    ).as_unit("ns")
+    return user_ids, days, {m: cube[i] for i, m in enumerate(metrics)}
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` columns, ignoring NaN (NaN if the window is empty)."""
+    # Window sums as differences of running sums
+    window_sums = np.cumsum(np.nan_to_num(values), axis=1)
+    window_counts = np.cumsum(~np.isnan(values), axis=1)
+    window_sums[:, window:] -= window_sums[:, :-window].copy()
+    window_counts[:, window:] -= window_counts[:, :-window].copy()
+    return np.divide(
+        window_sums, window_counts, out=np.full(values.shape, np.nan), where=window_counts > 0
+    )
+
+
+def lag_delta(values: np.ndarray, lag: int) -> np.ndarray:
+    """Change against the value ``lag`` columns earlier (NaN for the first ``lag``)."""
+    delta = np.full(values.shape, np.nan)
+    delta[:, lag:] = values[:, lag:] - values[:, :-lag]
+    return delta
+
+
+def derived_metric_names(window: int = WEEK_DAYS) -> list[str]:
+    """Metric columns of ``compute_derived_metrics``, in order."""
+    return [
+        "follower_growth",
+        "engagement_rate",
+        *(f"{metric}_ma{window}" for metric in TREND_METRICS),
+        *(f"{metric}_wow" for metric in TREND_METRICS),
+    ]
+
+
+def compute_derived_metrics(insights: pd.DataFrame, window: int = WEEK_DAYS) -> pd.DataFrame:
+    """
+    Compute derived metrics for every account in ``insights``.
+
+    Returns:
+        One row per account and UTC day with at least one value: user_id,
+        date, follower_growth, engagement_rate, then ``<metric>_ma<window>``
+        and ``<metric>_wow`` for each of ``TREND_METRICS``
+    """
+    user_ids, days, daily = daily_values(insights)
+
+    reach = daily["reach"]
+    series = {
+        "follower_growth": lag_delta(daily["follower_count"], 1),
+        "engagement_rate": np.divide(
+            daily["total_interactions"], reach, out=np.full(reach.shape, np.nan), where=reach > 0
+        ),
+    }
+    base = {**daily, "engagement_rate": series["engagement_rate"]}
+    for metric in TREND_METRICS:
+        series[f"{metric}_ma{window}"] = moving_average(base[metric], window)
+    for metric in TREND_METRICS:
+        series[f"{metric}_wow"] = lag_delta(base[metric], WEEK_DAYS)
+
+    frame = pd.DataFrame(
+        {
+            "user_id": np.repeat(user_ids, len(days)),
+            "date": pd.DatetimeIndex(np.tile(days.tz_localize(None).values, len(user_ids)), tz="UTC"),
+            **{name: values.ravel() for name, values in series.items()},
+        }
+    )
+    return frame.dropna(how="all", subset=list(series)).reset_index(drop=True)
+
+
+def _utc_day(value: Optional[datetime]):
+    """UTC calendar day of a timestamp (naive timestamps are taken as UTC)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date()
+
+
+def get_derived_metrics(
+    user_ids: Iterable[int],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    window: int = WEEK_DAYS,
+) -> pd.DataFrame:
+    """
+    Derived metrics for the given accounts from ``start_date`` (UTC days).
+
+    Enough history before ``start_date`` is read for the first days'
+    moving averages and weekly deltas. Cached per collection cycle: a new
+    collection for any of the accounts computes the result again. Both the
+    cache check and the load are one query for all the accounts.
+    """
+    user_ids = tuple(sorted(set(user_ids)))
+    start_day, end_day = _utc_day(start_date), _utc_day(end_date)
+    last_collected = get_last_collected_at(list(user_ids)) if user_ids else {}
+    markers = tuple(last_collected.get(uid) for uid in user_ids)
+
+    def load() -> pd.DataFrame:
+        read_from = _EPOCH
+        if start_day:
+            lookback = timedelta(days=max(window, WEEK_DAYS))
+            read_from = datetime.combine(start_day, datetime.min.time(), timezone.utc) - lookback
+        insights = get_fleet_insights_frame(read_from, list(BASE_METRICS), user_ids=list(user_ids))
+        if end_date:
+            end = end_date if end_date.tzinfo else end_date.replace(tzinfo=timezone.utc)
+            insights = insights[insights["collected_at"] <= end]
+        derived = compute_derived_metrics(insights, window)
+        if start_day:
+            derived = derived[derived["date"].dt.date >= start_day].reset_index(drop=True)
+        return derived
+
+    return derived_cache.get_or_load((user_ids, start_day, end_day, window, markers), load)
@@ -0,0 +1,137 @@
+"""Downsampling of time series before they are charted.
+
+A line chart cannot show more points than it has horizontal pixels, so
+long histories are reduced to about ``max_points`` per series before they
+are handed to plotly. Both reducers keep the first and last point and
+return indices into the input, so every kept point is a real observation:
+
+- ``lttb_indices``: Largest-Triangle-Three-Buckets, which keeps the point
+  of each bucket that forms the largest triangle with its neighbours and
+  so preserves the visual shape (peaks, dips) of the line
+- ``minmax_indices``: keeps the minimum and maximum of each bucket; fully
+  vectorized and exact about extremes
+"""
+
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+DownsampleMethod = Literal["lttb", "minmax"]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Sorted x values (numeric; convert datetimes to int64 first)
+        y: y values, same length as ``x``
+        max_points: Points to keep (at least 3)
+
+    Returns:
+        Sorted int64 indices, ``min(len(x), max_points)`` of them
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket i (of max_points - 2) covers [edges[i], edges[i + 1]); the first
+    # and last points are buckets of their own
+    edges = (np.arange(max_points - 1) * (n - 2) / (max_points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Mean of every bucket in one pass; the last point stands in for the
+    # bucket after the final one
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the triangle area (a, candidate, next bucket mean); the
+        # constant factor does not change the argmax
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of each bucket's minimum and maximum (``max_points // 2`` buckets).
+
+    Returns:
+        Sorted unique int64 indices, including the first and last point
+    """
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    buckets = max(1, (max_points - 2) // 2)
+    starts = np.arange(buckets) * n // buckets
+    counts = np.diff(np.append(starts, n))
+    kept = [np.array([0, n - 1])]
+    for reduce in (np.minimum, np.maximum):
+        # Flag each bucket's extreme, then keep the first flagged index per bucket
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        hits = np.flatnonzero(y == extreme)
+        bucket = np.searchsorted(starts, hits, side="right") - 1
+        first = np.flatnonzero(np.diff(bucket, prepend=-1))
+        kept.append(hits[first])
+    return np.unique(np.concatenate(kept))
+
+
+def downsample_frame(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    series: str,
+    max_points: int,
+    method: DownsampleMethod = "lttb",
+) -> pd.DataFrame:
+    """
+    Reduce every series in a long-format frame to about ``max_points`` rows.
+
+    Args:
+        df: One row per observation; ``x`` may be numeric or datetime
+        x, y: Column names of the x and y values
+        series: Column naming the series (e.g. the metric)
+        max_points: Points to keep per series
+        method: "lttb" or "minmax"
+
+    Returns:
+        The kept rows, sorted by series and ``x``
+    """
+    if df.empty:
+        return df
+
+    parts = []
+    for _, group in df.sort_values([series, x]).groupby(series, sort=False):
+        if len(group) <= max_points:
+            parts.append(group)
+            continue
+        y_values = group[y].to_numpy(dtype=np.float64)
+        if method == "minmax":
+            kept = minmax_indices(y_values, max_points)
+        elif method == "lttb":
+            x_values = group[x]
+            if pd.api.types.is_datetime64_any_dtype(x_values):
+                x_values = x_values.astype("int64")
+            kept = lttb_indices(x_values.to_numpy(dtype=np.float64), y_values, max_points)
+        else:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        parts.append(group.iloc[kept])
+    return pd.concat(parts)
@@ -0,0 +1,233 @@
+"""Streaming exports of a user's insights and audience history.
+
+Rows are read one keyset-paginated page at a time (``iter_insight_pages`` /
+``iter_audience_pages``) and written out before the next page is read, so
+memory stays bounded by the page size whatever the length of the history.
+The "derived" dataset (one row per day, see ``derived_metrics``) is
+computed in memory first; it is small next to the raw history.
+
+- csv: one UTF-8 CSV, header first, timestamps as ISO 8601 UTC
+- parquet: pages are buffered up to ``config.EXPORT_ROW_GROUP_ROWS`` rows
+  and written as one row group each (requires the optional ``export`` extra, ``pyarrow``)
+"""
+
+import csv
+import io
+import tempfile
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator, Literal, NamedTuple, Optional
+
+import numpy as np
+
+from .columnar import rows_to_columns
+from .config import config
+from .database import INSIGHT_COLUMNS, iter_audience_pages, iter_insight_pages
+from .derived_metrics import derived_metric_names, get_derived_metrics
+
+ExportFormat = Literal["csv", "parquet"]
+EXPORT_FORMATS: tuple[str, ...] = ("csv", "parquet")
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+class Dataset(NamedTuple):
+    columns: list[str]
+    datetime_columns: tuple[str, ...]
+    float_columns: tuple[str, ...]
+    int_columns: tuple[str, ...]
+
+
+DATASETS = {
+    "insights": Dataset(
+        INSIGHT_COLUMNS, ("collected_at",), ("metric_value",), ("id", "user_id")
+    ),
+    "audience": Dataset(
+        [
+            "snapshot_id",
+            "metric",
+            "dimension",
+            "collected_at",
+            "last_confirmed_at",
+            "key",
+            "value",
+        ],
+        ("collected_at", "last_confirmed_at"),
+        ("value",),
+        ("snapshot_id",),
+    ),
+    "derived": Dataset(
+        ["user_id", "date", *derived_metric_names()],
+        ("date",),
+        tuple(derived_metric_names()),
+        ("user_id",),
+    ),
+}
+
+
+def iter_export_pages(
+    dataset: str,
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[list[dict]]:
+    """Stream the row pages of one dataset ("insights", "audience" or "derived")."""
+    if dataset == "insights":
+        return iter_insight_pages(user_id, start_date, end_date, page_size=page_size)
+    if dataset == "audience":
+        return iter_audience_pages(user_id, start_date, end_date, page_size)
+    if dataset == "derived":
+        return _iter_derived_pages(user_id, start_date, end_date, page_size)
+    raise ValueError(f"Unknown export dataset: {dataset}")
+
+
+def _iter_derived_pages(
+    user_id: int,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    page_size: Optional[int],
+) -> Iterator[list[dict]]:
+    derived = get_derived_metrics([user_id], start_date, end_date)
+    page_size = page_size or config.DB_PAGE_SIZE
+    for offset in range(0, len(derived), page_size):
+        yield derived.iloc[offset:offset + page_size].to_dict("records")
+
+
+def _page_columns(page: list[dict], spec: Dataset) -> dict[str, np.ndarray]:
+    return rows_to_columns(
+        [page],
+        spec.columns,
+        datetime_columns=spec.datetime_columns,
+        float_columns=spec.float_columns,
+        int_columns=spec.int_columns,
+    )
+
+
+def write_csv(pages: Iterable[list[dict]], dataset: str, out: BinaryIO) -> int:
+    """Write pages as CSV to a binary file object; returns the row count."""
+    spec = DATASETS[dataset]
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(spec.columns)
+    rows = 0
+    for page in pages:
+        columns = _page_columns(page, spec)
+        for column in spec.datetime_columns:
+            formatted = np.datetime_as_string(columns[column], unit="us").astype(object) + "+00:00"
+            formatted[np.isnat(columns[column])] = ""
+            columns[column] = formatted
+        for column in spec.float_columns:
+            missing = np.isnan(columns[column])
+            if missing.any():
+                columns[column] = columns[column].astype(object)
+                columns[column][missing] = ""
+        # Plain Python values format much faster than NumPy scalars
+        writer.writerows(zip(*(columns[c].tolist() for c in spec.columns)))
+        rows += len(page)
+    text.detach()  # Leave ``out`` open for the caller
+    return rows
+
+
+def _arrow_schema(spec: Dataset):
+    import pyarrow as pa
+
+    def field_type(column: str):
+        if column in spec.datetime_columns:
+            return pa.timestamp("us", tz="UTC")
+        if column in spec.float_columns:
+            return pa.float64()
+        if column in spec.int_columns:
+            return pa.int64()
+        return pa.string()
+
+    return pa.schema([(c, field_type(c)) for c in spec.columns])
+
+
+def write_parquet(
+    pages: Iterable[list[dict]],
+    dataset: str,
+    out: BinaryIO,
+    row_group_rows: Optional[int] = None,
+) -> int:
+    """Write pages as Parquet to a binary file object; returns the row count."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow: pip install 'urlinsta[export]'") from e
+
+    spec = DATASETS[dataset]
+    schema = _arrow_schema(spec)
+    row_group_rows = row_group_rows or config.EXPORT_ROW_GROUP_ROWS
+    buffered: list[list[dict]] = []
+    buffered_rows = rows = 0
+
+    def flush():
+        columns = _page_columns([r for page in buffered for r in page], spec)
+        writer.write_table(
+            pa.Table.from_arrays(
+                [pa.array(columns[f.name], type=f.type, from_pandas=True) for f in schema],
+                schema=schema,
+            )
+        )
+        buffered.clear()
+
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for page in pages:
+            buffered.append(page)
+            buffered_rows += len(page)
+            rows += len(page)
+            if buffered_rows >= row_group_rows:
+                flush()
+                buffered_rows = 0
+        if buffered or rows == 0:
+            flush()
+    return rows
+
+
+def export_history(
+    user_id: int,
+    dataset: str,
+    format: ExportFormat,
+    out: BinaryIO,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    page_size: Optional[int] = None,
+) -> int:
+    """
+    Stream one dataset of a user's history to ``out`` as CSV or Parquet.
+
+    Returns:
+        Number of rows written
+    """
+    pages = iter_export_pages(dataset, user_id, start_date, end_date, page_size)
+    if format == "csv":
+        return write_csv(pages, dataset, out)
+    if format == "parquet":
+        return write_parquet(pages, dataset, out)
+    raise ValueError(f"Unknown export format: {format}")
+
+
+def export_to_bytes(
+    user_id: int,
+    dataset: str,
+    format: ExportFormat,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> tuple[bytes, int]:
+    """
+    Run ``export_history`` and return the file contents and row count.
+
+    Pages are streamed into an anonymous temporary file (removed however the
+    export ends), so only the finished file is held in memory. Accepts the
+    ``progress`` callback of ``background_jobs.submit``.
+
+    Returns:
+        (file bytes, number of rows written)
+    """
+    report = progress or (lambda message: None)
+    with tempfile.TemporaryFile() as out:
+        report("기록을 읽어 파일로 쓰는 중...")
+        rows = export_history(user_id, dataset, format, out, start_date, end_date)
+        out.seek(0)
+        return out.read(), rows
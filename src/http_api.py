@@ -0,0 +1,314 @@
+"""Read-only JSON HTTP API over the collected insights (for BI tools).
+
+Serves the same reads as the Dashboard without running a Streamlit script
+per request. Requires the optional ``api`` extra (``starlette``, ``uvicorn``;
+``brotli`` adds ``br`` responses). Run with ``python -m src.http_api``.
+
+Endpoints (all GET, JSON):
+
+- /health
+- /users
+- /users/{user_id}/insights/latest
+- /users/{user_id}/insights?start=&end=&metrics=a,b&period=day&max_points=&method=
+- /users/{user_id}/audience
+- /users/{user_id}/audience/top?metric=&dimension=&limit=
+
+Encoded response bodies are cached per URL in a ``TTLCache`` for
+``API_CACHE_TTL_SECONDS``, together with a weak ETag of the body and the
+compressed variants, so a repeated read costs no query, no JSON encoding
+and no compression; ``If-None-Match`` with a current ETag answers 304.
+When ``API_TOKENS`` is set, every endpoint but /health needs
+``Authorization: Bearer <token>``.
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Optional
+
+try:
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.exceptions import HTTPException
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+except ImportError as e:
+    raise RuntimeError(
+        "The HTTP API requires the optional dependencies: pip install starlette uvicorn"
+    ) from e
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .cache import TTLCache
+from .config import config
+from .database import (
+    get_all_users,
+    get_audience_top,
+    get_insights_frame,
+    get_latest_audience_data,
+    get_latest_insights,
+    get_user_by_id,
+)
+from .downsampling import downsample_frame
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 512
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+class EncodedBody:
+    """A JSON response body with its ETag and lazily compressed variants."""
+
+    def __init__(self, data: Any):
+        self.body = json.dumps(data, default=_json_default, separators=(",", ":")).encode()
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+        self._compressed: dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        if encoding not in self._compressed:
+            if encoding == "br":
+                self._compressed[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self._compressed[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self._compressed[encoding]
+
+
+# Encoded bodies keyed by (path, sorted query items)
+api_cache = TTLCache(config.API_CACHE_TTL_SECONDS, 2048)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def choose_encoding(accept_encoding: str, size: int) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (None: send as is)."""
+    if size < MIN_COMPRESS_BYTES:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _authorized(request: Request) -> bool:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return config.is_api_token(token.strip() if scheme.lower() == "bearer" else "")
+
+
+def json_endpoint(load: Callable[[Request], Any]) -> Callable[[Request], Response]:
+    """
+    Wrap a loader returning JSON-able data into a cached, conditional endpoint.
+
+    Cache hits are answered on the event loop; misses run the (blocking)
+    loader in the threadpool so other requests keep being served.
+    """
+
+    async def endpoint(request: Request) -> Response:
+        if not _authorized(request):
+            return JSONResponse(
+                {"error": "unauthorized"}, 401, headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        cached = api_cache.get(key)
+        if cached is None:
+            cached = await run_in_threadpool(
+                api_cache.get_or_load, key, lambda: EncodedBody(load(request))
+            )
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"private, max-age={config.API_CACHE_TTL_SECONDS}",
+            "Vary": "Accept-Encoding, Authorization",
+        }
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), len(cached.body))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(cached.encoded(encoding), media_type="application/json", headers=headers)
+
+    return endpoint
+
+
+# Query parameter parsing
+def _user_id(request: Request) -> int:
+    try:
+        user_id = int(request.path_params["user_id"])
+    except ValueError:
+        raise HTTPException(404, "user not found")
+    if get_user_by_id(user_id) is None:
+        raise HTTPException(404, "user not found")
+    return user_id
+
+
+def _datetime_param(request: Request, name: str) -> Optional[datetime]:
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an ISO 8601 date or datetime")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _int_param(request: Request, name: str, default: int, low: int, high: int) -> int:
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer")
+    if not low <= parsed <= high:
+        raise HTTPException(400, f"{name} must be between {low} and {high}")
+    return parsed
+
+
+# Endpoints
+async def health(request: Request) -> Response:
+    return JSONResponse({"status": "ok"})
+
+
+@json_endpoint
+def users(request: Request):
+    return [
+        {
+            "id": u.id,
+            "instagram_id": u.instagram_id,
+            "instagram_username": u.instagram_username,
+            "tier": u.tier,
+        }
+        for u in get_all_users()
+    ]
+
+
+@json_endpoint
+def latest_insights(request: Request):
+    return {
+        metric: {
+            "value": insight.metric_value,
+            "period": insight.period,
+            "collected_at": insight.collected_at,
+        }
+        for metric, insight in get_latest_insights(_user_id(request)).items()
+    }
+
+
+@json_endpoint
+def insight_series(request: Request):
+    user_id = _user_id(request)
+    start = _datetime_param(request, "start")
+    end = _datetime_param(request, "end")
+    period = request.query_params.get("period", "day")
+    metrics = [m for m in request.query_params.get("metrics", "").split(",") if m]
+    max_points = _int_param(
+        request, "max_points", config.CHART_MAX_POINTS, 2, config.API_MAX_POINTS
+    )
+    method = request.query_params.get("method", "lttb")
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(400, f"method must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+
+    df = get_insights_frame(user_id, start, end, metrics[0] if len(metrics) == 1 else None)
+    df = df[df["period"] == period]
+    if metrics:
+        df = df[df["metric_name"].isin(metrics)]
+    df = downsample_frame(df, "collected_at", "metric_value", "metric_name", max_points, method)
+
+    series = {}
+    for metric, group in df.groupby("metric_name", sort=True):
+        series[metric] = {
+            "collected_at": group["collected_at"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00").tolist(),
+            "value": group["metric_value"].tolist(),
+        }
+    return {"user_id": user_id, "period": period, "start": start, "end": end, "series": series}
+
+
+@json_endpoint
+def audience(request: Request):
+    return get_latest_audience_data(_user_id(request))
+
+
+@json_endpoint
+def audience_top(request: Request):
+    user_id = _user_id(request)
+    metric = request.query_params.get("metric", "follower_demographics")
+    dimension = request.query_params.get("dimension", "city")
+    limit = _int_param(request, "limit", 10, 1, 100)
+    return [
+        {"key": key, "value": value}
+        for key, value in get_audience_top(user_id, metric, dimension, limit)
+    ]
+
+
+async def _http_error(request: Request, exc: HTTPException) -> Response:
+    return JSONResponse({"error": exc.detail}, exc.status_code)
+
+
+def create_app() -> Starlette:
+    """Build the API application."""
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/users", users),
+            Route("/users/{user_id}/insights/latest", latest_insights),
+            Route("/users/{user_id}/insights", insight_series),
+            Route("/users/{user_id}/audience", audience),
+            Route("/users/{user_id}/audience/top", audience_top),
+        ],
+        exception_handlers={HTTPException: _http_error},
+    )
+
+
+def main():
+    """Serve the API with uvicorn on API_HOST:API_PORT."""
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise RuntimeError("The HTTP API requires uvicorn: pip install uvicorn") from e
+
+    from .database import init_db
+
+    init_db()
+    uvicorn.run(create_app(), host=config.API_HOST, port=config.API_PORT)
+
+
+if __name__ == "__main__":
+    main()
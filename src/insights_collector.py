@@ -1,85 +1,289 @@
 """Insights collection logic."""
 
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Callable, Optional
 
+from . import circuit_breaker
+from .config import config
 from .database import (
-    get_all_users,
-    get_user_token,
+    get_account_health,
+    get_all_account_health,
+    get_all_user_records,
+    get_metric_capabilities,
+    get_user_by_id,
+    get_user_token_record,
+    save_account_health,
+    save_metric_capabilities,
     save_insights,
     save_audience_data,
     log_collection,
 )
-from .instagram_api import InstagramAPI, InstagramAPIError
+from .instagram_api import PERMANENT, THROTTLING, InstagramAPI, InstagramAPIError
 from .rate_limiter import RateLimitError
+from .singleflight import SingleFlight
 
+# Coalesces concurrent collections of the same user (Dashboard refresh,
+# first-login auto-collect and the scheduler can overlap)
+collection_flight = SingleFlight()
 
-def collect_insights_for_user(user_id: int, instagram_id: str, access_token: str) -> dict:
+
+def _result(
+    api: InstagramAPI,
+    success: bool,
+    error_class: Optional[str] = None,
+    error: Optional[str] = None,
+    **fields,
+) -> dict:
+    """Per-user collection result, with the client's retry and capability stats."""
+    return {
+        "success": success,
+        **fields,
+        "retries": api.retry_count,
+        "learned_capabilities": api.learned_capabilities,
+        "error_class": error_class,
+        "error": error,
+    }
+
+
+def collect_insights_for_user(
+    user_id: int,
+    instagram_id: str,
+    access_token: str,
+    capabilities: Optional[dict[tuple[str, str], bool]] = None,
+    periods: Optional[list[str]] = None,
+) -> dict:
     """
     Collect insights for a single user.
 
+    Concurrent calls for the same user share one collection and its result.
+
+    Args:
+        periods: Insight periods to collect, fetched concurrently (default: day)
+        capabilities: Known metric/period support; newly learned entries are
+            returned under 'learned_capabilities'
+
     Returns:
-        dict with 'success', 'insights_count', 'error' keys
+        dict with 'success', 'insights_count', 'retries', 'learned_capabilities',
+        'error_class', 'error' keys
     """
-    api = InstagramAPI(access_token, instagram_id)
+    return collection_flight.do(
+        ("insights", user_id),
+        _collect_insights,
+        user_id,
+        instagram_id,
+        access_token,
+        capabilities,
+        periods,
+    )
+
+
+def _collect_insights(
+    user_id: int,
+    instagram_id: str,
+    access_token: str,
+    capabilities: Optional[dict[tuple[str, str], bool]],
+    periods: Optional[list[str]],
+) -> dict:
+    api = InstagramAPI(access_token, instagram_id, capabilities)
 
     try:
-        # Collect daily insights
-        insights = api.get_insights(period="day")
+        insights = api.get_insights_for_periods(periods or ["day"])
+        failed_periods = ", ".join(
+            f"{period}: {error}" for period, error in api.period_errors.items()
+        )
 
         if insights:
             save_insights(user_id, insights)
-            log_collection(user_id, "insights", "success")
-            return {"success": True, "insights_count": len(insights), "error": None}
+            log_collection(user_id, "insights", "success", failed_periods or None)
+            return _result(api, True, insights_count=len(insights))
         else:
             log_collection(user_id, "insights", "success", "No insights data available")
-            return {"success": True, "insights_count": 0, "error": None}
+            return _result(api, True, insights_count=0)
 
     except RateLimitError as e:
         log_collection(user_id, "insights", "rate_limited", str(e))
-        return {"success": False, "insights_count": 0, "error": f"Rate limited: {e}"}
+        return _result(api, False, THROTTLING, f"Rate limited: {e}", insights_count=0)
 
     except InstagramAPIError as e:
+        if e.error_class == THROTTLING:
+            log_collection(user_id, "insights", "rate_limited", str(e))
+            return _result(api, False, THROTTLING, f"Rate limited: {e}", insights_count=0)
         log_collection(user_id, "insights", "error", str(e))
-        return {"success": False, "insights_count": 0, "error": f"API error: {e}"}
+        return _result(api, False, e.error_class, f"API error: {e}", insights_count=0)
 
     except Exception as e:
         log_collection(user_id, "insights", "error", str(e))
-        return {"success": False, "insights_count": 0, "error": f"Unexpected error: {e}"}
+        return _result(api, False, None, f"Unexpected error: {e}", insights_count=0)
 
 
-def collect_audience_for_user(user_id: int, instagram_id: str, access_token: str) -> dict:
+def collect_audience_for_user(
+    user_id: int,
+    instagram_id: str,
+    access_token: str,
+    capabilities: Optional[dict[tuple[str, str], bool]] = None,
+) -> dict:
     """
     Collect audience data for a single user.
 
+    Concurrent calls for the same user share one collection and its result.
+
+    Args:
+        capabilities: Known metric/period support; newly learned entries are
+            returned under 'learned_capabilities'
+
     Returns:
-        dict with 'success', 'data_types', 'error' keys
+        dict with 'success', 'data_types', 'retries', 'learned_capabilities',
+        'error_class', 'error' keys
     """
-    api = InstagramAPI(access_token, instagram_id)
+    return collection_flight.do(
+        ("audience", user_id),
+        _collect_audience,
+        user_id,
+        instagram_id,
+        access_token,
+        capabilities,
+    )
+
+
+def _collect_audience(
+    user_id: int,
+    instagram_id: str,
+    access_token: str,
+    capabilities: Optional[dict[tuple[str, str], bool]],
+) -> dict:
+    api = InstagramAPI(access_token, instagram_id, capabilities)
 
     try:
         audience_data = api.get_audience_data()
 
         if audience_data:
-            for data_type, data in audience_data.items():
-                save_audience_data(user_id, data_type, data)
+            # Breakdowns identical to the stored ones are only re-confirmed
+            unchanged = [
+                data_type
+                for data_type, data in audience_data.items()
+                if not save_audience_data(user_id, data_type, data)
+            ]
 
-            log_collection(user_id, "audience", "success")
-            return {"success": True, "data_types": list(audience_data.keys()), "error": None}
+            log_collection(
+                user_id,
+                "audience",
+                "success",
+                f"{len(unchanged)}/{len(audience_data)} breakdowns unchanged" if unchanged else None,
+            )
+            return _result(
+                api, True, data_types=list(audience_data.keys()), unchanged_data_types=unchanged
+            )
         else:
             log_collection(user_id, "audience", "success", "No audience data available")
-            return {"success": True, "data_types": [], "error": None}
+            return _result(api, True, data_types=[])
 
     except RateLimitError as e:
         log_collection(user_id, "audience", "rate_limited", str(e))
-        return {"success": False, "data_types": [], "error": f"Rate limited: {e}"}
+        return _result(api, False, THROTTLING, f"Rate limited: {e}", data_types=[])
 
     except InstagramAPIError as e:
+        if e.error_class == THROTTLING:
+            log_collection(user_id, "audience", "rate_limited", str(e))
+            return _result(api, False, THROTTLING, f"Rate limited: {e}", data_types=[])
         log_collection(user_id, "audience", "error", str(e))
-        return {"success": False, "data_types": [], "error": f"API error: {e}"}
+        return _result(api, False, e.error_class, f"API error: {e}", data_types=[])
 
     except Exception as e:
         log_collection(user_id, "audience", "error", str(e))
-        return {"success": False, "data_types": [], "error": f"Unexpected error: {e}"}
+        return _result(api, False, None, f"Unexpected error: {e}", data_types=[])
+
+
+def collect_user(
+    user,
+    access_token: str,
+    health=None,
+    capabilities: Optional[dict[tuple[str, str], bool]] = None,
+    now: Optional[datetime] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """
+    Collect insights then audience data for one account.
+
+    Collects the periods of the account's tier with its known metric
+    capabilities, saves newly learned capabilities and records the outcome
+    in the account's circuit breaker. Used by the scheduler and by manual
+    refreshes, so both share one behaviour (and one in-flight collection).
+
+    Args:
+        user: ``User`` or ``UserRecord`` of the account
+        health: Current circuit breaker state (None means healthy)
+        capabilities: Known metric/period support of the account
+        progress: Called with a short status message before each step
+
+    Returns:
+        dict with the 'insights' and 'audience' collection results
+    """
+    now = now or datetime.now(timezone.utc)
+    report = progress or (lambda message: None)
+    capabilities = capabilities or {}
+
+    report("인사이트 수집 중...")
+    insights_result = collect_insights_for_user(
+        user.id,
+        user.instagram_id,
+        access_token,
+        capabilities,
+        config.periods_for_tier(user.tier),
+    )
+
+    # Collect audience data, unless the token or account is already known to be broken
+    if insights_result["error_class"] == PERMANENT:
+        audience_result = {**insights_result, "retries": 0, "learned_capabilities": {}}
+    else:
+        report("오디언스 데이터 수집 중...")
+        audience_result = collect_audience_for_user(
+            user.id, user.instagram_id, access_token, capabilities
+        )
+
+    learned = {**insights_result["learned_capabilities"], **audience_result["learned_capabilities"]}
+    if learned:
+        save_metric_capabilities(user.id, learned)
+
+    failed = next(
+        (r for r in (insights_result, audience_result) if r["error_class"] == PERMANENT),
+        None,
+    )
+    if failed:
+        _update_health(health, user.id, PERMANENT, failed["error"], now)
+    elif insights_result["success"] and audience_result["success"]:
+        updated = circuit_breaker.record_success(health)
+        if updated:
+            save_account_health(updated)
+
+    return {"insights": insights_result, "audience": audience_result}
+
+
+def refresh_user(
+    user_id: int,
+    access_token: str,
+    progress: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """
+    Collect insights then audience data for one user (manual refresh).
+
+    Runs the same per-account collection as the scheduler (``collect_user``).
+
+    Args:
+        progress: Called with a short status message before each step
+
+    Returns:
+        dict with the 'insights' and 'audience' collection results
+    """
+    user = get_user_by_id(user_id)
+    if user is None:
+        raise ValueError(f"Unknown user: {user_id}")
+    return collect_user(
+        user,
+        access_token,
+        get_account_health(user_id),
+        get_metric_capabilities(user_id).get(user_id, {}),
+        progress=progress,
+    )
 
 
 def collect_all_users() -> dict:
@@ -89,39 +293,67 @@ def collect_all_users() -> dict:
     Returns:
         Summary dict with counts of successful/failed collections
     """
-    users = get_all_users()
+    users = get_all_user_records()
+    health_by_user = get_all_account_health()
+    capabilities_by_user = get_metric_capabilities()
+    now = datetime.now(timezone.utc)
     results = {
         "total_users": len(users),
         "insights_success": 0,
         "insights_failed": 0,
         "audience_success": 0,
         "audience_failed": 0,
+        # Accounts skipped because their circuit breaker is open
+        "quarantined": 0,
+        "retries": 0,
+        # instagram_username -> Graph API retries, for accounts that needed any
+        "retries_by_account": {},
         "errors": [],
     }
 
     for user in users:
+        health = health_by_user.get(user.id)
+        if not circuit_breaker.allows_collection(health, now):
+            results["quarantined"] += 1
+            continue
+
         # Get page token for API calls
-        token = get_user_token(user.id, "page")
+        token = get_user_token_record(user.id, "page")
         if not token:
             results["errors"].append(f"No page token for user {user.instagram_username}")
             results["insights_failed"] += 1
             results["audience_failed"] += 1
+            _update_health(health, user.id, PERMANENT, "No page token", now)
             continue
 
-        # Collect insights
-        insights_result = collect_insights_for_user(user.id, user.instagram_id, token.access_token)
+        collected = collect_user(
+            user, token.access_token, health, capabilities_by_user.get(user.id, {}), now
+        )
+        insights_result, audience_result = collected["insights"], collected["audience"]
+
         if insights_result["success"]:
             results["insights_success"] += 1
         else:
             results["insights_failed"] += 1
             results["errors"].append(f"Insights error for {user.instagram_username}: {insights_result['error']}")
 
-        # Collect audience data
-        audience_result = collect_audience_for_user(user.id, user.instagram_id, token.access_token)
         if audience_result["success"]:
             results["audience_success"] += 1
         else:
             results["audience_failed"] += 1
-            results["errors"].append(f"Audience error for {user.instagram_username}: {audience_result['error']}")
+            # Skipped after a permanent insights error, which is reported above
+            if insights_result["error_class"] != PERMANENT:
+                results["errors"].append(f"Audience error for {user.instagram_username}: {audience_result['error']}")
+
+        retries = insights_result["retries"] + audience_result["retries"]
+        if retries:
+            results["retries"] += retries
+            results["retries_by_account"][user.instagram_username] = retries
 
     return results
+
+
+def _update_health(health, user_id: int, error_class: str, error_message: str, now: datetime):
+    updated = circuit_breaker.record_failure(health, user_id, error_class, error_message, now)
+    if updated:
+        save_account_health(updated)
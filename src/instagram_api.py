@@ -1,23 +1,263 @@
 """Instagram Graph API client with retry logic."""
 
+import json
 import random
-import time
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+from urllib.parse import parse_qs, urlencode
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from .config import config
 from .rate_limiter import rate_limiter, RateLimitError
+from .singleflight import SingleFlight, params_key
+
+
+# Pooled HTTP session shared by every Graph API call (collectors, OAuth,
+# pagination prefetch threads), so connections are reused across requests
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+
+def iter_graph_pages(
+    fetch: Callable[[str, Optional[dict]], dict],
+    url: str,
+    params: Optional[dict] = None,
+    limit: Optional[int] = None,
+    prefetch: bool = True,
+    stop_after: Optional[Callable[[list[dict]], bool]] = None,
+) -> Iterator[list[dict]]:
+    """
+    Lazily follow a Graph list edge page by page.
+
+    Follows ``paging.cursors.after`` while ``paging.next`` is present (or the
+    ``next`` URL itself for edges without cursors). With ``prefetch`` the
+    next page is requested in the background while the caller works on the
+    current one.
+
+    Args:
+        fetch: ``fetch(url, params) -> response JSON``; raises on errors
+        url: Absolute URL of the list edge
+        params: Query parameters for the first page (not modified)
+        limit: Items per page (Graph ``limit``); the edge default if None
+        prefetch: Request the next page before the current one is consumed
+        stop_after: Predicate on a page; True means no further page is needed
+
+    Yields:
+        The ``data`` list of each page
+    """
+    params = dict(params or {})
+    if limit:
+        params["limit"] = limit
+
+    def next_request(body: dict, page: list[dict]) -> Optional[tuple[str, Optional[dict]]]:
+        paging = body.get("paging") or {}
+        if not page or not paging.get("next") or (stop_after and stop_after(page)):
+            return None
+        after = (paging.get("cursors") or {}).get("after")
+        if after:
+            return url, {**params, "after": after}
+        return paging["next"], None
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = None
+        try:
+            body = fetch(url, dict(params))
+            while True:
+                page = body.get("data", [])
+                page = page if isinstance(page, list) else []
+                request = next_request(body, page)
+                if request and prefetch:
+                    pending = pool.submit(fetch, *request)
+                yield page
+                if not request:
+                    return
+                if pending:
+                    body, pending = pending.result(), None
+                else:
+                    body = fetch(*request)
+        finally:
+            # Caller stopped early: drop a prefetch that has not started yet
+            if pending:
+                pending.cancel()
+
+
+# Coalesces identical concurrent GETs, keyed by (URL, params incl. token)
+graph_flight = SingleFlight()
+
+
+# Graph API error classes (https://developers.facebook.com/docs/graph-api/guides/error-handling)
+TRANSIENT = "transient"  # Temporary server-side failure: retry with backoff
+THROTTLING = "throttling"  # Rate limited: retry after the server-requested wait
+PERMANENT = "permanent"  # Token, permission or request problem: fail fast
+
+THROTTLING_CODES = {4, 17, 32, 613} | set(range(80001, 80015))
+PERMANENT_CODES = {3, 10, 100, 102, 190, 803, 2500} | set(range(200, 300))
+# Subcodes that make any code permanent (missing or deleted object,
+# expired/invalidated sessions, media the account cannot read)
+PERMANENT_SUBCODES = {33, 458, 459, 460, 463, 464, 467, 2108006}
+# Code 100 is also "invalid parameter" in general; only messages naming the
+# metric mean the metric/period pair itself was rejected
+METRIC_REJECTION_MARKERS = ("metric", "not compatible")
+# Code 10 is a permission error, except for demographics of accounts too
+# small to have any ("Not enough followers ...")
+INSUFFICIENT_AUDIENCE_MARKERS = ("not enough",)
+
+
+def classify_error(
+    code: Optional[int],
+    subcode: Optional[int] = None,
+    is_transient: Optional[bool] = None,
+) -> str:
+    """Classify a Graph API error as TRANSIENT, THROTTLING or PERMANENT."""
+    if subcode in PERMANENT_SUBCODES:
+        return PERMANENT
+    if code in THROTTLING_CODES:
+        return THROTTLING
+    if code in PERMANENT_CODES:
+        return PERMANENT
+    if is_transient is False:
+        return PERMANENT
+    # Codes 1/2, unknown codes and non-JSON (e.g. 5xx) responses
+    return TRANSIENT
+
+
+def is_metric_rejection(error: "InstagramAPIError") -> bool:
+    """True when a code 100 error rejects the requested metric, not the account."""
+    if error.code != 100 or error.subcode in PERMANENT_SUBCODES:
+        return False
+    message = str(error).lower()
+    return any(marker in message for marker in METRIC_REJECTION_MARKERS)
+
+
+def is_insufficient_audience(error: "InstagramAPIError") -> bool:
+    """True when a code 10 error means the account has too few followers, not no permission."""
+    if error.code != 10:
+        return False
+    message = str(error).lower()
+    return any(marker in message for marker in INSUFFICIENT_AUDIENCE_MARKERS)
+
+
+def _header_json(headers, name: str) -> dict:
+    try:
+        value = json.loads(headers.get(name) or "{}")
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _retry_after(headers) -> Optional[float]:
+    """Seconds the server asked us to wait, from Retry-After or BUC usage headers."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    # X-Business-Use-Case-Usage: {business_id: [{"estimated_time_to_regain_access": minutes, ...}]}
+    minutes = [
+        entry.get("estimated_time_to_regain_access") or 0
+        for entries in _header_json(headers, "X-Business-Use-Case-Usage").values()
+        if isinstance(entries, list)
+        for entry in entries
+        if isinstance(entry, dict)
+    ]
+    if minutes and max(minutes) > 0:
+        return max(minutes) * 60.0
+    return None
+
+
+def _usage_percent(headers) -> Optional[int]:
+    """Highest call/CPU/time usage percentage reported by the usage headers."""
+    usages = [_header_json(headers, "X-App-Usage")]
+    for entries in _header_json(headers, "X-Business-Use-Case-Usage").values():
+        if isinstance(entries, list):
+            usages.extend(e for e in entries if isinstance(e, dict))
+
+    values = [
+        u.get(key)
+        for u in usages
+        for key in ("call_count", "total_cputime", "total_time")
+        if isinstance(u.get(key), (int, float))
+    ]
+    return max(values) if values else None
 
 
 class InstagramAPIError(Exception):
     """Instagram API error."""
 
-    def __init__(self, message: str, code: Optional[int] = None, subcode: Optional[int] = None):
+    def __init__(
+        self,
+        message: str,
+        code: Optional[int] = None,
+        subcode: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        is_transient: Optional[bool] = None,
+    ):
         super().__init__(message)
         self.code = code
         self.subcode = subcode
+        self.retry_after = retry_after
+        self.error_class = classify_error(code, subcode, is_transient)
+
+
+def _raise_for_error(status_code: int, text: str, headers):
+    """Raise InstagramAPIError for a non-200 Graph response."""
+    if status_code == 200:
+        return
+    try:
+        error_data = json.loads(text).get("error", {})
+    except (ValueError, AttributeError):
+        error_data = {"message": f"HTTP {status_code}"}
+    raise InstagramAPIError(
+        error_data.get("message", "Unknown error"),
+        error_data.get("code"),
+        error_data.get("error_subcode"),
+        retry_after=_retry_after(headers),
+        is_transient=error_data.get("is_transient"),
+    )
+
+
+def parse_graph_timestamp(value: Optional[str]) -> datetime:
+    """Parse a Graph timestamp like ``2025-01-01T12:00:00+0000``."""
+    return datetime.strptime(value or "1970-01-01T00:00:00+0000", "%Y-%m-%dT%H:%M:%S%z")
+
+
+_backoff = wait_exponential(multiplier=1, min=2, max=60)
+
+
+def _should_retry(error: BaseException) -> bool:
+    if isinstance(error, requests.RequestException):
+        return True
+    if not isinstance(error, InstagramAPIError):
+        return False
+    if error.error_class == PERMANENT:
+        return False
+    if error.retry_after and error.retry_after > config.API_MAX_RETRY_WAIT:
+        return False
+    return True
+
+
+def _retry_wait(retry_state) -> float:
+    """Honor the server-requested wait when given, else exponential backoff, plus jitter."""
+    error = retry_state.outcome.exception()
+    if isinstance(error, InstagramAPIError) and error.retry_after:
+        return error.retry_after + random.uniform(0, 1)
+    return _backoff(retry_state) + random.uniform(0, 1)
+
+
+def _count_retry(retry_state):
+    api = retry_state.args[0]
+    error = retry_state.outcome.exception()
+    error_class = getattr(error, "error_class", TRANSIENT)
+    with api._lock:
+        api.retries[error_class] = api.retries.get(error_class, 0) + 1
 
 
 class InstagramAPI:
@@ -39,51 +279,175 @@ class InstagramAPI:
         "follower_count",
     ]
 
+    # Collected when no metrics are given; total_interactions and reach
+    # feed the engagement rate (derived_metrics)
+    DEFAULT_INSIGHT_METRICS = [
+        "impressions",
+        "reach",
+        "profile_views",
+        "follower_count",
+        "total_interactions",
+    ]
+
     AUDIENCE_METRICS = [
         "engaged_audience_demographics",
         "reached_audience_demographics",
         "follower_demographics",
     ]
 
-    def __init__(self, access_token: str, instagram_id: str):
+    # Lifetime metrics collected per post (media insights)
+    MEDIA_METRICS = ["reach", "saved", "shares", "likes", "comments", "total_interactions"]
+
+    MEDIA_FIELDS = "id,timestamp,media_type,media_product_type"
+
+    # Most sub-requests Graph accepts in one batch request
+    MAX_BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        access_token: str,
+        instagram_id: str,
+        capabilities: Optional[dict[tuple[str, str], bool]] = None,
+    ):
         self.access_token = access_token
         self.instagram_id = instagram_id
         self.base_url = config.GRAPH_API_BASE_URL
+        # (metric, period) -> supported, as learned by earlier runs
+        self.capabilities: dict[tuple[str, str], bool] = dict(capabilities or {})
+        # Capabilities this client discovered or saw change, to be persisted
+        self.learned_capabilities: dict[tuple[str, str], bool] = {}
+        # Periods that failed in the last get_insights_for_periods call
+        self.period_errors: dict[str, Exception] = {}
+        # Guards the stats above when periods are fetched concurrently
+        self._lock = threading.Lock()
+        # Retries made by this client, by error class
+        self.retries: dict[str, int] = {}
+        # Latest usage percentage reported by the usage headers
+        self.usage_percent: Optional[int] = None
+
+    @property
+    def retry_count(self) -> int:
+        """Total retries made by this client."""
+        return sum(self.retries.values())
+
+    def _learn(self, metric: str, period: str, supported: bool):
+        key = (metric, period)
+        with self._lock:
+            if self.capabilities.get(key) != supported:
+                self.learned_capabilities[key] = supported
+            self.capabilities[key] = supported
+
+    def _is_supported(self, metric: str, period: str) -> bool:
+        """False only for metric/period pairs known to be rejected."""
+        return self.capabilities.get((metric, period)) is not False
+
+    def _fetch_insight_items(self, metrics: list[str], period: str) -> list[dict]:
+        """
+        Fetch a batch of metrics, splitting it when Graph rejects it.
+
+        A code 100 answer naming the metric ("not compatible" / invalid
+        metric) rejects the whole batch, so the batch is halved until the
+        failing metrics are isolated; those are remembered as unsupported and
+        the rest are still returned. Any other error (e.g. a deleted or
+        disconnected account, subcode 33) is raised as is.
+        """
+        params = {
+            "metric": ",".join(metrics),
+            "period": period,
+            "metric_type": "total_value",
+        }
+        try:
+            data = self._request_with_retry(f"{self.instagram_id}/insights", params)
+        except InstagramAPIError as e:
+            if not is_metric_rejection(e):
+                raise
+            if len(metrics) == 1:
+                self._learn(metrics[0], period, False)
+                return []
+            middle = len(metrics) // 2
+            return (
+                self._fetch_insight_items(metrics[:middle], period)
+                + self._fetch_insight_items(metrics[middle:], period)
+            )
+
+        for metric in metrics:
+            self._learn(metric, period, True)
+        return data.get("data", [])
 
     def _make_request(self, endpoint: str, params: Optional[dict] = None) -> dict:
         """Make an API request with rate limiting."""
-        # Check rate limit
-        if not rate_limiter.can_make_request():
-            wait_time = rate_limiter.wait_if_needed()
-            if wait_time > 60:  # If wait is too long, raise error
-                raise RateLimitError(f"Rate limit exceeded. Retry after {wait_time:.0f}s", wait_time)
-
-        url = f"{self.base_url}/{endpoint}"
+        # Endpoints are relative to the API base; pagination passes full URLs
+        url = endpoint if endpoint.startswith(("https://", "http://")) else f"{self.base_url}/{endpoint}"
         params = params or {}
         params["access_token"] = self.access_token
 
-        response = requests.get(url, params=params)
+        # Identical requests already in flight (other tabs, a racing
+        # scheduler run) share that response instead of spending quota
+        return graph_flight.do((url, params_key(params)), self._get, url, params)
+
+    def _get(self, url: str, params: dict) -> dict:
+        rate_limiter.acquire()
+        response = session.get(url, params=params)
         rate_limiter.record_request()
+        self.usage_percent = _usage_percent(response.headers)
+        _raise_for_error(response.status_code, response.text, response.headers)
+        return response.json()
 
-        # Handle API errors
-        if response.status_code != 200:
-            error_data = response.json().get("error", {})
-            raise InstagramAPIError(
-                error_data.get("message", "Unknown error"),
-                error_data.get("code"),
-                error_data.get("error_subcode"),
+    @retry(
+        stop=stop_after_attempt(config.API_MAX_ATTEMPTS),
+        wait=_retry_wait,
+        retry=retry_if_exception(_should_retry),
+        before_sleep=_count_retry,
+        reraise=True,
+    )
+    def _post_batch(self, relative_urls: list[str]) -> list[dict]:
+        """
+        Send up to ``MAX_BATCH_SIZE`` GET requests as one Graph batch request.
+
+        Graph counts every sub-request against the rate limit, so the batch
+        is only sent when the limiter has room for all of them.
+
+        Returns:
+            One ``{"code", "body"}`` dict per sub-request, in order
+        """
+        needed = len(relative_urls)
+        if rate_limiter.get_remaining_requests() < needed:
+            raise RateLimitError(
+                f"Rate limit exceeded. Batch of {needed} needs more budget",
+                rate_limiter.get_reset_time(),
             )
 
+        batch = [{"method": "GET", "relative_url": url} for url in relative_urls]
+        response = session.post(
+            f"{self.base_url}/",
+            data={
+                "access_token": self.access_token,
+                "batch": json.dumps(batch),
+                "include_headers": "false",
+            },
+        )
+        for _ in range(needed):
+            rate_limiter.record_request()
+        self.usage_percent = _usage_percent(response.headers)
+        _raise_for_error(response.status_code, response.text, response.headers)
         return response.json()
 
     @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=1, min=2, max=60),
-        retry=retry_if_exception_type((requests.RequestException, InstagramAPIError)),
-        before_sleep=lambda retry_state: time.sleep(random.uniform(0, 1)),  # Jitter
+        stop=stop_after_attempt(config.API_MAX_ATTEMPTS),
+        wait=_retry_wait,
+        retry=retry_if_exception(_should_retry),
+        before_sleep=_count_retry,
+        reraise=True,
     )
     def _request_with_retry(self, endpoint: str, params: Optional[dict] = None) -> dict:
-        """Make request with exponential backoff retry."""
+        """
+        Make request, retrying by error class.
+
+        Transient errors back off exponentially; throttling errors wait for
+        the Retry-After / usage-header time (or back off if none is given)
+        unless it exceeds ``API_MAX_RETRY_WAIT``; permanent errors (invalid
+        token, missing permission, invalid metric) are raised immediately.
+        """
         return self._make_request(endpoint, params)
 
     def get_insights(self, metrics: Optional[list[str]] = None, period: str = "day") -> list[dict]:
@@ -91,89 +455,223 @@ class InstagramAPI:
         Fetch Instagram insights.
 
         Args:
-            metrics: List of metric names. Defaults to common metrics.
+            metrics: List of metric names. Defaults to ``DEFAULT_INSIGHT_METRICS``.
             period: Time period - 'day', 'week', 'days_28', or 'lifetime'
 
         Returns:
             List of insight dictionaries with metric_name, metric_value, period
         """
         if metrics is None:
-            # Use a subset of commonly available metrics
-            metrics = ["impressions", "reach", "profile_views", "follower_count"]
+            metrics = self.DEFAULT_INSIGHT_METRICS
 
-        # Filter to valid metrics only
-        valid_metrics = [m for m in metrics if m in self.INSIGHT_METRICS]
+        # Filter to valid metrics not already known to be rejected
+        valid_metrics = [
+            m for m in metrics if m in self.INSIGHT_METRICS and self._is_supported(m, period)
+        ]
         if not valid_metrics:
             return []
 
-        params = {
-            "metric": ",".join(valid_metrics),
-            "period": period,
-            "metric_type": "total_value",
-        }
+        results = []
+        for item in self._fetch_insight_items(valid_metrics, period):
+            metric_name = item.get("name")
+            values = item.get("total_value", {})
+            value = values.get("value", 0)
 
-        try:
-            data = self._request_with_retry(f"{self.instagram_id}/insights", params)
-            results = []
+            results.append({
+                "metric_name": metric_name,
+                "metric_value": float(value),
+                "period": period,
+            })
 
-            for item in data.get("data", []):
-                metric_name = item.get("name")
-                values = item.get("total_value", {})
-                value = values.get("value", 0)
+        return results
 
-                results.append({
-                    "metric_name": metric_name,
-                    "metric_value": float(value),
-                    "period": period,
-                })
+    def get_insights_for_periods(
+        self, periods: list[str], metrics: Optional[list[str]] = None
+    ) -> list[dict]:
+        """
+        Fetch insights for several periods in one pass.
 
-            return results
+        Graph takes one period per insights request, so the periods are
+        requested concurrently and wall time stays close to a single
+        ``get_insights`` call. Periods that fail are kept in ``period_errors``;
+        the first error is raised only if every period failed.
 
-        except InstagramAPIError as e:
-            # Handle specific errors
-            if e.code == 100 and "not compatible" in str(e).lower():
-                # Metric not available for this period, try with lifetime
-                return []
-            raise
+        Returns:
+            Insight dictionaries for all periods, tagged with their period
+        """
+        self.period_errors = {}
+        if len(periods) == 1:
+            return self.get_insights(metrics, periods[0])
+
+        with ThreadPoolExecutor(max_workers=len(periods)) as pool:
+            futures = {p: pool.submit(self.get_insights, metrics, p) for p in periods}
+
+        results = []
+        for period, future in futures.items():
+            try:
+                results.extend(future.result())
+            except (InstagramAPIError, RateLimitError, requests.RequestException) as e:
+                self.period_errors[period] = e
+
+        if len(self.period_errors) == len(periods):
+            raise next(iter(self.period_errors.values()))
+        return results
 
     def get_audience_data(self) -> dict[str, dict]:
         """
         Fetch audience demographic data.
 
+        Each metric is a separate request, so they are fetched concurrently.
+
         Returns:
             Dictionary with demographic breakdowns (city, country, age_gender)
         """
+        # Try each audience metric not already known to be unavailable
+        metrics = [m for m in self.AUDIENCE_METRICS if self._is_supported(m, "lifetime")]
+        if not metrics:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(metrics)) as pool:
+            futures = [pool.submit(self._fetch_audience_metric, m) for m in metrics]
+
         results = {}
+        for future in futures:
+            results.update(future.result())
+        return results
 
-        # Try each audience metric
-        for metric in self.AUDIENCE_METRICS:
-            try:
-                params = {
-                    "metric": metric,
-                    "period": "lifetime",
-                    "metric_type": "total_value",
-                }
-                data = self._request_with_retry(f"{self.instagram_id}/insights", params)
-
-                for item in data.get("data", []):
-                    breakdown = item.get("total_value", {}).get("breakdowns", [])
-                    if breakdown:
-                        # Extract the demographic data
-                        for bd in breakdown:
-                            dimension = bd.get("dimension_keys", ["unknown"])[0]
-                            values = {}
-                            for result in bd.get("results", []):
-                                key = result.get("dimension_values", ["unknown"])[0]
-                                val = result.get("value", 0)
-                                values[key] = val
-                            results[f"{metric}_{dimension}"] = values
-
-            except InstagramAPIError:
-                # Skip if metric not available
-                continue
+    def _fetch_audience_metric(self, metric: str) -> dict[str, dict]:
+        results = {}
+        try:
+            params = {
+                "metric": metric,
+                "period": "lifetime",
+                "metric_type": "total_value",
+            }
+            data = self._request_with_retry(f"{self.instagram_id}/insights", params)
+            self._learn(metric, "lifetime", True)
+
+            for item in data.get("data", []):
+                breakdown = item.get("total_value", {}).get("breakdowns", [])
+                if breakdown:
+                    # Extract the demographic data
+                    for bd in breakdown:
+                        dimension = bd.get("dimension_keys", ["unknown"])[0]
+                        values = {}
+                        for result in bd.get("results", []):
+                            key = result.get("dimension_values", ["unknown"])[0]
+                            val = result.get("value", 0)
+                            values[key] = val
+                        results[f"{metric}_{dimension}"] = values
+
+        except InstagramAPIError as e:
+            # Invalid metric (100) or not enough audience yet (10): remember
+            # and skip until the capability is re-checked. Other code 10
+            # errors are missing permissions and go to the caller.
+            if not (is_metric_rejection(e) or is_insufficient_audience(e)):
+                raise
+            self._learn(metric, "lifetime", False)
 
         return results
 
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        limit: Optional[int] = None,
+        stop_after: Optional[Callable[[list[dict]], bool]] = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Lazily page through a list edge of this account (see ``iter_graph_pages``).
+
+        Every page goes through the rate limiter and the retry policy.
+        """
+
+        def fetch(url: str, page_params: Optional[dict]) -> dict:
+            if page_params is None:
+                # A ``paging.next`` URL carries its own query string
+                url, _, query = url.partition("?")
+                page_params = {k: v[-1] for k, v in parse_qs(query).items()}
+            return self._request_with_retry(url, page_params)
+
+        return iter_graph_pages(
+            fetch,
+            f"{self.base_url}/{endpoint}",
+            params,
+            limit=limit or config.GRAPH_PAGE_LIMIT,
+            stop_after=stop_after,
+        )
+
+    def iter_media(self, since: Optional[datetime] = None, page_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Lazily page through the account's media, newest first.
+
+        Args:
+            since: Stop at the first post published before this time; the page
+                holding it is the last one requested
+            page_size: Posts requested per page
+
+        Yields:
+            Media dicts with id, timestamp, media_type, media_product_type
+        """
+
+        def past_window(page: list[dict]) -> bool:
+            return since is not None and parse_graph_timestamp(page[-1].get("timestamp")) < since
+
+        pages = self.iter_pages(
+            f"{self.instagram_id}/media",
+            {"fields": self.MEDIA_FIELDS},
+            limit=page_size,
+            stop_after=past_window,
+        )
+        for page in pages:
+            for media in page:
+                if since and parse_graph_timestamp(media.get("timestamp")) < since:
+                    pages.close()
+                    return
+                yield media
+
+    def get_media_insights(
+        self, media_ids: list[str], metrics: Optional[list[str]] = None
+    ) -> tuple[dict[str, list[dict]], dict[str, InstagramAPIError]]:
+        """
+        Fetch lifetime insights for several posts in one batch request.
+
+        Args:
+            media_ids: Up to ``MAX_BATCH_SIZE`` media IDs
+            metrics: Metric names. Defaults to ``MEDIA_METRICS``.
+
+        Returns:
+            (metric_name -> value dicts by media ID, errors by media ID);
+            one post failing does not fail the others
+        """
+        if len(media_ids) > self.MAX_BATCH_SIZE:
+            raise ValueError(f"At most {self.MAX_BATCH_SIZE} media per batch")
+        if not media_ids:
+            return {}, {}
+
+        query = urlencode({"metric": ",".join(metrics or self.MEDIA_METRICS)})
+        responses = self._post_batch([f"{media_id}/insights?{query}" for media_id in media_ids])
+
+        insights, errors = {}, {}
+        for media_id, response in zip(media_ids, responses):
+            try:
+                # Graph answers null for sub-requests it did not get to
+                if response is None:
+                    raise InstagramAPIError("Batch sub-request not processed")
+                _raise_for_error(response.get("code"), response.get("body") or "", {})
+            except InstagramAPIError as e:
+                errors[media_id] = e
+                continue
+            items = json.loads(response["body"]).get("data", [])
+            insights[media_id] = [
+                {
+                    "metric_name": item.get("name"),
+                    "metric_value": float((item.get("values") or [{}])[0].get("value", 0) or 0),
+                }
+                for item in items
+            ]
+        return insights, errors
+
     def get_account_info(self) -> dict:
         """Get basic account information."""
         params = {
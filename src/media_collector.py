@@ -0,0 +1,177 @@
+"""Media-level insights collection.
+
+Posts gain most of their reach and engagement in the first days after
+publishing, so only posts inside the active window (``MEDIA_ACTIVE_DAYS``)
+are re-collected. Media is paged lazily, newest first, and paging stops at
+the first post older than the window; insights for up to
+``MEDIA_BATCH_SIZE`` posts are fetched in one Graph batch request and
+stored with one bulk insert.
+
+Every batch sub-request counts against the shared rate limiter, so batches
+are sized to the budget left above ``MEDIA_RESERVED_REQUESTS`` and the run
+stops once that budget is spent; accounts are visited in random order so
+the ones left out rotate between runs.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterator, Optional
+
+from . import circuit_breaker
+from .config import config
+from .database import (
+    get_all_account_health,
+    get_all_user_records,
+    get_user_token_record,
+    log_collection,
+    save_media_insights,
+)
+from .instagram_api import THROTTLING, InstagramAPI, InstagramAPIError, parse_graph_timestamp
+from .rate_limiter import RateLimitError, rate_limiter
+
+
+def media_budget() -> int:
+    """Graph requests media collection may still spend in the current window."""
+    return rate_limiter.get_remaining_requests() - config.MEDIA_RESERVED_REQUESTS
+
+
+def _media_rows(media: dict, insights: list[dict]) -> list[dict]:
+    posted_at = parse_graph_timestamp(media.get("timestamp"))
+    return [
+        {
+            "media_id": media["id"],
+            "media_type": media.get("media_type"),
+            "media_product_type": media.get("media_product_type"),
+            "posted_at": posted_at,
+            "metric_name": insight["metric_name"],
+            "metric_value": insight["metric_value"],
+        }
+        for insight in insights
+    ]
+
+
+def _batches(media: Iterator[dict]) -> Iterator[list[dict]]:
+    """Group streamed media into batches that fit the remaining budget."""
+    while True:
+        # One request stays free for the next (prefetched) /media page
+        size = min(config.MEDIA_BATCH_SIZE, media_budget() - 1)
+        if size <= 0:
+            raise RateLimitError("Media collection budget exhausted", rate_limiter.get_reset_time())
+        batch = list(islice(media, size))
+        if not batch:
+            return
+        yield batch
+
+
+def collect_media_for_user(
+    user_id: int,
+    instagram_id: str,
+    access_token: str,
+    now: Optional[datetime] = None,
+) -> dict:
+    """
+    Collect lifetime insights for a user's posts inside the active window.
+
+    Returns:
+        dict with 'success', 'media_count', 'rows_count', 'media_errors',
+        'retries', 'error_class', 'error' keys; partial results are saved
+        when the budget runs out mid-account
+    """
+    api = InstagramAPI(access_token, instagram_id)
+    since = (now or datetime.now(timezone.utc)) - timedelta(days=config.MEDIA_ACTIVE_DAYS)
+    media_count = rows_count = media_errors = 0
+
+    def result(success: bool, error_class: Optional[str] = None, error: Optional[str] = None) -> dict:
+        return {
+            "success": success,
+            "media_count": media_count,
+            "rows_count": rows_count,
+            "media_errors": media_errors,
+            "retries": api.retry_count,
+            "error_class": error_class,
+            "error": error,
+        }
+
+    try:
+        media = api.iter_media(since=since, page_size=config.MEDIA_PAGE_SIZE)
+        for batch in _batches(media):
+            insights, errors = api.get_media_insights([m["id"] for m in batch])
+            rows = [row for m in batch if m["id"] in insights for row in _media_rows(m, insights[m["id"]])]
+            save_media_insights(user_id, rows)
+            media_count += len(insights)
+            rows_count += len(rows)
+            # Individual posts can be unreadable (e.g. copyrighted audio); skip them
+            media_errors += len(errors)
+
+        log_collection(user_id, "media", "success", f"{media_errors} posts failed" if media_errors else None)
+        return result(True)
+
+    except RateLimitError as e:
+        log_collection(user_id, "media", "rate_limited", str(e))
+        return result(False, THROTTLING, f"Rate limited: {e}")
+
+    except InstagramAPIError as e:
+        if e.error_class == THROTTLING:
+            log_collection(user_id, "media", "rate_limited", str(e))
+            return result(False, THROTTLING, f"Rate limited: {e}")
+        log_collection(user_id, "media", "error", str(e))
+        return result(False, e.error_class, f"API error: {e}")
+
+    except Exception as e:
+        log_collection(user_id, "media", "error", str(e))
+        return result(False, None, f"Unexpected error: {e}")
+
+
+def collect_media_all_users() -> dict:
+    """
+    Collect media insights for all users until the budget runs out.
+
+    Returns:
+        Summary dict with per-account counts; 'deferred' counts accounts not
+        reached because the budget was spent
+    """
+    users = get_all_user_records()
+    random.shuffle(users)
+    health_by_user = get_all_account_health()
+    now = datetime.now(timezone.utc)
+    results = {
+        "total_users": len(users),
+        "success": 0,
+        "failed": 0,
+        "quarantined": 0,
+        "deferred": 0,
+        "media": 0,
+        "rows": 0,
+        "media_errors": 0,
+        "retries": 0,
+        "errors": [],
+    }
+
+    for position, user in enumerate(users):
+        if media_budget() <= 1:
+            results["deferred"] = len(users) - position
+            break
+
+        if not circuit_breaker.allows_collection(health_by_user.get(user.id), now):
+            results["quarantined"] += 1
+            continue
+
+        token = get_user_token_record(user.id, "page")
+        if not token:
+            results["failed"] += 1
+            results["errors"].append(f"No page token for user {user.instagram_username}")
+            continue
+
+        result = collect_media_for_user(user.id, user.instagram_id, token.access_token, now)
+        results["media"] += result["media_count"]
+        results["rows"] += result["rows_count"]
+        results["media_errors"] += result["media_errors"]
+        results["retries"] += result["retries"]
+        if result["success"]:
+            results["success"] += 1
+        else:
+            results["failed"] += 1
+            results["errors"].append(f"Media error for {user.instagram_username}: {result['error']}")
+
+    return results
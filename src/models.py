@@ -1,6 +1,12 @@
-"""Pydantic models for urlinsta data structures."""
+"""Pydantic models for urlinsta data structures.
 
-from datetime import datetime
+The ``*Record`` classes at the bottom are slotted, unvalidated counterparts
+used on internal hot paths (collection and token refresh); the pydantic models
+stay at the UI and API boundaries.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
@@ -12,6 +18,7 @@ class User(BaseModel):
     instagram_id: str
     instagram_username: str
     facebook_page_id: str
+    tier: str = "standard"  # Selects collected insight periods (Config.COLLECTION_TIERS)
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -38,16 +45,6 @@ class Insight(BaseModel):
     collected_at: Optional[datetime] = None
 
 
-class AudienceData(BaseModel):
-    """Audience demographic data."""
-
-    id: Optional[int] = None
-    user_id: int
-    data_type: str  # 'city', 'country', 'age_gender'
-    data_json: str  # JSON string of demographic breakdown
-    collected_at: Optional[datetime] = None
-
-
 class CollectionLog(BaseModel):
     """Log entry for data collection runs."""
 
@@ -59,6 +56,52 @@ class CollectionLog(BaseModel):
     collected_at: Optional[datetime] = None
 
 
+class AccountHealth(BaseModel):
+    """Per-account circuit breaker state for scheduled collection."""
+
+    user_id: int
+    state: str = "closed"  # 'closed' or 'open'
+    consecutive_failures: int = 0
+    open_count: int = 0  # Times opened since the last success (sets the probe interval)
+    last_error: Optional[str] = None
+    opened_at: Optional[datetime] = None
+    next_probe_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class FleetAccount(BaseModel):
+    """One account in the admin fleet overview (fleet_overview row)."""
+
+    user_id: int
+    instagram_username: str
+    tier: str
+    followers: Optional[float] = None
+    followers_delta: Optional[float] = None  # Against the previous collection
+    reach: Optional[float] = None
+    reach_delta: Optional[float] = None
+    last_collected_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    attempts_7d: int = 0
+    failures_7d: int = 0
+    error_rate_7d: Optional[float] = None
+    circuit_state: str = "closed"
+    refreshed_at: Optional[datetime] = None
+
+
+class Anomaly(BaseModel):
+    """A metric value far outside the account's recent range (see src/anomaly_detection.py)."""
+
+    id: Optional[int] = None
+    user_id: int
+    metric_name: str  # Insight metric, or 'follower_growth' for daily follower change
+    day: date  # UTC day of the value
+    value: float
+    baseline: float  # Rolling median of the preceding window
+    score: float  # Robust z-score (negative for drops)
+    direction: str  # 'drop' or 'spike'
+    detected_at: Optional[datetime] = None
+
+
 class OAuthState(BaseModel):
     """OAuth state for CSRF protection."""
 
@@ -75,3 +118,26 @@ class InstagramAccount(BaseModel):
     profile_picture_url: Optional[str] = None
     followers_count: Optional[int] = None
     media_count: Optional[int] = None
+
+
+# Lightweight records for internal hot paths
+@dataclass(slots=True, frozen=True)
+class UserRecord:
+    """Slotted, unvalidated user: what the collector and token jobs need."""
+
+    id: int
+    instagram_id: str
+    instagram_username: str
+    facebook_page_id: str
+    tier: str = "standard"
+
+
+@dataclass(slots=True, frozen=True)
+class TokenRecord:
+    """Slotted, unvalidated token."""
+
+    id: int
+    user_id: int
+    token_type: str
+    access_token: str
+    expires_at: Optional[datetime] = None
@@ -13,7 +13,9 @@ from urllib.parse import urlencode
 import requests
 
 from .config import config
+from .instagram_api import iter_graph_pages, session
 from .models import InstagramAccount
+from .rate_limiter import rate_limiter
 
 
 _STATE_TTL_SECONDS = 600
@@ -100,7 +102,7 @@ def exchange_code_for_token(code: str) -> dict:
         "code": code,
     }
 
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params)
     response.raise_for_status()
     return response.json()
 
@@ -115,7 +117,7 @@ def get_long_lived_token(short_lived_token: str) -> dict:
         "fb_exchange_token": short_lived_token,
     }
 
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params)
     response.raise_for_status()
     data = response.json()
 
@@ -136,7 +138,7 @@ def refresh_long_lived_token(token: str) -> dict:
         "fb_exchange_token": token,
     }
 
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params)
     response.raise_for_status()
     data = response.json()
 
@@ -154,6 +156,41 @@ def _safe_json(response: requests.Response) -> dict[str, Any]:
     return data if isinstance(data, dict) else {}
 
 
+def _fetch_page(url: str, params: Optional[dict]) -> dict:
+    """
+    GET one page of a Graph list within the shared rate limit.
+
+    Raises:
+        requests.HTTPError: If the page request failed.
+        RateLimitError: If the rate limit would need a wait of over a minute.
+    """
+    rate_limiter.acquire()
+    response = session.get(url, params=params)
+    rate_limiter.record_request()
+    if response.status_code != 200:
+        raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+    return _safe_json(response)
+
+
+def _list_all(url: str, params: dict) -> tuple[list[dict], int, Optional[dict]]:
+    """
+    Read every page of a Graph list edge.
+
+    Returns:
+        (items, status code, Graph error); on a failed page the items read
+        before it are returned with that page's status and error
+    """
+    items: list[dict] = []
+    try:
+        for page in iter_graph_pages(_fetch_page, url, params, limit=config.GRAPH_PAGE_LIMIT):
+            items.extend(page)
+    except requests.HTTPError as e:
+        raw = _safe_json(e.response)
+        error = raw.get("error", {"message": e.response.text or f"Unknown {url} error"})
+        return items, e.response.status_code, error
+    return items, 200, None
+
+
 def _dedupe_pages(pages: list[dict]) -> list[dict]:
     deduped: list[dict] = []
     seen_page_ids: set[str] = set()
@@ -173,30 +210,24 @@ def _dedupe_pages(pages: list[dict]) -> list[dict]:
     return deduped
 
 
+_PAGE_FIELDS = "id,name,access_token,instagram_business_account"
+
+
 def get_user_pages(
     user_token: str, debug_info: Optional[dict[str, Any]] = None
 ) -> list[dict]:
-    url = f"{config.GRAPH_API_BASE_URL}/me/accounts"
-    params = {
-        "access_token": user_token,
-        "fields": "id,name,access_token,instagram_business_account",
-    }
-
     debug = debug_info if debug_info is not None else {}
 
-    response = requests.get(url, params=params)
-    raw = _safe_json(response)
-    pages = raw.get("data", [])
-    pages = pages if isinstance(pages, list) else []
+    pages, status_code, error = _list_all(
+        f"{config.GRAPH_API_BASE_URL}/me/accounts",
+        {"access_token": user_token, "fields": _PAGE_FIELDS},
+    )
 
-    debug["me_accounts_status_code"] = response.status_code
+    debug["me_accounts_status_code"] = status_code
     debug["me_accounts_count"] = len(pages)
-    if response.status_code != 200:
-        debug["me_accounts_error"] = raw.get(
-            "error", {"message": response.text or "Unknown /me/accounts error"}
-        )
-
-    response.raise_for_status()
+    if error is not None:
+        debug["me_accounts_error"] = error
+        raise requests.HTTPError(f"/me/accounts failed: HTTP {status_code}")
 
     if pages:
         debug["bm_fallback_used"] = False
@@ -204,22 +235,15 @@ def get_user_pages(
 
     debug["bm_fallback_used"] = True
 
-    businesses_url = f"{config.GRAPH_API_BASE_URL}/me/businesses"
-    businesses_response = requests.get(
-        businesses_url, params={"access_token": user_token}
+    businesses, status_code, error = _list_all(
+        f"{config.GRAPH_API_BASE_URL}/me/businesses", {"access_token": user_token}
     )
-    businesses_raw = _safe_json(businesses_response)
-    businesses = businesses_raw.get("data", [])
-    businesses = businesses if isinstance(businesses, list) else []
 
-    debug["bm_businesses_status_code"] = businesses_response.status_code
+    debug["bm_businesses_status_code"] = status_code
     debug["bm_businesses_count"] = len(businesses)
 
-    if businesses_response.status_code != 200:
-        debug["bm_businesses_error"] = businesses_raw.get(
-            "error",
-            {"message": businesses_response.text or "Unknown /me/businesses error"},
-        )
+    if error is not None:
+        debug["bm_businesses_error"] = error
         return []
 
     owned_pages: list[dict] = []
@@ -229,45 +253,24 @@ def get_user_pages(
             continue
 
         # owned_pages 시도
-        owned_pages_url = f"{config.GRAPH_API_BASE_URL}/{business_id}/owned_pages"
-        owned_pages_response = requests.get(
-            owned_pages_url,
-            params={
-                "access_token": user_token,
-                "fields": "id,name,access_token,instagram_business_account",
-            },
+        business_pages, owned_status, owned_error = _list_all(
+            f"{config.GRAPH_API_BASE_URL}/{business_id}/owned_pages",
+            {"access_token": user_token, "fields": _PAGE_FIELDS},
         )
-        owned_pages_raw = _safe_json(owned_pages_response)
-        business_pages = owned_pages_raw.get("data", [])
-        business_pages = business_pages if isinstance(business_pages, list) else []
-        print(f"[DEBUG] owned_pages status: {owned_pages_response.status_code}")
-        print(f"[DEBUG] owned_pages data: {owned_pages_raw}")
+        print(f"[DEBUG] owned_pages status: {owned_status}, count: {len(business_pages)}")
 
         # owned_pages 결과 없으면 client_pages 시도
         if not business_pages:
-            client_pages_url = f"{config.GRAPH_API_BASE_URL}/{business_id}/client_pages"
-            client_pages_response = requests.get(
-                client_pages_url,
-                params={
-                    "access_token": user_token,
-                    "fields": "id,name,access_token,instagram_business_account",
-                },
+            business_pages, client_status, _ = _list_all(
+                f"{config.GRAPH_API_BASE_URL}/{business_id}/client_pages",
+                {"access_token": user_token, "fields": _PAGE_FIELDS},
             )
-            client_pages_raw = _safe_json(client_pages_response)
-            business_pages = client_pages_raw.get("data", [])
-            business_pages = business_pages if isinstance(business_pages, list) else []
-            print(f"[DEBUG] client_pages status: {client_pages_response.status_code}")
-            print(f"[DEBUG] client_pages data: {client_pages_raw}")
+            print(f"[DEBUG] client_pages status: {client_status}, count: {len(business_pages)}")
 
-        if owned_pages_response.status_code != 200 and not business_pages:
+        if owned_error is not None and not business_pages:
             error_list = debug.setdefault("bm_owned_pages_errors", [])
             if isinstance(error_list, list):
-                error_list.append(
-                    {
-                        "business_id": business_id,
-                        "error": owned_pages_raw.get("error"),
-                    }
-                )
+                error_list.append({"business_id": business_id, "error": owned_error})
             continue
 
         owned_pages.extend(business_pages)
@@ -285,7 +288,7 @@ def get_instagram_business_account(
         "fields": "instagram_business_account{id,username,name,profile_picture_url,followers_count,media_count}",
     }
 
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params)
     response.raise_for_status()
     data = response.json()
 
@@ -307,7 +310,7 @@ def get_page_token(user_token: str, page_id: str) -> Optional[str]:
         "access_token": user_token,
         "fields": "access_token",
     }
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params)
     data = _safe_json(response)
     print(f"[DEBUG] get_page_token status: {response.status_code}")
     print(f"[DEBUG] get_page_token response: {data}")
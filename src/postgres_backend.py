@@ -0,0 +1,173 @@
+"""Direct Postgres storage backend (psycopg 3 with a connection pool).
+
+Talks to Postgres directly instead of going through PostgREST, so each query
+skips the HTTPS hop and JSON encoding. Requires the optional ``postgres``
+extra (``psycopg[binary]`` and ``psycopg-pool``).
+
+Statements are prepared server-side on first use (``prepare_threshold=0``),
+which needs a session-level connection: with Supabase use the direct
+connection string or the session pooler (port 5432), not the transaction
+pooler.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+from .sql_backend import SQLBackend
+
+
+class PostgresBackend(SQLBackend):
+    """Storage through a pooled psycopg connection to the Supabase Postgres."""
+
+    placeholder = "%s"
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10):
+        try:
+            from psycopg.rows import dict_row
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise RuntimeError(
+                "DATABASE_BACKEND=postgres requires the optional dependencies: "
+                "pip install 'psycopg[binary]' psycopg-pool"
+            ) from e
+
+        self._pool = ConnectionPool(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"row_factory": dict_row, "prepare_threshold": 0},
+            open=True,
+        )
+
+    @contextmanager
+    def _cursor(self) -> Iterator:
+        # The pool commits on clean exit and rolls back on error
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                yield cur
+
+    def init(self):
+        # Tables are created from supabase_schema.sql; just verify connectivity
+        self._fetchone("SELECT 1 AS ok")
+
+    def close(self):
+        self._pool.close()
+
+    # Insights operations
+    def insert_insights(self, rows: list[dict]):
+        now = self._now()
+        with self._cursor() as cur:
+            with cur.copy(
+                "COPY insights (user_id, metric_name, metric_value, period, collected_at) FROM STDIN"
+            ) as copy:
+                for r in rows:
+                    copy.write_row(
+                        (r["user_id"], r["metric_name"], r["metric_value"], r["period"], now)
+                    )
+
+    def insert_media_insights(self, rows: list[dict]):
+        now = self._now()
+        with self._cursor() as cur:
+            with cur.copy(
+                "COPY media_insights (user_id, media_id, media_type, media_product_type, "
+                "posted_at, metric_name, metric_value, collected_at) FROM STDIN"
+            ) as copy:
+                for r in rows:
+                    copy.write_row(
+                        (
+                            r["user_id"],
+                            r["media_id"],
+                            r.get("media_type"),
+                            r.get("media_product_type"),
+                            self._ts(r["posted_at"]),
+                            r["metric_name"],
+                            r["metric_value"],
+                            now,
+                        )
+                    )
+
+    def iter_insight_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        metric_name: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        # A single ordered query read through a server-side cursor: one
+        # snapshot, one index scan, ``page_size`` rows per round trip
+        query, params = self._insights_query(user_id, start_date, end_date, metric_name)
+        query += " ORDER BY collected_at DESC, id DESC"
+
+        with self._pool.connection() as conn:
+            with conn.cursor(name="insights_history") as cur:
+                cur.execute(self._sql(query), params)
+                while True:
+                    rows = cur.fetchmany(page_size)
+                    if not rows:
+                        return
+                    yield rows
+
+    def iter_fleet_insight_pages(
+        self,
+        start_date: datetime,
+        metric_names: list[str],
+        period: str = "day",
+        page_size: int = 1000,
+        user_ids: Optional[list[int]] = None,
+    ) -> Iterator[list[dict]]:
+        # Server-side cursor so the fleet's rows are not buffered client-side
+        query, params = self._fleet_insights_query(start_date, metric_names, period, user_ids)
+        with self._pool.connection() as conn:
+            with conn.cursor(name="fleet_insights") as cur:
+                cur.execute(self._sql(query), params)
+                while rows := cur.fetchmany(page_size):
+                    yield rows
+
+    def get_latest_insights(self, user_id: int, period: str = "day") -> list[dict]:
+        return self._fetchall(
+            """
+            SELECT DISTINCT ON (metric_name) *
+            FROM insights WHERE user_id = ? AND period = ?
+            ORDER BY metric_name, collected_at DESC, id DESC
+            """,
+            (user_id, period),
+        )
+
+    # Fleet overview operations
+    def refresh_fleet_overview(self):
+        # A real materialized view here (supabase_schema.sql); CONCURRENTLY
+        # keeps it readable while it refreshes
+        with self._pool.connection() as conn:
+            conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY fleet_overview")
+
+    # Audience data operations
+    def iter_audience_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        query, params = self._audience_history_query(user_id, start_date, end_date)
+        with self._pool.connection() as conn:
+            with conn.cursor(name="audience_history") as cur:
+                cur.execute(self._sql(query + " ORDER BY v.snapshot_id, v.key"), params)
+                while rows := cur.fetchmany(page_size):
+                    yield rows
+
+    def get_latest_audience(self, user_id: int) -> list[dict]:
+        return self._fetchall(
+            """
+            SELECT s.metric, s.dimension, v.key, v.value, s.collected_at
+            FROM (
+                SELECT DISTINCT ON (metric, dimension) id, metric, dimension, collected_at
+                FROM audience_snapshots WHERE user_id = ?
+                ORDER BY metric, dimension, collected_at DESC, id DESC
+            ) s
+            JOIN audience_values v ON v.snapshot_id = s.id
+            ORDER BY s.metric, s.dimension, v.value DESC
+            """,
+            (user_id,),
+        )
@@ -49,6 +49,18 @@ class RateLimiter:
 
             return 0.0
 
+    def acquire(self, max_wait: float = 60):
+        """
+        Wait for room before a request (call ``record_request`` after sending it).
+
+        Raises:
+            RateLimitError: If the wait was longer than ``max_wait`` seconds.
+        """
+        if not self.can_make_request():
+            wait_time = self.wait_if_needed()
+            if wait_time > max_wait:
+                raise RateLimitError(f"Rate limit exceeded. Retry after {wait_time:.0f}s", wait_time)
+
     def get_remaining_requests(self) -> int:
         """Get the number of requests remaining in current window."""
         with self._lock:
@@ -0,0 +1,71 @@
+"""Request coalescing for concurrent duplicate work.
+
+When several threads ask for the same thing at once (Dashboard refresh
+racing the scheduler, several browser tabs on Live Insights), only the
+first call runs; the others wait for it and share its result or exception.
+Nothing is cached: once the call finishes, the next call with the same key
+runs again.
+"""
+
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one in-flight call per key; concurrent callers share it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        # Calls executed, and calls that joined one already in flight
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)``, or wait for the in-flight call with ``key``.
+
+        Returns:
+            The result of the call that ran; its exception is raised to
+            every caller that shared it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def params_key(params: dict) -> tuple:
+    """Hashable form of a request's query parameters."""
+    return tuple(sorted((k, str(v)) for k, v in params.items()))
@@ -0,0 +1,855 @@
+"""SQL storage backends talking to the database directly.
+
+``SQLBackend`` holds the queries shared by the DB-API drivers; queries are
+written with ``?`` placeholders and translated per driver. ``SQLiteBackend``
+is an embedded single-file (or in-memory) backend for development, tests and
+single-node deployments.
+"""
+
+import sqlite3
+import threading
+from abc import abstractmethod
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterator, Optional
+
+from .storage import StorageBackend
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instagram_id TEXT UNIQUE NOT NULL,
+    instagram_username TEXT NOT NULL,
+    facebook_page_id TEXT NOT NULL,
+    tier TEXT NOT NULL DEFAULT 'standard',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    token_type TEXT NOT NULL,
+    access_token TEXT NOT NULL,
+    expires_at TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS insights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metric_name TEXT NOT NULL,
+    metric_value REAL NOT NULL,
+    period TEXT NOT NULL,
+    collected_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS audience_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    content_hash TEXT,
+    collected_at TEXT NOT NULL,
+    last_confirmed_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS audience_values (
+    snapshot_id INTEGER NOT NULL REFERENCES audience_snapshots(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (snapshot_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS collection_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    collection_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error_message TEXT,
+    collected_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS account_health (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    state TEXT NOT NULL DEFAULT 'closed',
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    open_count INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    opened_at TEXT,
+    next_probe_at TEXT,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS metric_capabilities (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metric_name TEXT NOT NULL,
+    period TEXT NOT NULL,
+    supported INTEGER NOT NULL,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, metric_name, period)
+);
+
+CREATE TABLE IF NOT EXISTS media_insights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    media_id TEXT NOT NULL,
+    media_type TEXT,
+    media_product_type TEXT,
+    posted_at TEXT NOT NULL,
+    metric_name TEXT NOT NULL,
+    metric_value REAL NOT NULL,
+    collected_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS anomalies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metric_name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    value REAL NOT NULL,
+    baseline REAL NOT NULL,
+    score REAL NOT NULL,
+    direction TEXT NOT NULL,
+    detected_at TEXT NOT NULL,
+    UNIQUE (user_id, metric_name, day)
+);
+
+-- Materialized by SQLBackend.refresh_fleet_overview (a materialized view on Postgres)
+CREATE TABLE IF NOT EXISTS fleet_overview (
+    user_id INTEGER PRIMARY KEY,
+    instagram_username TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    followers REAL,
+    followers_delta REAL,
+    reach REAL,
+    reach_delta REAL,
+    last_collected_at TEXT,
+    last_success_at TEXT,
+    attempts_7d INTEGER NOT NULL,
+    failures_7d INTEGER NOT NULL,
+    error_rate_7d REAL,
+    circuit_state TEXT NOT NULL,
+    refreshed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_insights_user_collected ON insights(user_id, collected_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_insights_metric ON insights(metric_name);
+CREATE INDEX IF NOT EXISTS idx_insights_collected ON insights(collected_at);
+CREATE INDEX IF NOT EXISTS idx_tokens_user ON tokens(user_id, token_type);
+CREATE INDEX IF NOT EXISTS idx_tokens_user_expiry ON tokens(expires_at) WHERE token_type = 'user';
+CREATE INDEX IF NOT EXISTS idx_audience_snapshots_user ON audience_snapshots(user_id, metric, dimension, collected_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audience_values_top ON audience_values(snapshot_id, value DESC);
+CREATE INDEX IF NOT EXISTS idx_collection_log_user ON collection_log(user_id, collected_at DESC);
+CREATE INDEX IF NOT EXISTS idx_media_insights_user_media ON media_insights(user_id, media_id, collected_at DESC);
+CREATE INDEX IF NOT EXISTS idx_anomalies_day ON anomalies(day);
+"""
+
+
+# Same shape as the fleet_overview materialized view in supabase_schema.sql
+FLEET_OVERVIEW_SELECT = """
+SELECT
+    f.user_id,
+    f.instagram_username,
+    f.tier,
+    f.followers,
+    f.followers - f.followers_prev AS followers_delta,
+    f.reach,
+    f.reach - f.reach_prev AS reach_delta,
+    f.last_collected_at,
+    f.last_success_at,
+    f.attempts_7d,
+    f.failures_7d,
+    CASE WHEN f.attempts_7d > 0 THEN 1.0 * f.failures_7d / f.attempts_7d END AS error_rate_7d,
+    f.circuit_state,
+    ? AS refreshed_at
+FROM (
+    SELECT
+        u.id AS user_id,
+        u.instagram_username,
+        u.tier,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'follower_count' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1) AS followers,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'follower_count' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1 OFFSET 1) AS followers_prev,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'reach' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1) AS reach,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'reach' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1 OFFSET 1) AS reach_prev,
+        (SELECT MAX(collected_at) FROM insights i WHERE i.user_id = u.id) AS last_collected_at,
+        (SELECT MAX(collected_at) FROM collection_log l WHERE l.user_id = u.id AND l.status = 'success') AS last_success_at,
+        (SELECT COUNT(*) FROM collection_log l WHERE l.user_id = u.id AND l.collected_at >= ?) AS attempts_7d,
+        (SELECT COUNT(*) FROM collection_log l WHERE l.user_id = u.id AND l.collected_at >= ?
+            AND l.status <> 'success') AS failures_7d,
+        COALESCE(h.state, 'closed') AS circuit_state
+    FROM users u
+    LEFT JOIN account_health h ON h.user_id = u.id
+) f
+"""
+
+
+class SQLBackend(StorageBackend):
+    """Queries shared by the DB-API based backends."""
+
+    # DB-API paramstyle of the driver; queries are written with "?"
+    placeholder = "?"
+
+    @abstractmethod
+    @contextmanager
+    def _cursor(self) -> Iterator[Any]:
+        """Yield a cursor inside a transaction that commits on success."""
+
+    def _sql(self, query: str) -> str:
+        if self.placeholder == "?":
+            return query
+        return query.replace("?", self.placeholder)
+
+    def _ts(self, value: Optional[datetime]):
+        """Convert a datetime to the driver's timestamp parameter (naive means UTC)."""
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    def _now(self):
+        return self._ts(datetime.now(timezone.utc))
+
+    def _day(self, value: date):
+        """Convert a date to the driver's date parameter."""
+        return value
+
+    def _fetchall(self, query: str, params: tuple = ()) -> list[dict]:
+        with self._cursor() as cur:
+            cur.execute(self._sql(query), params)
+            return [dict(row) for row in cur.fetchall()]
+
+    def _fetchone(self, query: str, params: tuple = ()) -> Optional[dict]:
+        with self._cursor() as cur:
+            cur.execute(self._sql(query), params)
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+    def _execute(self, query: str, params: tuple = ()):
+        with self._cursor() as cur:
+            cur.execute(self._sql(query), params)
+
+    # User operations
+    def get_user_by_instagram_id(self, instagram_id: str) -> Optional[dict]:
+        return self._fetchone("SELECT * FROM users WHERE instagram_id = ?", (instagram_id,))
+
+    def get_user_by_id(self, user_id: int) -> Optional[dict]:
+        return self._fetchone("SELECT * FROM users WHERE id = ?", (user_id,))
+
+    def get_all_users(self) -> list[dict]:
+        return self._fetchall("SELECT * FROM users ORDER BY id")
+
+    def upsert_user(
+        self, instagram_id: str, instagram_username: str, facebook_page_id: str
+    ) -> Optional[dict]:
+        now = self._now()
+        return self._fetchone(
+            """
+            INSERT INTO users (instagram_id, instagram_username, facebook_page_id, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (instagram_id) DO UPDATE SET
+                instagram_username = excluded.instagram_username,
+                facebook_page_id = excluded.facebook_page_id,
+                updated_at = excluded.updated_at
+            RETURNING *
+            """,
+            (instagram_id, instagram_username, facebook_page_id, now, now),
+        )
+
+    def update_user_tier(self, user_id: int, tier: str):
+        self._execute(
+            "UPDATE users SET tier = ?, updated_at = ? WHERE id = ?",
+            (tier, self._now(), user_id),
+        )
+
+    # Token operations
+    def replace_token(
+        self,
+        user_id: int,
+        token_type: str,
+        access_token: str,
+        expires_at: Optional[datetime],
+    ):
+        with self._cursor() as cur:
+            cur.execute(
+                self._sql("DELETE FROM tokens WHERE user_id = ? AND token_type = ?"),
+                (user_id, token_type),
+            )
+            cur.execute(
+                self._sql(
+                    "INSERT INTO tokens (user_id, token_type, access_token, expires_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)"
+                ),
+                (user_id, token_type, access_token, self._ts(expires_at), self._now()),
+            )
+
+    def get_user_token(self, user_id: int, token_type: str) -> Optional[dict]:
+        return self._fetchone(
+            "SELECT * FROM tokens WHERE user_id = ? AND token_type = ? ORDER BY id DESC LIMIT 1",
+            (user_id, token_type),
+        )
+
+    def get_expiring_tokens(self, threshold: datetime) -> list[dict]:
+        rows = self._fetchall(
+            """
+            SELECT t.*, u.instagram_id, u.instagram_username, u.facebook_page_id
+            FROM tokens t JOIN users u ON u.id = t.user_id
+            WHERE t.token_type = 'user' AND t.expires_at < ?
+            ORDER BY t.expires_at
+            """,
+            (self._ts(threshold),),
+        )
+        for row in rows:
+            row["users"] = {
+                "id": row["user_id"],
+                "instagram_id": row.pop("instagram_id"),
+                "instagram_username": row.pop("instagram_username"),
+                "facebook_page_id": row.pop("facebook_page_id"),
+            }
+        return rows
+
+    # Insights operations
+    def insert_insights(self, rows: list[dict]):
+        now = self._now()
+        with self._cursor() as cur:
+            cur.executemany(
+                self._sql(
+                    "INSERT INTO insights (user_id, metric_name, metric_value, period, collected_at) "
+                    "VALUES (?, ?, ?, ?, ?)"
+                ),
+                [
+                    (r["user_id"], r["metric_name"], r["metric_value"], r["period"], now)
+                    for r in rows
+                ],
+            )
+
+    def insert_media_insights(self, rows: list[dict]):
+        now = self._now()
+        with self._cursor() as cur:
+            cur.executemany(
+                self._sql(
+                    "INSERT INTO media_insights (user_id, media_id, media_type, media_product_type, "
+                    "posted_at, metric_name, metric_value, collected_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                ),
+                [
+                    (
+                        r["user_id"],
+                        r["media_id"],
+                        r.get("media_type"),
+                        r.get("media_product_type"),
+                        self._ts(r["posted_at"]),
+                        r["metric_name"],
+                        r["metric_value"],
+                        now,
+                    )
+                    for r in rows
+                ],
+            )
+
+    def _insights_query(
+        self,
+        user_id: int,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        metric_name: Optional[str],
+    ) -> tuple[str, list]:
+        query = "SELECT * FROM insights WHERE user_id = ?"
+        params: list = [user_id]
+        if start_date:
+            query += " AND collected_at >= ?"
+            params.append(self._ts(start_date))
+        if end_date:
+            query += " AND collected_at <= ?"
+            params.append(self._ts(end_date))
+        if metric_name:
+            query += " AND metric_name = ?"
+            params.append(metric_name)
+        return query, params
+
+    def iter_insight_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        metric_name: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        base_query, base_params = self._insights_query(user_id, start_date, end_date, metric_name)
+        cursor = None
+        while True:
+            query, params = base_query, list(base_params)
+            if cursor:
+                query += " AND (collected_at, id) < (?, ?)"
+                params.extend(cursor)
+            query += " ORDER BY collected_at DESC, id DESC LIMIT ?"
+            params.append(page_size)
+
+            rows = self._fetchall(query, tuple(params))
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1]["collected_at"], rows[-1]["id"])
+
+    def _fleet_insights_query(
+        self,
+        start_date: datetime,
+        metric_names: list[str],
+        period: str,
+        user_ids: Optional[list[int]] = None,
+    ) -> tuple[str, tuple]:
+        placeholders = ", ".join("?" for _ in metric_names)
+        query = (
+            "SELECT user_id, metric_name, metric_value, collected_at FROM insights "
+            f"WHERE collected_at >= ? AND period = ? AND metric_name IN ({placeholders})"
+        )
+        params: tuple = (self._ts(start_date), period, *metric_names)
+        if user_ids is not None:
+            query += f" AND user_id IN ({', '.join('?' for _ in user_ids) or 'NULL'})"
+            params += tuple(user_ids)
+        return query, params
+
+    def iter_fleet_insight_pages(
+        self,
+        start_date: datetime,
+        metric_names: list[str],
+        period: str = "day",
+        page_size: int = 1000,
+        user_ids: Optional[list[int]] = None,
+    ) -> Iterator[list[dict]]:
+        # Keyset pages, each fetched in its own short statement so no lock or
+        # transaction is held while the caller works on a page
+        if user_ids is not None:
+            yield from self._iter_users_insight_pages(
+                start_date, metric_names, period, page_size, user_ids
+            )
+            return
+
+        # Per metric, idx_insights_metric yields rows in id order, so every
+        # page resumes the index scan where the previous one stopped
+        query = (
+            "SELECT id, user_id, metric_name, metric_value, collected_at FROM insights "
+            "WHERE metric_name = ? AND id > ? AND collected_at >= ? AND period = ? "
+            "ORDER BY id LIMIT ?"
+        )
+        for metric_name in metric_names:
+            last_id = 0
+            while True:
+                rows = self._fetchall(
+                    query, (metric_name, last_id, self._ts(start_date), period, page_size)
+                )
+                if rows:
+                    yield rows
+                if len(rows) < page_size:
+                    break
+                last_id = rows[-1]["id"]
+
+    def _iter_users_insight_pages(
+        self,
+        start_date: datetime,
+        metric_names: list[str],
+        period: str,
+        page_size: int,
+        user_ids: list[int],
+    ) -> Iterator[list[dict]]:
+        # Per user, a range of idx_insights_user_collected: a few accounts are
+        # read without touching the rest of the fleet
+        placeholders = ", ".join("?" for _ in metric_names)
+        base_query = (
+            "SELECT id, user_id, metric_name, metric_value, collected_at FROM insights "
+            f"WHERE user_id = ? AND collected_at >= ? AND period = ? AND metric_name IN ({placeholders})"
+        )
+        for user_id in user_ids:
+            cursor = None
+            while True:
+                query = base_query
+                params = [user_id, self._ts(start_date), period, *metric_names]
+                if cursor:
+                    query += " AND (collected_at, id) < (?, ?)"
+                    params.extend(cursor)
+                query += " ORDER BY collected_at DESC, id DESC LIMIT ?"
+                params.append(page_size)
+
+                rows = self._fetchall(query, tuple(params))
+                if rows:
+                    yield rows
+                if len(rows) < page_size:
+                    break
+                cursor = (rows[-1]["collected_at"], rows[-1]["id"])
+
+    def get_latest_insights(self, user_id: int, period: str = "day") -> list[dict]:
+        return self._fetchall(
+            """
+            SELECT id, user_id, metric_name, metric_value, period, collected_at FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY metric_name ORDER BY collected_at DESC, id DESC
+                ) AS rn
+                FROM insights WHERE user_id = ? AND period = ?
+            ) ranked WHERE rn = 1
+            """,
+            (user_id, period),
+        )
+
+    def get_last_collected_at(self, user_ids: list[int]) -> list[dict]:
+        if not user_ids:
+            return []
+        # One index seek per user (idx_insights_user_collected)
+        placeholders = ", ".join("?" for _ in user_ids)
+        return self._fetchall(
+            f"""
+            SELECT user_id, collected_at FROM (
+                SELECT u.id AS user_id, (
+                    SELECT collected_at FROM insights i
+                    WHERE i.user_id = u.id ORDER BY collected_at DESC LIMIT 1
+                ) AS collected_at
+                FROM users u WHERE u.id IN ({placeholders})
+            ) latest WHERE collected_at IS NOT NULL
+            """,
+            tuple(user_ids),
+        )
+
+    # Audience data operations
+    def save_audience_snapshot(
+        self,
+        user_id: int,
+        metric: str,
+        dimension: str,
+        values: dict[str, float],
+        content_hash: str,
+    ) -> bool:
+        now = self._now()
+        with self._cursor() as cur:
+            cur.execute(
+                self._sql(
+                    "SELECT id, content_hash FROM audience_snapshots "
+                    "WHERE user_id = ? AND metric = ? AND dimension = ? "
+                    "ORDER BY collected_at DESC, id DESC LIMIT 1"
+                ),
+                (user_id, metric, dimension),
+            )
+            latest = cur.fetchone()
+            if latest and latest["content_hash"] == content_hash:
+                cur.execute(
+                    self._sql("UPDATE audience_snapshots SET last_confirmed_at = ? WHERE id = ?"),
+                    (now, latest["id"]),
+                )
+                return False
+
+            cur.execute(
+                self._sql(
+                    "INSERT INTO audience_snapshots "
+                    "(user_id, metric, dimension, content_hash, collected_at, last_confirmed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) RETURNING id"
+                ),
+                (user_id, metric, dimension, content_hash, now, now),
+            )
+            snapshot_id = cur.fetchone()["id"]
+            cur.executemany(
+                self._sql("INSERT INTO audience_values (snapshot_id, key, value) VALUES (?, ?, ?)"),
+                [(snapshot_id, key, value) for key, value in values.items()],
+            )
+            return True
+
+    # Newest snapshot id per (metric, dimension) of a user
+    _LATEST_AUDIENCE_SNAPSHOTS = """
+        SELECT id, metric, dimension, collected_at FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY metric, dimension ORDER BY collected_at DESC, id DESC
+            ) AS rn
+            FROM audience_snapshots WHERE user_id = ?
+        ) ranked WHERE rn = 1
+    """
+
+    def get_latest_audience(self, user_id: int) -> list[dict]:
+        return self._fetchall(
+            f"""
+            SELECT s.metric, s.dimension, v.key, v.value, s.collected_at
+            FROM ({self._LATEST_AUDIENCE_SNAPSHOTS}) s
+            JOIN audience_values v ON v.snapshot_id = s.id
+            ORDER BY s.metric, s.dimension, v.value DESC
+            """,
+            (user_id,),
+        )
+
+    def get_audience_top(
+        self, user_id: int, metric: str, dimension: str, limit: int
+    ) -> list[dict]:
+        return self._fetchall(
+            """
+            SELECT key, value FROM audience_values
+            WHERE snapshot_id = (
+                SELECT id FROM audience_snapshots
+                WHERE user_id = ? AND metric = ? AND dimension = ?
+                ORDER BY collected_at DESC, id DESC LIMIT 1
+            )
+            ORDER BY value DESC, key LIMIT ?
+            """,
+            (user_id, metric, dimension, limit),
+        )
+
+    def get_audience_trend(
+        self,
+        user_id: int,
+        metric: str,
+        dimension: str,
+        keys: list[str],
+        start_date: Optional[datetime] = None,
+    ) -> list[dict]:
+        if not keys:
+            return []
+        placeholders = ", ".join("?" for _ in keys)
+        query = (
+            "SELECT s.collected_at, s.last_confirmed_at, v.key, v.value FROM audience_snapshots s "
+            "JOIN audience_values v ON v.snapshot_id = s.id "
+            f"WHERE s.user_id = ? AND s.metric = ? AND s.dimension = ? AND v.key IN ({placeholders})"
+        )
+        params: list = [user_id, metric, dimension, *keys]
+        if start_date:
+            query += " AND s.last_confirmed_at >= ?"
+            params.append(self._ts(start_date))
+        return self._fetchall(query + " ORDER BY s.collected_at, s.id, v.key", tuple(params))
+
+    def _audience_history_query(
+        self, user_id: int, start_date: Optional[datetime], end_date: Optional[datetime]
+    ) -> tuple[str, list]:
+        query = (
+            "SELECT v.snapshot_id, s.metric, s.dimension, s.collected_at, s.last_confirmed_at, "
+            "v.key, v.value FROM audience_snapshots s "
+            "JOIN audience_values v ON v.snapshot_id = s.id WHERE s.user_id = ?"
+        )
+        params: list = [user_id]
+        # Snapshots still current at start_date overlap the range
+        if start_date:
+            query += " AND s.last_confirmed_at >= ?"
+            params.append(self._ts(start_date))
+        if end_date:
+            query += " AND s.collected_at <= ?"
+            params.append(self._ts(end_date))
+        return query, params
+
+    def iter_audience_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        base_query, base_params = self._audience_history_query(user_id, start_date, end_date)
+        cursor = None
+        while True:
+            query, params = base_query, list(base_params)
+            if cursor:
+                query += " AND (v.snapshot_id, v.key) > (?, ?)"
+                params.extend(cursor)
+            query += " ORDER BY v.snapshot_id, v.key LIMIT ?"
+            params.append(page_size)
+
+            rows = self._fetchall(query, tuple(params))
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1]["snapshot_id"], rows[-1]["key"])
+
+    # Account health (circuit breaker) operations
+    def get_account_health(self, user_id: int) -> Optional[dict]:
+        return self._fetchone("SELECT * FROM account_health WHERE user_id = ?", (user_id,))
+
+    def get_all_account_health(self) -> list[dict]:
+        return self._fetchall("SELECT * FROM account_health ORDER BY user_id")
+
+    def upsert_account_health(self, row: dict):
+        self._execute(
+            """
+            INSERT INTO account_health (
+                user_id, state, consecutive_failures, open_count,
+                last_error, opened_at, next_probe_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET
+                state = excluded.state,
+                consecutive_failures = excluded.consecutive_failures,
+                open_count = excluded.open_count,
+                last_error = excluded.last_error,
+                opened_at = excluded.opened_at,
+                next_probe_at = excluded.next_probe_at,
+                updated_at = excluded.updated_at
+            """,
+            (
+                row["user_id"],
+                row["state"],
+                row["consecutive_failures"],
+                row["open_count"],
+                row.get("last_error"),
+                self._ts(row.get("opened_at")),
+                self._ts(row.get("next_probe_at")),
+                self._now(),
+            ),
+        )
+
+    # Metric capability operations
+    def get_metric_capabilities(self, user_id: Optional[int] = None) -> list[dict]:
+        if user_id is None:
+            rows = self._fetchall("SELECT * FROM metric_capabilities")
+        else:
+            rows = self._fetchall(
+                "SELECT * FROM metric_capabilities WHERE user_id = ?", (user_id,)
+            )
+        for row in rows:
+            row["supported"] = bool(row["supported"])
+        return rows
+
+    def upsert_metric_capabilities(self, rows: list[dict]):
+        now = self._now()
+        with self._cursor() as cur:
+            cur.executemany(
+                self._sql(
+                    """
+                    INSERT INTO metric_capabilities (user_id, metric_name, period, supported, checked_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, metric_name, period) DO UPDATE SET
+                        supported = excluded.supported,
+                        checked_at = excluded.checked_at
+                    """
+                ),
+                [
+                    (r["user_id"], r["metric_name"], r["period"], r["supported"], now)
+                    for r in rows
+                ],
+            )
+
+    # Fleet overview operations
+    def refresh_fleet_overview(self):
+        now = datetime.now(timezone.utc)
+        since = self._ts(now - timedelta(days=7))
+        with self._cursor() as cur:
+            cur.execute("DELETE FROM fleet_overview")
+            cur.execute(
+                self._sql(f"INSERT INTO fleet_overview {FLEET_OVERVIEW_SELECT}"),
+                (self._ts(now), since, since),
+            )
+
+    def get_fleet_overview(
+        self, sort_by: str, descending: bool, limit: int, offset: int
+    ) -> tuple[list[dict], int]:
+        direction = "DESC" if descending else "ASC"
+        rows = self._fetchall(
+            f"SELECT * FROM fleet_overview ORDER BY {sort_by} {direction} NULLS LAST, user_id "
+            "LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        total = self._fetchone("SELECT COUNT(*) AS n FROM fleet_overview")["n"]
+        return rows, total
+
+    # Anomaly operations
+    def replace_anomalies(self, since_day: date, rows: list[dict]):
+        now = self._now()
+        with self._cursor() as cur:
+            cur.execute(self._sql("DELETE FROM anomalies WHERE day >= ?"), (self._day(since_day),))
+            cur.executemany(
+                self._sql(
+                    "INSERT INTO anomalies (user_id, metric_name, day, value, baseline, score, "
+                    "direction, detected_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                ),
+                [
+                    (
+                        r["user_id"],
+                        r["metric_name"],
+                        self._day(r["day"]),
+                        r["value"],
+                        r["baseline"],
+                        r["score"],
+                        r["direction"],
+                        now,
+                    )
+                    for r in rows
+                ],
+            )
+
+    def get_anomalies(self, user_id: int, since_day: date) -> list[dict]:
+        return self._fetchall(
+            "SELECT * FROM anomalies WHERE user_id = ? AND day >= ? ORDER BY day DESC, metric_name",
+            (user_id, self._day(since_day)),
+        )
+
+    # Collection log operations
+    def insert_collection_log(
+        self,
+        user_id: int,
+        collection_type: str,
+        status: str,
+        error_message: Optional[str] = None,
+    ):
+        self._execute(
+            "INSERT INTO collection_log (user_id, collection_type, status, error_message, collected_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (user_id, collection_type, status, error_message, self._now()),
+        )
+
+
+class SQLiteBackend(SQLBackend):
+    """
+    Embedded SQLite storage.
+
+    A single connection is shared across threads behind a lock; sqlite3 keeps
+    a per-connection cache of compiled statements, so the parameterized
+    queries above are prepared once and reused.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._initialized = False
+        self.init()
+
+    @contextmanager
+    def _cursor(self) -> Iterator[sqlite3.Cursor]:
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                yield cur
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                cur.close()
+
+    def _ts(self, value: Optional[datetime]) -> Optional[str]:
+        # Fixed-width UTC ISO strings sort and compare correctly as text
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+    def _day(self, value: date) -> str:
+        return value.isoformat()
+
+    def init(self):
+        with self._lock:
+            if not self._initialized:
+                self._conn.executescript(SQLITE_SCHEMA)
+                self._initialized = True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
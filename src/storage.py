@@ -0,0 +1,242 @@
+"""Storage backend interface.
+
+``src/database.py`` exposes the public data-access functions and builds the
+pydantic models; a ``StorageBackend`` does the actual reads and writes and
+deals only in plain row dicts keyed by column name.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+
+class StorageBackend(ABC):
+    """Row-level persistence for users, tokens, insights, audience and logs."""
+
+    def init(self):
+        """Prepare the backend (create tables, verify connectivity)."""
+
+    # User operations
+    @abstractmethod
+    def get_user_by_instagram_id(self, instagram_id: str) -> Optional[dict]:
+        """Return the users row with this Instagram ID."""
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: int) -> Optional[dict]:
+        """Return the users row with this internal ID."""
+
+    @abstractmethod
+    def get_all_users(self) -> list[dict]:
+        """Return every users row."""
+
+    @abstractmethod
+    def upsert_user(
+        self, instagram_id: str, instagram_username: str, facebook_page_id: str
+    ) -> Optional[dict]:
+        """Insert a user or update the existing one; return the stored row."""
+
+    @abstractmethod
+    def update_user_tier(self, user_id: int, tier: str):
+        """Set the user's collection tier."""
+
+    # Token operations
+    @abstractmethod
+    def replace_token(
+        self,
+        user_id: int,
+        token_type: str,
+        access_token: str,
+        expires_at: Optional[datetime],
+    ):
+        """Replace the user's token of ``token_type``."""
+
+    @abstractmethod
+    def get_user_token(self, user_id: int, token_type: str) -> Optional[dict]:
+        """Return the tokens row for this user and type."""
+
+    @abstractmethod
+    def get_expiring_tokens(self, threshold: datetime) -> list[dict]:
+        """
+        Return user tokens expiring before ``threshold``, soonest first.
+
+        Each row carries its owner under a nested ``"users"`` key.
+        """
+
+    # Insights operations
+    @abstractmethod
+    def insert_insights(self, rows: list[dict]):
+        """Bulk insert insights rows (user_id, metric_name, metric_value, period)."""
+
+    @abstractmethod
+    def insert_media_insights(self, rows: list[dict]):
+        """
+        Bulk insert media_insights rows (user_id, media_id, media_type,
+        media_product_type, posted_at, metric_name, metric_value).
+        """
+
+    @abstractmethod
+    def iter_insight_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        metric_name: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        """
+        Yield a user's insights rows newest first, at most ``page_size`` per page.
+
+        Pages are read with keyset pagination on (collected_at, id), so memory
+        stays constant and no rows are dropped by server response caps.
+        """
+
+    @abstractmethod
+    def iter_fleet_insight_pages(
+        self,
+        start_date: datetime,
+        metric_names: list[str],
+        period: str = "day",
+        page_size: int = 1000,
+        user_ids: Optional[list[int]] = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Yield every account's insights since ``start_date``, in no particular order.
+
+        Rows carry at least user_id, metric_name, metric_value and
+        collected_at; one scan for the whole fleet (or the ``user_ids``
+        accounts) instead of a query per user.
+        """
+
+    @abstractmethod
+    def get_latest_insights(self, user_id: int, period: str = "day") -> list[dict]:
+        """Return the newest insights row of ``period`` for each metric of a user."""
+
+    @abstractmethod
+    def get_last_collected_at(self, user_ids: list[int]) -> list[dict]:
+        """Return ``{user_id, collected_at}`` of each user's newest insights row (one query)."""
+
+    # Audience data operations
+    @abstractmethod
+    def save_audience_snapshot(
+        self,
+        user_id: int,
+        metric: str,
+        dimension: str,
+        values: dict[str, float],
+        content_hash: str,
+    ) -> bool:
+        """
+        Store one audience breakdown snapshot and its key/value rows, unless
+        the newest snapshot of the breakdown has the same ``content_hash``;
+        then only its ``last_confirmed_at`` is set to now.
+
+        Returns:
+            True if a new snapshot was stored
+        """
+
+    @abstractmethod
+    def get_latest_audience(self, user_id: int) -> list[dict]:
+        """
+        Return the key/value rows of the newest snapshot of each breakdown
+        (metric, dimension, key, value, collected_at).
+        """
+
+    @abstractmethod
+    def get_audience_top(
+        self, user_id: int, metric: str, dimension: str, limit: int
+    ) -> list[dict]:
+        """Return the ``limit`` largest keys (key, value) of the newest snapshot."""
+
+    @abstractmethod
+    def get_audience_trend(
+        self,
+        user_id: int,
+        metric: str,
+        dimension: str,
+        keys: list[str],
+        start_date: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Return (collected_at, last_confirmed_at, key, value) rows for ``keys``
+        across snapshots, oldest first.
+        """
+
+    @abstractmethod
+    def iter_audience_pages(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 1000,
+    ) -> Iterator[list[dict]]:
+        """
+        Yield a user's audience history (snapshot_id, metric, dimension,
+        collected_at, last_confirmed_at, key, value) oldest snapshot first, at
+        most ``page_size`` rows per page, keyset-paginated on (snapshot_id, key).
+        A snapshot is in range when it was current at some point between
+        ``start_date`` (last_confirmed_at) and ``end_date`` (collected_at).
+        """
+
+    # Account health (circuit breaker) operations
+    @abstractmethod
+    def get_account_health(self, user_id: int) -> Optional[dict]:
+        """Return the account_health row for a user."""
+
+    @abstractmethod
+    def get_all_account_health(self) -> list[dict]:
+        """Return every account_health row."""
+
+    @abstractmethod
+    def upsert_account_health(self, row: dict):
+        """Insert or replace a user's account_health row (keyed by user_id)."""
+
+    # Metric capability operations
+    @abstractmethod
+    def get_metric_capabilities(self, user_id: Optional[int] = None) -> list[dict]:
+        """Return metric_capabilities rows for one user, or for all users."""
+
+    @abstractmethod
+    def upsert_metric_capabilities(self, rows: list[dict]):
+        """
+        Insert or update capability rows (user_id, metric_name, period, supported),
+        keyed by (user_id, metric_name, period); ``checked_at`` is set to now.
+        """
+
+    # Fleet overview operations
+    @abstractmethod
+    def refresh_fleet_overview(self):
+        """Recompute the fleet_overview aggregate from users, insights, logs and health."""
+
+    @abstractmethod
+    def get_fleet_overview(
+        self, sort_by: str, descending: bool, limit: int, offset: int
+    ) -> tuple[list[dict], int]:
+        """
+        Return one page of fleet_overview rows and the total row count.
+
+        ``sort_by`` must be a fleet_overview column (callers validate it);
+        nulls sort last, ties by user_id.
+        """
+
+    # Anomaly operations
+    @abstractmethod
+    def replace_anomalies(self, since_day: date, rows: list[dict]):
+        """
+        Replace the anomalies from ``since_day`` on with ``rows`` (user_id,
+        metric_name, day, value, baseline, score, direction).
+        """
+
+    @abstractmethod
+    def get_anomalies(self, user_id: int, since_day: date) -> list[dict]:
+        """Return a user's anomalies from ``since_day`` on, newest day first."""
+
+    # Collection log operations
+    @abstractmethod
+    def insert_collection_log(
+        self,
+        user_id: int,
+        collection_type: str,
+        status: str,
+        error_message: Optional[str] = None,
+    ):
+        """Record a collection attempt."""
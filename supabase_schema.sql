@@ -7,6 +7,9 @@ CREATE TABLE users (
     instagram_id TEXT UNIQUE NOT NULL,
     instagram_username TEXT NOT NULL,
     facebook_page_id TEXT NOT NULL,
+    -- Collection tier, selects insight periods (Config.COLLECTION_TIERS)
+    -- Existing databases: ALTER TABLE users ADD COLUMN tier TEXT NOT NULL DEFAULT 'standard';
+    tier TEXT NOT NULL DEFAULT 'standard',
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -31,15 +34,105 @@ CREATE TABLE insights (
     collected_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- Audience data table
-CREATE TABLE audience_data (
+-- Newest value of each metric and period per user (served by idx_insights_user_metric)
+CREATE VIEW latest_insights WITH (security_invoker = true) AS
+SELECT DISTINCT ON (user_id, metric_name, period) *
+FROM insights
+ORDER BY user_id, metric_name, period, collected_at DESC, id DESC;
+
+-- Newest collected_at of each given user with insights (get_last_collected_at):
+-- one row per user, one idx_insights_user_collected seek each
+CREATE FUNCTION last_collected_at(p_user_ids BIGINT[])
+RETURNS TABLE (user_id BIGINT, collected_at TIMESTAMPTZ)
+LANGUAGE sql STABLE AS $$
+    SELECT t.user_id, t.collected_at FROM (
+        SELECT u.id AS user_id,
+               (SELECT MAX(i.collected_at) FROM insights i WHERE i.user_id = u.id) AS collected_at
+        FROM unnest(p_user_ids) AS u(id)
+    ) t
+    WHERE t.collected_at IS NOT NULL;
+$$;
+
+-- Audience demographics: one snapshot per collected breakdown (metric x
+-- dimension), one row per breakdown key (e.g. a city) and its value.
+-- A collection identical to the newest snapshot (same content_hash) is not
+-- stored again; it only moves that snapshot's last_confirmed_at forward.
+CREATE TABLE audience_snapshots (
     id BIGSERIAL PRIMARY KEY,
     user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    data_type TEXT NOT NULL,
-    data_json JSONB NOT NULL,
-    collected_at TIMESTAMPTZ DEFAULT NOW()
+    metric TEXT NOT NULL, -- e.g. 'follower_demographics'
+    dimension TEXT NOT NULL, -- 'city', 'country', 'age', 'gender'
+    content_hash TEXT, -- SHA-256 of the sorted key/value pairs
+    collected_at TIMESTAMPTZ DEFAULT NOW(),
+    last_confirmed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE audience_values (
+    snapshot_id BIGINT NOT NULL REFERENCES audience_snapshots(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (snapshot_id, key)
 );
 
+-- Newest snapshot of each breakdown per user (served by idx_audience_snapshots_user)
+CREATE VIEW latest_audience_snapshots WITH (security_invoker = true) AS
+SELECT DISTINCT ON (user_id, metric, dimension)
+    id, user_id, metric, dimension, content_hash, collected_at, last_confirmed_at
+FROM audience_snapshots
+ORDER BY user_id, metric, dimension, collected_at DESC, id DESC;
+
+-- Store one collected breakdown in a single transaction (save_audience_snapshot):
+-- re-confirm the newest snapshot if its content_hash matches, otherwise
+-- insert the snapshot and its values together. Returns true when stored.
+CREATE FUNCTION save_audience_snapshot(
+    p_user_id BIGINT,
+    p_metric TEXT,
+    p_dimension TEXT,
+    p_values JSONB,
+    p_content_hash TEXT
+) RETURNS BOOLEAN
+LANGUAGE plpgsql AS $$
+DECLARE
+    latest audience_snapshots%ROWTYPE;
+    new_id BIGINT;
+BEGIN
+    SELECT * INTO latest FROM audience_snapshots
+    WHERE user_id = p_user_id AND metric = p_metric AND dimension = p_dimension
+    ORDER BY collected_at DESC, id DESC
+    LIMIT 1
+    FOR UPDATE;
+
+    IF FOUND AND latest.content_hash = p_content_hash THEN
+        UPDATE audience_snapshots SET last_confirmed_at = NOW() WHERE id = latest.id;
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO audience_snapshots (user_id, metric, dimension, content_hash, collected_at, last_confirmed_at)
+    VALUES (p_user_id, p_metric, p_dimension, p_content_hash, NOW(), NOW())
+    RETURNING id INTO new_id;
+
+    INSERT INTO audience_values (snapshot_id, key, value)
+    SELECT new_id, kv.key, kv.value::double precision
+    FROM jsonb_each_text(p_values) kv;
+    RETURN TRUE;
+END;
+$$;
+
+-- Existing databases stored each breakdown as a JSON blob in audience_data
+-- (data_type = '<metric>_<dimension>', data_json usually a JSON-encoded
+-- string). Migrate, then drop the old table:
+--   INSERT INTO audience_snapshots (id, user_id, metric, dimension, collected_at, last_confirmed_at)
+--   SELECT id, user_id, regexp_replace(data_type, '_[^_]+$', ''),
+--          substring(data_type from '[^_]+$'), collected_at, collected_at
+--   FROM audience_data;
+--   INSERT INTO audience_values (snapshot_id, key, value)
+--   SELECT a.id, kv.key, kv.value::double precision
+--   FROM audience_data a,
+--        jsonb_each_text(CASE jsonb_typeof(a.data_json)
+--            WHEN 'string' THEN (a.data_json #>> '{}')::jsonb ELSE a.data_json END) kv;
+--   SELECT setval('audience_snapshots_id_seq', (SELECT MAX(id) FROM audience_snapshots));
+--   DROP TABLE audience_data;
+
 -- Collection log table
 CREATE TABLE collection_log (
     id BIGSERIAL PRIMARY KEY,
@@ -50,22 +143,154 @@ CREATE TABLE collection_log (
     collected_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Per-account circuit breaker state (src/circuit_breaker.py)
+CREATE TABLE account_health (
+    user_id BIGINT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    state TEXT NOT NULL DEFAULT 'closed',
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    open_count INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    opened_at TIMESTAMPTZ,
+    next_probe_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Metric/period combinations Graph accepts per account (InstagramAPI capability cache)
+CREATE TABLE metric_capabilities (
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metric_name TEXT NOT NULL,
+    period TEXT NOT NULL,
+    supported BOOLEAN NOT NULL,
+    checked_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, metric_name, period)
+);
+
+-- Lifetime insights per post, re-collected while the post is in its active window
+CREATE TABLE media_insights (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    media_id TEXT NOT NULL,
+    media_type TEXT,
+    media_product_type TEXT,
+    posted_at TIMESTAMPTZ NOT NULL,
+    metric_name TEXT NOT NULL,
+    metric_value DOUBLE PRECISION NOT NULL,
+    collected_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Metric values far outside an account's recent range; rewritten for the
+-- latest days after every collection run (src/anomaly_detection.py)
+CREATE TABLE anomalies (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metric_name TEXT NOT NULL,
+    day DATE NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    baseline DOUBLE PRECISION NOT NULL,
+    score DOUBLE PRECISION NOT NULL,
+    direction TEXT NOT NULL, -- 'drop' or 'spike'
+    detected_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (user_id, metric_name, day)
+);
+
 -- Indexes
-CREATE INDEX idx_insights_user_collected ON insights(user_id, collected_at);
+-- Matches the keyset pagination order used by iter_insight_pages
+CREATE INDEX idx_insights_user_collected ON insights(user_id, collected_at DESC, id DESC);
 CREATE INDEX idx_insights_metric ON insights(metric_name);
+-- Latest value per metric (latest_insights, get_latest_insights)
+CREATE INDEX idx_insights_user_metric ON insights(user_id, metric_name, period, collected_at DESC, id DESC);
+-- Fleet-wide scans of recent insights (iter_fleet_insight_pages)
+CREATE INDEX idx_insights_collected ON insights(collected_at);
 CREATE INDEX idx_tokens_user ON tokens(user_id);
-CREATE INDEX idx_audience_user ON audience_data(user_id);
+-- Partial index for the refresh-ahead planner (get_expiring_tokens)
+CREATE INDEX idx_tokens_user_expiry ON tokens(expires_at) WHERE token_type = 'user';
+-- Latest snapshot per breakdown, and trends over time
+CREATE INDEX idx_audience_snapshots_user ON audience_snapshots(user_id, metric, dimension, collected_at DESC, id DESC);
+-- Top-N keys of a snapshot
+CREATE INDEX idx_audience_values_top ON audience_values(snapshot_id, value DESC);
+CREATE INDEX idx_media_insights_user_media ON media_insights(user_id, media_id, collected_at DESC);
+CREATE INDEX idx_anomalies_day ON anomalies(day);
 
 -- Enable Row Level Security (optional but recommended)
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE tokens ENABLE ROW LEVEL SECURITY;
 ALTER TABLE insights ENABLE ROW LEVEL SECURITY;
-ALTER TABLE audience_data ENABLE ROW LEVEL SECURITY;
+ALTER TABLE audience_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE audience_values ENABLE ROW LEVEL SECURITY;
 ALTER TABLE collection_log ENABLE ROW LEVEL SECURITY;
+ALTER TABLE account_health ENABLE ROW LEVEL SECURITY;
+ALTER TABLE metric_capabilities ENABLE ROW LEVEL SECURITY;
+ALTER TABLE media_insights ENABLE ROW LEVEL SECURITY;
+ALTER TABLE anomalies ENABLE ROW LEVEL SECURITY;
 
 -- Allow all operations for authenticated service role
 CREATE POLICY "Service role full access" ON users FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON tokens FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON insights FOR ALL USING (true);
-CREATE POLICY "Service role full access" ON audience_data FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON audience_snapshots FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON audience_values FOR ALL USING (true);
 CREATE POLICY "Service role full access" ON collection_log FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON account_health FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON metric_capabilities FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON media_insights FOR ALL USING (true);
+CREATE POLICY "Service role full access" ON anomalies FOR ALL USING (true);
+
+-- Fleet overview for the admin page: one row per account with the latest
+-- followers/reach, deltas against the previous collection, collection
+-- health over the last 7 days and circuit breaker state. Refreshed after
+-- every collection cycle (refresh_fleet_overview); read with one paginated,
+-- sorted query instead of per-user history downloads.
+CREATE MATERIALIZED VIEW fleet_overview AS
+SELECT
+    f.user_id,
+    f.instagram_username,
+    f.tier,
+    f.followers,
+    f.followers - f.followers_prev AS followers_delta,
+    f.reach,
+    f.reach - f.reach_prev AS reach_delta,
+    f.last_collected_at,
+    f.last_success_at,
+    f.attempts_7d,
+    f.failures_7d,
+    CASE WHEN f.attempts_7d > 0 THEN 1.0 * f.failures_7d / f.attempts_7d END AS error_rate_7d,
+    f.circuit_state,
+    NOW() AS refreshed_at
+FROM (
+    SELECT
+        u.id AS user_id,
+        u.instagram_username,
+        u.tier,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'follower_count' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1) AS followers,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'follower_count' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1 OFFSET 1) AS followers_prev,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'reach' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1) AS reach,
+        (SELECT metric_value FROM insights i WHERE i.user_id = u.id AND i.metric_name = 'reach' AND i.period = 'day'
+            ORDER BY collected_at DESC, id DESC LIMIT 1 OFFSET 1) AS reach_prev,
+        (SELECT MAX(collected_at) FROM insights i WHERE i.user_id = u.id) AS last_collected_at,
+        (SELECT MAX(collected_at) FROM collection_log l WHERE l.user_id = u.id AND l.status = 'success') AS last_success_at,
+        (SELECT COUNT(*) FROM collection_log l WHERE l.user_id = u.id AND l.collected_at >= NOW() - INTERVAL '7 days') AS attempts_7d,
+        (SELECT COUNT(*) FROM collection_log l WHERE l.user_id = u.id AND l.collected_at >= NOW() - INTERVAL '7 days'
+            AND l.status <> 'success') AS failures_7d,
+        COALESCE(h.state, 'closed') AS circuit_state
+    FROM users u
+    LEFT JOIN account_health h ON h.user_id = u.id
+) f;
+
+-- Unique index required by REFRESH ... CONCURRENTLY (reads are not blocked)
+CREATE UNIQUE INDEX idx_fleet_overview_user ON fleet_overview(user_id);
+CREATE INDEX idx_collection_log_user ON collection_log(user_id, collected_at DESC);
+
+-- Materialized views have no RLS: keep it away from client roles. The
+-- Admin page therefore reads it with the service role key.
+REVOKE ALL ON fleet_overview FROM anon, authenticated;
+
+CREATE FUNCTION refresh_fleet_overview() RETURNS void
+LANGUAGE sql SECURITY DEFINER AS $$
+    REFRESH MATERIALIZED VIEW CONCURRENTLY fleet_overview;
+$$;
+-- Functions are executable by PUBLIC by default; only the service role refreshes
+REVOKE EXECUTE ON FUNCTION refresh_fleet_overview() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_fleet_overview() TO service_role;
@@ -0,0 +1,14 @@
+import pytest
+
+from src import database
+from src.sql_backend import SQLiteBackend
+
+
+@pytest.fixture
+def sqlite_db():
+    """An in-memory SQLite backend installed as the database backend."""
+    backend = SQLiteBackend(":memory:")
+    database.set_backend(backend)
+    yield backend
+    database.set_backend(None)
+    backend.close()
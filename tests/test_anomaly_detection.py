@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from bench.memory_store import seed_backend
+from src import database
+from src.anomaly_detection import detect_anomalies, nanmedian_last_axis, run_anomaly_detection
+
+DAYS = 35
+
+
+def _fleet(accounts: int, seed: int = 0) -> dict[tuple[int, str], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    series = {}
+    for user_id in range(1, accounts + 1):
+        series[(user_id, "reach")] = rng.normal(1000, 50, DAYS).round()
+        series[(user_id, "follower_count")] = 5000 + np.cumsum(rng.normal(10, 3, DAYS)).round()
+    return series
+
+
+def _frame(series: dict, end: datetime) -> pd.DataFrame:
+    rows = []
+    for (user_id, metric), values in series.items():
+        for day, value in enumerate(values):
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "metric_name": metric,
+                    "metric_value": float(value),
+                    "collected_at": end - timedelta(days=DAYS - 1 - day),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_nanmedian_matches_numpy():
+    values = np.random.default_rng(2).normal(size=(40, 3, 9))
+    values[values > 1.2] = np.nan
+    medians, counts = nanmedian_last_axis(values)
+    expected = np.nanmedian(np.where(np.isnan(values).all(-1, keepdims=True), 0, values), axis=-1)
+    expected[counts == 0] = np.nan
+    np.testing.assert_allclose(medians, expected)
+    np.testing.assert_array_equal(counts, (~np.isnan(values)).sum(-1))
+
+
+def test_flags_collapses_and_follower_drops_only():
+    series = _fleet(50)
+    series[(3, "reach")][-1] = 120  # Reach collapse
+    series[(7, "follower_count")][-1] = series[(7, "follower_count")][-2] - 400  # Mass unfollow
+    series[(9, "reach")][:] = 1000  # Flat series: a 2% wobble is not an anomaly
+    series[(9, "reach")][-1] = 980
+    end = datetime(2025, 3, 1, 6, tzinfo=timezone.utc)
+
+    rows, first_day = detect_anomalies(_frame(series, end), evaluate_days=2)
+
+    assert first_day.date() == (end - timedelta(days=1)).date()
+    found = {(r["user_id"], r["metric_name"], r["direction"]) for r in rows}
+    assert found == {(3, "reach", "drop"), (7, "follower_growth", "drop")}
+    collapse = next(r for r in rows if r["user_id"] == 3)
+    assert collapse["day"] == end.date()
+    assert collapse["value"] == 120
+    assert 900 < collapse["baseline"] < 1100
+    assert collapse["score"] < -3.5
+
+
+def test_run_replaces_evaluated_days(sqlite_db):
+    seed_backend(sqlite_db, 3)
+    end = datetime.now(timezone.utc)
+    series = _fleet(3)
+    series[(2, "reach")][-1] = 0
+
+    def store(series):
+        with sqlite_db._cursor() as cur:
+            cur.execute("DELETE FROM insights")
+            cur.executemany(
+                "INSERT INTO insights (user_id, metric_name, metric_value, period, collected_at) "
+                "VALUES (?, ?, ?, 'day', ?)",
+                [
+                    (r.user_id, r.metric_name, r.metric_value, sqlite_db._ts(r.collected_at.to_pydatetime()))
+                    for r in _frame(series, end).itertuples()
+                ],
+            )
+
+    store(series)
+    summary = run_anomaly_detection()
+    assert (summary["accounts"], summary["anomalies"]) == (3, 1)
+    [anomaly] = database.get_anomalies(2, (end - timedelta(days=7)).date())
+    assert (anomaly.metric_name, anomaly.direction, anomaly.day) == ("reach", "drop", end.date())
+
+    # A later collection corrects the value: the anomaly is cleared
+    series[(2, "reach")][-1] = 1000
+    store(series)
+    assert run_anomaly_detection()["anomalies"] == 0
+    assert database.get_anomalies(2, (end - timedelta(days=7)).date()) == []
@@ -0,0 +1,73 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from src import database
+
+
+def test_top_reads_latest_snapshot_only(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": 50, "Busan": 5})
+    time.sleep(0.01)
+    database.save_audience_data(
+        user.id, "follower_demographics_city", {"Seoul": 40, "Busan": 60, "Incheon": 10, "Daegu": 1}
+    )
+    database.save_audience_data(user.id, "reached_audience_demographics_city", {"Jeju": 99})
+
+    assert database.get_audience_top(user.id, "follower_demographics", "city", 2) == [
+        ("Busan", 60.0),
+        ("Seoul", 40.0),
+    ]
+    assert database.get_audience_top(user.id, "follower_demographics", "country") == []
+    assert list(database.get_latest_audience_data(user.id)["follower_demographics_city"]) == [
+        "Busan",
+        "Seoul",
+        "Incheon",
+        "Daegu",
+    ]
+
+
+def test_trend_follows_keys_across_snapshots(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    for seoul in (10, 20, 30):
+        database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": seoul, "Busan": 1})
+        time.sleep(0.01)
+
+    trend = database.get_audience_trend(user.id, "follower_demographics", "city", ["Seoul"])
+    recent = database.get_audience_trend(
+        user.id,
+        "follower_demographics",
+        "city",
+        ["Seoul", "Busan"],
+        datetime.now(timezone.utc) + timedelta(days=1),
+    )
+
+    assert trend["value"].tolist() == [10.0, 20.0, 30.0]
+    assert set(trend["key"]) == {"Seoul"}
+    assert trend["collected_at"].is_monotonic_increasing
+    assert recent.empty
+
+
+def test_unchanged_breakdown_is_only_confirmed(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    start = datetime.now(timezone.utc)
+
+    assert database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": 10, "Busan": 5})
+    time.sleep(0.01)
+    assert not database.save_audience_data(user.id, "follower_demographics_city", {"Busan": 5, "Seoul": 10})
+    time.sleep(0.01)
+    assert database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": 12, "Busan": 5})
+
+    snapshots = sqlite_db._fetchall("SELECT * FROM audience_snapshots ORDER BY id")
+    assert len(snapshots) == 2
+    assert snapshots[0]["last_confirmed_at"] > snapshots[0]["collected_at"]
+    assert sqlite_db._fetchone("SELECT COUNT(*) AS n FROM audience_values")["n"] == 4
+
+    # The confirmed snapshot still covers the time it was re-collected
+    trend = database.get_audience_trend(user.id, "follower_demographics", "city", ["Seoul"], start)
+    assert trend["value"].tolist() == [10.0, 10.0, 12.0]
+    assert trend["collected_at"].is_monotonic_increasing
+
+    later = database.get_audience_trend(
+        user.id, "follower_demographics", "city", ["Busan"], datetime.now(timezone.utc)
+    )
+    assert later.empty
@@ -0,0 +1,49 @@
+import threading
+
+from src import background_jobs
+
+
+def _wait(job, timeout=5):
+    for _ in range(timeout * 100):
+        if job.finished:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job.key} did not finish")
+
+
+def test_submit_runs_in_background_and_attaches_to_running_job():
+    release = threading.Event()
+    runs = []
+
+    def work(value, progress):
+        runs.append(value)
+        progress("started")
+        release.wait(5)
+        progress("finishing")
+        return value * 2
+
+    job = background_jobs.submit(("test", 1), work, 21)
+    # A second submit while running returns the same job instead of a new run
+    assert background_jobs.submit(("test", 1), work, 99) is job
+    assert not job.finished
+
+    release.set()
+    _wait(job)
+    assert job.status == background_jobs.DONE
+    assert job.result == 42
+    assert job.progress == ["started", "finishing"]
+    assert runs == [21]
+    assert background_jobs.get_job(("test", 1)) is job
+
+    # Once finished, the key can be submitted again
+    again = _wait(background_jobs.submit(("test", 1), work, 1))
+    assert again is not job and again.result == 2
+
+
+def test_failed_job_keeps_error():
+    def fail(progress):
+        raise RuntimeError("graph down")
+
+    job = _wait(background_jobs.submit(("test", "fail"), fail))
+    assert job.status == background_jobs.FAILED
+    assert job.error == "graph down"
@@ -0,0 +1,37 @@
+import pytest
+
+from src.cache import TTLCache
+
+
+def test_ttl_cache_reuses_until_expiry_and_never_caches_errors(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.cache.time.monotonic", lambda: clock[0])
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    loads = []
+
+    def loader(value):
+        def load():
+            loads.append(value)
+            return value
+        return load
+
+    assert cache.get_or_load("a", loader(1)) == 1
+    assert cache.get_or_load("a", loader(2)) == 1
+    clock[0] += 61
+    assert cache.get_or_load("a", loader(3)) == 3
+
+    cache.discard("a")
+    assert cache.get_or_load("a", loader(4)) == 4
+
+    # Oldest entry is evicted past max_entries
+    cache.get_or_load("b", loader(5))
+    cache.get_or_load("c", loader(6))
+    assert cache.get_or_load("a", loader(7)) == 7
+    assert loads == [1, 3, 4, 5, 6, 7]
+
+    def fail():
+        raise RuntimeError("graph down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("d", fail)
+    assert cache.get_or_load("d", loader(8)) == 8
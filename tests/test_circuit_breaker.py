@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bench.graph_simulator import GraphSimulator, SimulatorConfig
+from bench.memory_store import seed_backend
+from src import circuit_breaker, database
+from src import instagram_api as instagram_api_module
+from src.config import config
+from src.insights_collector import collect_all_users, refresh_user
+from src.rate_limiter import RateLimiter
+
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _fail(health, now=NOW):
+    return circuit_breaker.record_failure(health, 1, "permanent", "token revoked", now)
+
+
+def test_breaker_opens_after_threshold_and_backs_off_probes():
+    health = None
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD - 1):
+        health = _fail(health)
+        assert circuit_breaker.current_state(health, NOW) == circuit_breaker.CLOSED
+
+    health = _fail(health)
+    first_probe = health.next_probe_at
+    assert circuit_breaker.current_state(health, NOW) == circuit_breaker.OPEN
+    assert not circuit_breaker.allows_collection(health, NOW)
+    assert circuit_breaker.current_state(health, first_probe) == circuit_breaker.HALF_OPEN
+
+    # Failed probe: reopen with a doubled interval
+    reopened = _fail(health, first_probe)
+    assert reopened.next_probe_at - first_probe == 2 * (first_probe - NOW)
+    assert reopened.opened_at == NOW
+
+    assert circuit_breaker.record_success(reopened).state == circuit_breaker.CLOSED
+    assert circuit_breaker.record_success(None) is None
+
+
+def test_non_permanent_errors_do_not_move_the_breaker():
+    assert circuit_breaker.record_failure(None, 1, "throttling", "slow down", NOW) is None
+    assert circuit_breaker.record_failure(None, 1, "transient", "oops", NOW) is None
+
+
+@pytest.fixture
+def fleet(sqlite_db, monkeypatch):
+    seed_backend(sqlite_db, 2)
+    sim = GraphSimulator(SimulatorConfig(num_accounts=2)).start()
+    monkeypatch.setattr(config, "GRAPH_API_BASE_URL", sim.base_url)
+    monkeypatch.setattr(instagram_api_module, "rate_limiter", RateLimiter(1000, 3600))
+    yield sim
+    sim.stop()
+
+
+def test_collector_quarantines_account_with_dead_token(fleet):
+    fleet.config.error_rate = 1.0
+    fleet.config.error_codes = (190,)
+
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        results = collect_all_users()
+        assert results["quarantined"] == 0
+
+    fleet.stats.reset()
+    results = collect_all_users()
+
+    assert results["quarantined"] == 2
+    assert fleet.stats.total_requests == 0
+    health = database.get_all_account_health()
+    assert {h.state for h in health.values()} == {"open"}
+
+    # Logging in again lifts the quarantine
+    database.reset_account_health(1)
+    fleet.config.error_rate = 0.0
+    results = collect_all_users()
+    assert results["quarantined"] == 1
+    assert results["insights_success"] == 1
+
+
+def test_collector_quarantines_deleted_account(fleet):
+    fleet.config.deleted_accounts = {1}  # ig-1, user 2
+
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        results = collect_all_users()
+        assert results["insights_success"] == 1
+
+    assert database.get_all_account_health()[2].state == "open"
+    assert database.get_metric_capabilities().get(2, {}) == {}
+
+
+def test_manual_refresh_matches_scheduled_collection(fleet):
+    database.set_user_tier(1, "pro")
+    fleet.config.incompatible_metrics = {"profile_views"}
+
+    result = refresh_user(1, "page-token-0")
+
+    assert result["insights"]["success"]
+    assert {i.period for i in database.get_insights(1)} == {"day", "week", "days_28"}
+    assert database.get_metric_capabilities(1)[1][("profile_views", "day")] is False
+
+    fleet.config.deleted_accounts = {0}
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        refresh_user(1, "page-token-0")
+    assert database.get_account_health(1).state == "open"
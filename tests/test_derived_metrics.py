@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.graph_simulator import GraphSimulator, SimulatorConfig
+from bench.memory_store import seed_backend
+from src import database, derived_metrics
+from src import instagram_api as instagram_api_module
+from src.config import config
+from src.derived_metrics import compute_derived_metrics, moving_average
+from src.insights_collector import collect_all_users
+from src.rate_limiter import RateLimiter
+
+
+def _insights(values: dict[tuple[int, str], list[float]], samples_per_day: int = 1) -> pd.DataFrame:
+    """Daily series per (user_id, metric); extra samples earlier in the day are stale."""
+    rows = []
+    start = pd.Timestamp("2025-01-01", tz="UTC")
+    for (user_id, metric), series in values.items():
+        for day, value in enumerate(series):
+            if np.isnan(value):
+                continue
+            for sample in range(samples_per_day):
+                stale = sample < samples_per_day - 1
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        "metric_name": metric,
+                        "metric_value": -1.0 if stale else value,
+                        "period": "day",
+                        "collected_at": start + pd.Timedelta(days=day, hours=6 * sample),
+                    }
+                )
+    # Newest first, like get_insights_frame
+    return pd.DataFrame(rows).sort_values("collected_at", ascending=False)
+
+
+def test_matches_pandas_reference_per_account():
+    rng = np.random.default_rng(1)
+    followers = np.cumsum(rng.integers(0, 20, 30)).astype(float) + 1000
+    followers[[5, 6, 17]] = np.nan
+    reach = rng.integers(0, 500, 30).astype(float)
+    reach[3] = 0
+    interactions = rng.integers(0, 50, 30).astype(float)
+    df = _insights(
+        {
+            (1, "follower_count"): followers,
+            (1, "reach"): reach,
+            (1, "total_interactions"): interactions,
+            (2, "reach"): reach[::-1],
+        },
+        samples_per_day=3,
+    )
+
+    result = compute_derived_metrics(df)
+    one = result[result["user_id"] == 1].reset_index(drop=True)
+    assert len(one) == 30
+
+    f = pd.Series(followers)
+    engagement = pd.Series(interactions / np.where(reach > 0, reach, np.nan))
+    np.testing.assert_allclose(one["follower_growth"], f.diff())
+    np.testing.assert_allclose(one["engagement_rate"], engagement)
+    np.testing.assert_allclose(one["follower_count_ma7"], f.rolling(7, min_periods=1).mean())
+    np.testing.assert_allclose(one["engagement_rate_ma7"], engagement.rolling(7, min_periods=1).mean())
+    np.testing.assert_allclose(one["reach_wow"], pd.Series(reach).diff(7))
+
+    two = result[result["user_id"] == 2]
+    assert two["follower_growth"].isna().all()
+    np.testing.assert_allclose(two["reach_ma7"], pd.Series(reach[::-1]).rolling(7, min_periods=1).mean())
+
+
+def test_moving_average_skips_missing_days():
+    values = np.array([[1.0, np.nan, 3.0, np.nan, np.nan, np.nan]])
+    np.testing.assert_allclose(moving_average(values, 2), [[1.0, 1.0, 3.0, 3.0, np.nan, np.nan]])
+
+
+def test_cached_until_next_collection(sqlite_db, monkeypatch):
+    seed_backend(sqlite_db, 3)
+    monkeypatch.setattr(derived_metrics, "derived_cache", derived_metrics.TTLCache(3600))
+    loads, markers = [], []
+    original_load = derived_metrics.get_fleet_insights_frame
+    original_markers = derived_metrics.get_last_collected_at
+    monkeypatch.setattr(
+        derived_metrics,
+        "get_fleet_insights_frame",
+        lambda *args, **kwargs: loads.append(args) or original_load(*args, **kwargs),
+    )
+    monkeypatch.setattr(
+        derived_metrics,
+        "get_last_collected_at",
+        lambda user_ids: markers.append(user_ids) or original_markers(user_ids),
+    )
+    for user_id in (1, 2):
+        database.save_insights(user_id, [{"metric_name": "reach", "metric_value": 10, "period": "day"}])
+    first = derived_metrics.get_derived_metrics([1, 2, 3])
+    again = derived_metrics.get_derived_metrics([1, 2, 3])
+    assert again is first
+    # One query each for the cache check and the load, whatever the account count
+    assert len(loads) == 1
+    assert markers == [[1, 2, 3], [1, 2, 3]]
+    assert set(first["user_id"]) == {1, 2}
+
+    database.save_insights(1, [{"metric_name": "reach", "metric_value": 30, "period": "day"}])
+    latest = derived_metrics.get_derived_metrics([1, 2, 3])
+    assert len(loads) == 2
+    assert latest[latest["user_id"] == 1]["reach_ma7"].iloc[-1] == pytest.approx(30)
+
+
+def test_engagement_rate_from_collected_insights(sqlite_db, monkeypatch):
+    seed_backend(sqlite_db, 2)
+    monkeypatch.setattr(derived_metrics, "derived_cache", derived_metrics.TTLCache(3600))
+    monkeypatch.setattr(instagram_api_module, "rate_limiter", RateLimiter(1000, 3600))
+    with GraphSimulator(SimulatorConfig(num_accounts=2)) as sim:
+        monkeypatch.setattr(config, "GRAPH_API_BASE_URL", sim.base_url)
+        assert collect_all_users()["insights_success"] == 2
+
+    latest = database.get_latest_insights(1)
+    derived = derived_metrics.get_derived_metrics([1, 2])
+
+    assert set(derived["user_id"]) == {1, 2}
+    assert derived["engagement_rate"].notna().all()
+    first = derived[derived["user_id"] == 1].iloc[-1]
+    assert first["engagement_rate"] == pytest.approx(
+        latest["total_interactions"].metric_value / latest["reach"].metric_value
+    )
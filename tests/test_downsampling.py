@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from src.downsampling import downsample_frame, lttb_indices, minmax_indices
+
+
+def _series(n=20_000):
+    rng = np.random.default_rng(7)
+    y = np.sin(np.arange(n) / 300) + rng.normal(0, 0.05, n)
+    y[1234], y[15000] = 25.0, -25.0
+    return np.arange(n, dtype=np.float64), y
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x, y = _series()
+    kept = lttb_indices(x, y, 500)
+
+    assert len(kept) == 500
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert np.all(np.diff(kept) > 0)
+    assert {1234, 15000} <= set(kept.tolist())
+    # Short series pass through untouched
+    assert np.array_equal(lttb_indices(x[:100], y[:100], 500), np.arange(100))
+
+
+def test_minmax_matches_bucket_extremes():
+    _, y = _series()
+    kept = minmax_indices(y, 400)
+
+    assert len(kept) <= 400
+    edges = np.append(np.arange(199) * len(y) // 199, len(y))
+    for start, end in zip(edges[:-1], edges[1:]):
+        assert start + y[start:end].argmin() in kept
+        assert start + y[start:end].argmax() in kept
+
+
+def test_downsample_frame_caps_each_series():
+    x, y = _series()
+    dates = pd.date_range("2025-01-01", periods=len(x), freq="min", tz="UTC")
+    df = pd.concat(
+        [
+            pd.DataFrame({"date": dates, "metric": "reach", "value": y}),
+            pd.DataFrame({"date": dates[:50], "metric": "likes", "value": y[:50]}),
+        ]
+    )
+
+    out = downsample_frame(df, "date", "value", "metric", 300)
+
+    assert out.groupby("metric").size().to_dict() == {"likes": 50, "reach": 300}
+    assert out["value"].max() == 25.0 and out["value"].min() == -25.0
+    assert out[out["metric"] == "reach"]["date"].is_monotonic_increasing
@@ -0,0 +1,111 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src import database
+from src.export import export_history, export_to_bytes, write_parquet
+
+
+@pytest.fixture
+def user_id(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    database.save_insights(
+        user.id,
+        [{"metric_name": f"m{i % 3}", "metric_value": i, "period": "day"} for i in range(25)],
+    )
+    return user.id
+
+
+def test_csv_and_parquet_match_history(user_id):
+    expected = database.get_insights_frame(user_id)
+
+    csv_out = io.BytesIO()
+    assert export_history(user_id, "insights", "csv", csv_out, page_size=4) == 25
+    csv_out.seek(0)
+    from_csv = pd.read_csv(csv_out, parse_dates=["collected_at"])
+
+    parquet_out = io.BytesIO()
+    pages = database.iter_insight_pages(user_id, page_size=4)
+    assert write_parquet(pages, "insights", parquet_out, row_group_rows=10) == 25
+    parquet_out.seek(0)
+    parquet = pq.ParquetFile(parquet_out)
+
+    # Pages are flushed as they fill row groups, not collected first
+    assert parquet.metadata.num_row_groups == 3
+    pd.testing.assert_frame_equal(from_csv, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(parquet.read().to_pandas(), expected, check_dtype=False)
+
+
+def test_audience_history_pages_through_every_snapshot(user_id):
+    cities = {f"City {i:02d}, \"KR\"": i for i in range(7)}
+    database.save_audience_data(user_id, "follower_demographics_city", cities)
+    database.save_audience_data(user_id, "follower_demographics_city", {**cities, "New": 1})
+    database.save_audience_data(user_id, "follower_demographics_country", {"KR": 9})
+
+    out = io.BytesIO()
+    assert export_history(user_id, "audience", "csv", out, page_size=3) == 16
+    out.seek(0)
+    exported = pd.read_csv(out)
+
+    assert exported["snapshot_id"].is_monotonic_increasing
+    assert exported.groupby("snapshot_id").size().tolist() == [7, 8, 1]
+    assert set(exported["key"]) == set(cities) | {"New", "KR"}
+
+
+
+def test_audience_range_keeps_snapshot_confirmed_inside_it(user_id, sqlite_db):
+    now = datetime.now(timezone.utc)
+    database.save_audience_data(user_id, "follower_demographics_city", {"Seoul": 3, "Busan": 9})
+    old = sqlite_db._ts(now - timedelta(days=60))
+    with sqlite_db._cursor() as cur:
+        cur.execute("UPDATE audience_snapshots SET collected_at = ?, last_confirmed_at = ?", (old, old))
+    # Collected 60 days ago, unchanged since: only confirmed today
+    assert not database.save_audience_data(
+        user_id, "follower_demographics_city", {"Seoul": 3, "Busan": 9}
+    )
+
+    out = io.BytesIO()
+    assert export_history(user_id, "audience", "csv", out, start_date=now - timedelta(days=30)) == 2
+    out = io.BytesIO()
+    assert export_history(user_id, "audience", "csv", out, end_date=now - timedelta(days=90)) == 0
+
+def test_empty_parquet_keeps_schema(user_id):
+    out = io.BytesIO()
+    assert export_history(user_id, "audience", "parquet", out) == 0
+    out.seek(0)
+    table = pq.read_table(out)
+    assert table.num_rows == 0
+    assert table.column_names[:3] == ["snapshot_id", "metric", "dimension"]
+
+
+def test_derived_metrics_export(user_id):
+    database.save_insights(
+        user_id,
+        [
+            {"metric_name": "reach", "metric_value": 40, "period": "day"},
+            {"metric_name": "total_interactions", "metric_value": 4, "period": "day"},
+        ],
+    )
+
+    out = io.BytesIO()
+    assert export_history(user_id, "derived", "csv", out) == 1
+    out.seek(0)
+    exported = pd.read_csv(out)
+
+    assert exported.loc[0, "engagement_rate"] == pytest.approx(0.1)
+    assert exported.loc[0, "reach_ma7"] == 40
+    assert exported["follower_growth"].isna().all()
+
+
+def test_export_to_bytes_matches_streamed_export(user_id):
+    out = io.BytesIO()
+    export_history(user_id, "insights", "csv", out)
+    messages = []
+
+    data, rows = export_to_bytes(user_id, "insights", "csv", progress=messages.append)
+
+    assert (data, rows) == (out.getvalue(), 25)
+    assert messages
@@ -0,0 +1,88 @@
+import base64
+import json
+
+import pytest
+
+from bench.memory_store import seed_backend
+from src import database
+from src.config import config
+
+
+@pytest.fixture
+def backend(sqlite_db):
+    seed_backend(sqlite_db, 3)
+    return sqlite_db
+
+
+def _collect(backend, user_id, followers, reach):
+    backend.insert_insights(
+        [
+            {"user_id": user_id, "metric_name": "follower_count", "metric_value": followers, "period": "day"},
+            {"user_id": user_id, "metric_name": "reach", "metric_value": reach, "period": "day"},
+        ]
+    )
+
+
+def test_refresh_computes_latest_values_deltas_and_error_rate(backend):
+    _collect(backend, 1, 100, 50)
+    _collect(backend, 1, 120, 40)
+    _collect(backend, 2, 300, 10)
+    backend.insert_collection_log(1, "insights", "success")
+    backend.insert_collection_log(1, "insights", "failed", "boom")
+    backend.insert_collection_log(2, "insights", "success")
+
+    # Nothing is visible until the aggregate is refreshed
+    assert database.get_fleet_overview() == ([], 0)
+    database.refresh_fleet_overview()
+
+    accounts, total = database.get_fleet_overview()
+    assert total == 3
+    by_id = {a.user_id: a for a in accounts}
+    assert (by_id[1].followers, by_id[1].followers_delta) == (120, 20)
+    assert (by_id[1].reach, by_id[1].reach_delta) == (40, -10)
+    assert (by_id[1].attempts_7d, by_id[1].failures_7d, by_id[1].error_rate_7d) == (2, 1, 0.5)
+    assert by_id[1].last_success_at is not None
+    assert (by_id[2].followers, by_id[2].followers_delta, by_id[2].error_rate_7d) == (300, None, 0)
+    # Never collected: no values, no error rate, but still listed
+    assert (by_id[3].followers, by_id[3].error_rate_7d, by_id[3].last_collected_at) == (None, None, None)
+
+
+def test_sorts_with_nulls_last_and_paginates(backend):
+    _collect(backend, 1, 100, 50)
+    _collect(backend, 2, 300, 10)
+    database.refresh_fleet_overview()
+
+    accounts, _ = database.get_fleet_overview("followers", descending=True)
+    assert [a.user_id for a in accounts] == [2, 1, 3]
+    accounts, _ = database.get_fleet_overview("followers", descending=False)
+    assert [a.user_id for a in accounts] == [1, 2, 3]
+
+    first, total = database.get_fleet_overview("followers", limit=2, offset=0)
+    rest, _ = database.get_fleet_overview("followers", limit=2, offset=2)
+    assert total == 3
+    assert [a.user_id for a in first + rest] == [2, 1, 3]
+
+    with pytest.raises(ValueError):
+        database.get_fleet_overview("followers; DROP TABLE users")
+
+
+def _jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.signature"
+
+
+def test_admin_page_needs_supabase_service_role_key(monkeypatch):
+    monkeypatch.setattr(config, "DATABASE_BACKEND", "supabase")
+    for key, role in [
+        (_jwt({"role": "service_role"}), "service_role"),
+        (_jwt({"role": "anon"}), "anon"),
+        ("sb_secret_abc", "service_role"),
+        ("sb_publishable_abc", "anon"),
+        ("not-a-key", None),
+    ]:
+        monkeypatch.setattr(config, "SUPABASE_KEY", key)
+        assert config.supabase_key_role() == role
+        assert config.can_read_fleet_overview() == (role == "service_role")
+
+    monkeypatch.setattr(config, "DATABASE_BACKEND", "sqlite")
+    assert config.can_read_fleet_overview()
@@ -0,0 +1,257 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from bench.graph_simulator import GraphSimulator, SimulatorConfig
+from src import instagram_api as instagram_api_module
+from src import oauth as oauth_module
+from src import rate_limiter as rate_limiter_module
+from src.instagram_api import InstagramAPI, InstagramAPIError
+from src.rate_limiter import RateLimiter, RateLimitError
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    sim = GraphSimulator(SimulatorConfig(num_accounts=10, bm_only_every=5)).start()
+    monkeypatch.setattr(oauth_module.config, "GRAPH_API_BASE_URL", sim.base_url)
+    monkeypatch.setattr(instagram_api_module, "rate_limiter", RateLimiter(1000, 3600))
+    monkeypatch.setattr(oauth_module, "rate_limiter", RateLimiter(1000, 3600))
+    yield sim
+    sim.stop()
+
+
+def _api(sim, index):
+    api = InstagramAPI(f"page-token-{index}", f"ig-{index}")
+    api.base_url = sim.base_url
+    return api
+
+
+def test_instagram_api_against_simulator(simulator):
+    api = _api(simulator, 3)
+
+    insights = api.get_insights(period="day")
+    audience = api.get_audience_data()
+    info = api.get_account_info()
+
+    assert {i["metric_name"] for i in insights} == {
+        "impressions",
+        "reach",
+        "profile_views",
+        "follower_count",
+        "total_interactions",
+    }
+    assert "follower_demographics_city" in audience
+    assert info["username"] == "synthetic_3"
+    assert simulator.stats.snapshot()["by_endpoint"]["insights"] == 4
+
+
+def test_get_user_pages_uses_bm_fallback_for_bm_only_accounts(simulator):
+    direct = oauth_module.get_user_pages("user-token-1")
+    debug = {}
+    via_bm = oauth_module.get_user_pages("user-token-5", debug_info=debug)
+
+    assert [p["id"] for p in direct] == ["page-1"]
+    assert [p["id"] for p in via_bm] == ["page-5"]
+    assert debug["bm_fallback_used"] is True
+
+
+def test_page_listing_respects_the_rate_limiter(simulator, monkeypatch):
+    limiter = RateLimiter(1, 3600)
+    limiter.record_request()
+    monkeypatch.setattr(oauth_module, "rate_limiter", limiter)
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(RateLimitError):
+        oauth_module.get_user_pages("user-token-1")
+    assert simulator.stats.total_requests == 0
+
+
+def test_simulator_injects_configured_error_codes(simulator):
+    simulator.config.error_rate = 1.0
+    simulator.config.error_codes = (17,)
+    api = _api(simulator, 2)
+
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api._make_request("ig-2/insights", {"metric": "reach", "period": "day"})
+
+    assert excinfo.value.code == 17
+
+
+def test_simulator_enforces_call_budget_with_usage_headers(simulator):
+    simulator.config.calls_per_window = 2
+    api = _api(simulator, 4)
+
+    api._make_request("ig-4", {"fields": "id"})
+    api._make_request("ig-4", {"fields": "id"})
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api._make_request("ig-4", {"fields": "id"})
+
+    assert excinfo.value.code == 613
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(InstagramAPI._request_with_retry.retry, "sleep", recorded.append)
+    return recorded
+
+
+def test_permanent_errors_fail_fast(simulator, sleeps):
+    simulator.config.error_rate = 1.0
+    simulator.config.error_codes = (190,)
+    api = _api(simulator, 1)
+
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api.get_account_info()
+
+    assert excinfo.value.error_class == "permanent"
+    assert simulator.stats.total_requests == 1
+    assert api.retry_count == 0
+    assert sleeps == []
+
+
+def test_transient_errors_retry_with_backoff(simulator, sleeps):
+    simulator.config.error_rate = 1.0
+    simulator.config.error_codes = (2,)
+    api = _api(simulator, 1)
+
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api.get_account_info()
+
+    assert excinfo.value.code == 2
+    assert simulator.stats.total_requests == 5
+    assert api.retries == {"transient": 4}
+    assert all(2 <= s <= 61 for s in sleeps)
+
+
+def test_throttling_honors_retry_after(simulator, sleeps):
+    simulator.config.calls_per_window = 1
+    simulator.config.window_seconds = 60
+    api = _api(simulator, 4)
+    api.get_account_info()
+
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api.get_account_info()
+
+    assert excinfo.value.error_class == "throttling"
+    assert excinfo.value.retry_after == 60
+    assert api.retries == {"throttling": 4}
+    assert all(60 <= s <= 61 for s in sleeps)
+
+
+def test_long_throttling_fails_without_retrying(simulator, sleeps):
+    simulator.config.calls_per_window = 1
+    api = _api(simulator, 4)
+    api.get_account_info()
+
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api.get_account_info()
+
+    assert excinfo.value.retry_after > 60
+    assert api.retry_count == 0
+    assert sleeps == []
+
+
+def test_incompatible_metric_is_isolated_and_remembered(simulator):
+    simulator.config.incompatible_metrics = {"profile_views"}
+    api = _api(simulator, 1)
+
+    insights = api.get_insights(period="day")
+
+    assert {i["metric_name"] for i in insights} == {
+        "impressions",
+        "reach",
+        "follower_count",
+        "total_interactions",
+    }
+    assert api.learned_capabilities[("profile_views", "day")] is False
+    assert api.learned_capabilities[("reach", "day")] is True
+
+    simulator.stats.reset()
+    again = InstagramAPI("page-token-1", "ig-1", api.capabilities)
+    again.base_url = simulator.base_url
+    assert len(again.get_insights(period="day")) == 4
+    assert simulator.stats.total_requests == 1
+    assert again.learned_capabilities == {}
+
+
+
+def test_only_small_audiences_are_learned_from_code_10(simulator):
+    simulator.config.small_audience_accounts = {1}
+    simulator.config.revoked_insights_accounts = {2}
+
+    small = _api(simulator, 1)
+    assert small.get_audience_data() == {}
+    assert all(
+        small.learned_capabilities[(m, "lifetime")] is False for m in small.AUDIENCE_METRICS
+    )
+
+    # A revoked permission is an error for the caller, not an unsupported metric
+    revoked = _api(simulator, 2)
+    with pytest.raises(InstagramAPIError) as excinfo:
+        revoked.get_audience_data()
+    assert excinfo.value.code == 10
+    assert excinfo.value.error_class == "permanent"
+    assert revoked.learned_capabilities == {}
+
+def test_deleted_account_is_not_mistaken_for_incompatible_metrics(simulator):
+    simulator.config.deleted_accounts = {1}
+    api = _api(simulator, 1)
+
+    with pytest.raises(InstagramAPIError) as excinfo:
+        api.get_insights(period="day")
+    assert (excinfo.value.code, excinfo.value.subcode) == (100, 33)
+    assert excinfo.value.error_class == "permanent"
+
+    with pytest.raises(InstagramAPIError):
+        api.get_audience_data()
+
+    # No batch splitting and nothing learned about the metrics
+    assert simulator.stats.snapshot()["errors_by_code"] == {100: 1 + len(api.AUDIENCE_METRICS)}
+    assert api.learned_capabilities == {}
+
+
+def test_multi_period_insights_fetch_periods_concurrently(simulator):
+    simulator.config.latency_ms = 200
+    api = _api(simulator, 1)
+
+    started = time.perf_counter()
+    insights = api.get_insights_for_periods(["day", "week", "days_28"])
+    elapsed = time.perf_counter() - started
+
+    assert {i["period"] for i in insights} == {"day", "week", "days_28"}
+    assert len(insights) == 15
+    assert api.period_errors == {}
+    # Three sequential requests would take at least 0.6s
+    assert elapsed < 0.5
+
+
+def test_collection_periods_follow_account_tier(monkeypatch):
+    monkeypatch.setattr(
+        instagram_api_module.config, "COLLECTION_TIERS", "standard:day;pro:day, week"
+    )
+
+    assert instagram_api_module.config.periods_for_tier("pro") == ["day", "week"]
+    assert instagram_api_module.config.periods_for_tier("standard") == ["day"]
+    assert instagram_api_module.config.periods_for_tier("unknown") == ["day"]
+
+
+def test_synthetic_accounts_are_identical_across_processes():
+    script = (
+        "from bench.graph_simulator import GraphSimulator;"
+        "print(GraphSimulator()._account_fields(7, 'followers_count,media_count'))"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
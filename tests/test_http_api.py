@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("starlette")
+from starlette.testclient import TestClient
+
+from src import database, http_api
+from src.cache import TTLCache
+from src.config import config
+
+
+@pytest.fixture
+def client(sqlite_db, monkeypatch):
+    monkeypatch.setattr(http_api, "api_cache", TTLCache(60))
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    database.save_insights(
+        user.id,
+        [{"metric_name": "reach", "metric_value": i, "period": "day"} for i in range(300)]
+        + [{"metric_name": "impressions", "metric_value": 7, "period": "day"}]
+        + [{"metric_name": "reach", "metric_value": 1, "period": "week"}],
+    )
+    database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": 3, "Busan": 9})
+    return TestClient(http_api.create_app())
+
+
+def test_series_filters_and_downsamples(client):
+    response = client.get("/users/1/insights", params={"metrics": "reach", "max_points": 50})
+    assert response.status_code == 200
+    series = response.json()["series"]
+    assert list(series) == ["reach"]
+    assert len(series["reach"]["value"]) == 50
+    assert len(series["reach"]["collected_at"]) == 50
+
+    assert client.get("/users/1/audience/top", params={"limit": 1}).json() == [
+        {"key": "Busan", "value": 9.0}
+    ]
+    assert client.get("/users/1/insights/latest").json()["impressions"]["value"] == 7
+    assert client.get("/users/9/audience").status_code == 404
+    assert client.get("/users/1/insights", params={"start": "yesterday"}).status_code == 400
+
+
+def test_etag_and_compression(client, monkeypatch):
+    loads = []
+    original = http_api.get_insights_frame
+    monkeypatch.setattr(
+        http_api, "get_insights_frame", lambda *a: loads.append(a) or original(*a)
+    )
+
+    first = client.get("/users/1/insights", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].startswith('W/"')
+    # The test client decodes transparently; fewer bytes came over the wire
+    assert first.num_bytes_downloaded < len(first.content)
+
+    again = client.get("/users/1/insights", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert len(loads) == 1
+
+    plain = client.get("/users/1/insights", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == first.json()
+
+
+def test_bearer_token_required_when_configured(client, monkeypatch):
+    monkeypatch.setattr(config, "API_TOKENS", "secret, other")
+    assert client.get("/users").status_code == 401
+    assert client.get("/health").status_code == 200
+    ok = client.get("/users", headers={"Authorization": "Bearer other"})
+    assert ok.json() == [
+        {"id": 1, "instagram_id": "ig-1", "instagram_username": "first", "tier": "standard"}
+    ]
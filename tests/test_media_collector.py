@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bench.graph_simulator import GraphSimulator, SimulatorConfig
+from bench.memory_store import seed_backend
+from src import media_collector
+from src import instagram_api as instagram_api_module
+from src.config import config
+from src.instagram_api import InstagramAPI
+from src.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def fleet(sqlite_db, monkeypatch):
+    seed_backend(sqlite_db, 2)
+    # One post a day: 7 of the 30 posts fall inside the default 7-day window
+    sim = GraphSimulator(SimulatorConfig(num_accounts=2, media_per_account=30)).start()
+    limiter = RateLimiter(1000, 3600)
+    monkeypatch.setattr(config, "GRAPH_API_BASE_URL", sim.base_url)
+    monkeypatch.setattr(config, "MEDIA_RESERVED_REQUESTS", 10)
+    monkeypatch.setattr(instagram_api_module, "rate_limiter", limiter)
+    monkeypatch.setattr(media_collector, "rate_limiter", limiter)
+    yield sim, sqlite_db, limiter
+    sim.stop()
+
+
+def test_iter_media_pages_lazily_and_stops_at_window(fleet):
+    sim, _, _ = fleet
+    api = InstagramAPI("page-token-0", "ig-0")
+
+    media = api.iter_media(page_size=5)
+    first = [next(media) for _ in range(3)]
+    media.close()
+    assert [m["id"] for m in first] == ["media-0-0", "media-0-1", "media-0-2"]
+    # The first page, plus at most the prefetched second one
+    assert sim.stats.by_endpoint["media"] in (1, 2)
+
+    sim.stats.reset()
+    since = datetime.now(timezone.utc) - timedelta(days=7)
+    recent = list(api.iter_media(since=since, page_size=5))
+    assert [m["id"] for m in recent] == [f"media-0-{j}" for j in range(7)]
+    # Two pages of five cover the window; nothing past it is prefetched
+    assert sim.stats.by_endpoint["media"] == 2
+
+
+def test_collects_window_in_batches_and_bulk_inserts(fleet):
+    sim, backend, _ = fleet
+
+    results = media_collector.collect_media_all_users()
+
+    assert results["success"] == 2
+    assert results["media"] == 14
+    assert sim.stats.by_endpoint["batch"] == 2
+    assert sim.stats.by_endpoint["media_insights"] == 14
+    rows = backend._fetchall("SELECT * FROM media_insights")
+    assert len(rows) == results["rows"] == 14 * len(InstagramAPI.MEDIA_METRICS)
+    assert {r["media_product_type"] for r in rows} == {"FEED", "REELS"}
+
+
+def test_stops_when_budget_is_spent(fleet, monkeypatch):
+    sim, backend, _ = fleet
+    limiter = RateLimiter(16, 3600)
+    monkeypatch.setattr(instagram_api_module, "rate_limiter", limiter)
+    monkeypatch.setattr(media_collector, "rate_limiter", limiter)
+
+    results = media_collector.collect_media_all_users()
+
+    # 6 requests above the reserve: one /media page and a batch of 5 posts
+    assert results["media"] == 5
+    assert results["failed"] + results["deferred"] == 2
+    assert limiter.get_remaining_requests() >= config.MEDIA_RESERVED_REQUESTS
+    assert len(backend._fetchall("SELECT DISTINCT media_id FROM media_insights")) == 5
@@ -1,7 +1,8 @@
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from importlib import import_module, reload
 
-from src.models import Token, User
+from src.models import TokenRecord, UserRecord
 
 
 def _load_refresh_module():
@@ -12,13 +13,13 @@ def _load_refresh_module():
 def test_run_token_refresh_syncs_matching_page_token(monkeypatch):
     refresh_module = _load_refresh_module()
     now = datetime.now(timezone.utc)
-    user = User(
+    user = UserRecord(
         id=1,
         instagram_id="ig-1",
         instagram_username="influencer",
         facebook_page_id="page-1",
     )
-    token = Token(
+    token = TokenRecord(
         id=1,
         user_id=1,
         token_type="user",
@@ -28,7 +29,7 @@ def test_run_token_refresh_syncs_matching_page_token(monkeypatch):
     saved_tokens = []
 
     monkeypatch.setattr(refresh_module, "init_db", lambda: None)
-    monkeypatch.setattr(refresh_module, "get_expiring_tokens", lambda days: [(user, token)])
+    monkeypatch.setattr(refresh_module, "get_expiring_token_records", lambda days: [(user, token)])
     monkeypatch.setattr(
         refresh_module,
         "refresh_long_lived_token",
@@ -72,13 +73,13 @@ def test_run_token_refresh_syncs_matching_page_token(monkeypatch):
 def test_run_token_refresh_keeps_existing_page_token_if_no_match(monkeypatch):
     refresh_module = _load_refresh_module()
     now = datetime.now(timezone.utc)
-    user = User(
+    user = UserRecord(
         id=1,
         instagram_id="ig-1",
         instagram_username="influencer",
         facebook_page_id="page-1",
     )
-    token = Token(
+    token = TokenRecord(
         id=1,
         user_id=1,
         token_type="user",
@@ -88,7 +89,7 @@ def test_run_token_refresh_keeps_existing_page_token_if_no_match(monkeypatch):
     saved_tokens = []
 
     monkeypatch.setattr(refresh_module, "init_db", lambda: None)
-    monkeypatch.setattr(refresh_module, "get_expiring_tokens", lambda days: [(user, token)])
+    monkeypatch.setattr(refresh_module, "get_expiring_token_records", lambda days: [(user, token)])
     monkeypatch.setattr(
         refresh_module,
         "refresh_long_lived_token",
@@ -122,3 +123,130 @@ def test_run_token_refresh_keeps_existing_page_token_if_no_match(monkeypatch):
     assert len(saved_tokens) == 1
     assert saved_tokens[0]["token_type"] == "user"
     assert saved_tokens[0]["access_token"] == "new-user-token"
+
+
+def test_plan_token_refreshes_spreads_runs_before_ideal_time(monkeypatch):
+    refresh_module = _load_refresh_module()
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    users_and_tokens = []
+    for i in range(1, 51):
+        user = UserRecord(
+            id=i,
+            instagram_id=f"ig-{i}",
+            instagram_username=f"user-{i}",
+            facebook_page_id=f"page-{i}",
+        )
+        token = TokenRecord(
+            id=i,
+            user_id=i,
+            token_type="user",
+            access_token=f"token-{i}",
+            expires_at=now + timedelta(days=7, hours=20),
+        )
+        users_and_tokens.append((user, token))
+
+    monkeypatch.setattr(
+        refresh_module, "get_expiring_token_records", lambda days: users_and_tokens
+    )
+
+    plan = refresh_module.plan_token_refreshes(
+        days_before_expiry=7, planning_window_hours=24, now=now
+    )
+    run_times = [run_at for _, run_at in plan]
+    ideal = now + timedelta(hours=20)
+
+    assert len(plan) == 50
+    assert all(now < run_at <= ideal for run_at in run_times)
+    # Jitter: the runs are not bunched at a single instant
+    assert max(run_times) - min(run_times) > timedelta(hours=1)
+
+
+def test_plan_token_refreshes_spreads_overdue_tokens_over_near_future(monkeypatch):
+    refresh_module = _load_refresh_module()
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    user = UserRecord(
+        id=1,
+        instagram_id="ig-1",
+        instagram_username="influencer",
+        facebook_page_id="page-1",
+    )
+    token = TokenRecord(
+        id=1,
+        user_id=1,
+        token_type="user",
+        access_token="old-user-token",
+        expires_at=(now + timedelta(days=1)).replace(tzinfo=None),
+    )
+
+    monkeypatch.setattr(refresh_module, "get_expiring_token_records", lambda days: [(user, token)])
+
+    plan = refresh_module.plan_token_refreshes(
+        days_before_expiry=7, overdue_spread_minutes=60, now=now
+    )
+
+    assert len(plan) == 1
+    assert now <= plan[0][1] <= now + timedelta(minutes=60)
+
+
+def test_schedule_token_refreshes_adds_one_job_per_user(monkeypatch):
+    refresh_module = _load_refresh_module()
+    run_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    jobs = []
+
+    class _FakeScheduler:
+        def add_job(self, func, trigger, **kwargs):
+            jobs.append((func, trigger, kwargs))
+
+    monkeypatch.setattr(refresh_module, "init_db", lambda: None)
+    monkeypatch.setattr(
+        refresh_module,
+        "plan_token_refreshes",
+        lambda days, window: [(1, run_at), (2, run_at)],
+    )
+
+    count = refresh_module.schedule_token_refreshes(_FakeScheduler())
+
+    assert count == 2
+    assert [kwargs["id"] for _, _, kwargs in jobs] == [
+        "refresh_token_1",
+        "refresh_token_2",
+    ]
+    assert all(trigger == "date" for _, trigger, _ in jobs)
+    assert all(kwargs["replace_existing"] for _, _, kwargs in jobs)
+
+
+def test_planned_job_refreshes_token_at_its_run_time(monkeypatch):
+    refresh_module = _load_refresh_module()
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    user = UserRecord(
+        id=1,
+        instagram_id="ig-1",
+        instagram_username="influencer",
+        facebook_page_id="page-1",
+    )
+    token = TokenRecord(
+        id=1,
+        user_id=1,
+        token_type="user",
+        access_token="old-user-token",
+        expires_at=now + timedelta(days=7, hours=20),
+    )
+    refreshed = []
+
+    monkeypatch.setattr(refresh_module, "get_expiring_token_records", lambda days: [(user, token)])
+    monkeypatch.setattr(refresh_module, "get_user_by_id", lambda user_id: user)
+    monkeypatch.setattr(refresh_module, "get_user_token_record", lambda user_id, kind: token)
+    monkeypatch.setattr(
+        refresh_module, "refresh_user_token", lambda user, token: refreshed.append(token)
+    )
+
+    [(user_id, run_at)] = refresh_module.plan_token_refreshes(
+        days_before_expiry=7, planning_window_hours=24, now=now
+    )
+    assert refresh_module.refresh_token_for_user(user_id, 7, 24, now=run_at)
+    assert refreshed == [token]
+
+    # A token already refreshed by then is left alone
+    token = replace(token, expires_at=run_at + timedelta(days=60))
+    assert not refresh_module.refresh_token_for_user(user_id, 7, 24, now=run_at)
+    assert len(refreshed) == 1
@@ -135,7 +135,7 @@ def test_get_user_pages_business_manager_fallback(monkeypatch):
             )
         raise AssertionError(f"Unexpected URL: {url}")
 
-    monkeypatch.setattr(oauth_module.requests, "get", fake_get)
+    monkeypatch.setattr(oauth_module.session, "get", fake_get)
 
     pages = oauth_module.get_user_pages("user-token")
 
@@ -174,8 +174,43 @@ def test_get_user_pages_dedupes_bm_owned_pages(monkeypatch):
             )
         raise AssertionError(f"Unexpected URL: {url}")
 
-    monkeypatch.setattr(oauth_module.requests, "get", fake_get)
+    monkeypatch.setattr(oauth_module.session, "get", fake_get)
 
     pages = oauth_module.get_user_pages("user-token")
 
     assert [page["id"] for page in pages] == ["page-1", "page-2"]
+
+
+def test_get_user_pages_follows_paging_cursors(monkeypatch):
+    oauth_module, _ = _reload_oauth_with_env(monkeypatch)
+    calls = []
+
+    def fake_get(url, params=None):
+        calls.append((url, dict(params or {})))
+        if url.endswith("/me/accounts"):
+            return _MockResponse(200, {"data": []})
+        if url.endswith("/me/businesses"):
+            return _MockResponse(200, {"data": [{"id": "biz-1"}]})
+        if url.endswith("/biz-1/owned_pages"):
+            if params.get("after") == "cursor-1":
+                return _MockResponse(200, {"data": [{"id": "page-3"}], "paging": {"cursors": {"after": "cursor-2"}}})
+            return _MockResponse(
+                200,
+                {
+                    "data": [{"id": "page-1"}, {"id": "page-2"}],
+                    "paging": {
+                        "cursors": {"after": "cursor-1"},
+                        "next": "https://graph.example/biz-1/owned_pages?after=cursor-1",
+                    },
+                },
+            )
+        raise AssertionError(f"Unexpected URL: {url}")
+
+    monkeypatch.setattr(oauth_module.session, "get", fake_get)
+
+    pages = oauth_module.get_user_pages("user-token")
+
+    assert [page["id"] for page in pages] == ["page-1", "page-2", "page-3"]
+    owned_calls = [params for url, params in calls if url.endswith("/owned_pages")]
+    assert len(owned_calls) == 2
+    assert all(params["access_token"] == "user-token" for params in owned_calls)
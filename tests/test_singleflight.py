@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bench.graph_simulator import GraphSimulator, SimulatorConfig
+from bench.memory_store import MemoryStore, patched_store
+from src import insights_collector
+from src import instagram_api as instagram_api_module
+from src.config import config
+from src.instagram_api import InstagramAPI
+from src.rate_limiter import RateLimiter
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution_and_its_error():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        started.set()
+        time.sleep(0.2)
+        if value == "boom":
+            raise ValueError(value)
+        return {"value": value}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(flight.do, "k", slow, "a")
+        started.wait()
+        others = [pool.submit(flight.do, "k", slow, "b") for _ in range(3)]
+        results = [f.result() for f in [first, *others]]
+
+    assert calls == ["a"]
+    assert all(r is results[0] for r in results)
+    assert (flight.executed, flight.shared) == (1, 3)
+
+    # Nothing is cached once the call finished
+    assert flight.do("k", lambda: 1) == 1
+
+    started.clear()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        failing = pool.submit(flight.do, "e", slow, "boom")
+        started.wait()
+        joined = pool.submit(flight.do, "e", slow, "other")
+        for future in (failing, joined):
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+
+def test_duplicate_collections_and_graph_calls_are_coalesced(monkeypatch):
+    sim = GraphSimulator(SimulatorConfig(num_accounts=1, latency_ms=100)).start()
+    monkeypatch.setattr(config, "GRAPH_API_BASE_URL", sim.base_url)
+    monkeypatch.setattr(instagram_api_module, "rate_limiter", RateLimiter(1000, 3600))
+    store = MemoryStore()
+    store.seed_accounts(1)
+    try:
+        with patched_store(store, insights_collector):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(
+                    pool.map(
+                        lambda _: insights_collector.collect_insights_for_user(1, "ig-0", "page-token-0"),
+                        range(4),
+                    )
+                )
+            assert all(r["success"] for r in results)
+            assert sim.stats.by_endpoint["insights"] == 1
+            assert len(store.logs) == 1
+
+            # Separate clients (e.g. several Live Insights tabs) share one GET
+            sim.stats.reset()
+            apis = [InstagramAPI("page-token-0", "ig-0") for _ in range(3)]
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                infos = list(pool.map(lambda api: api.get_account_info(), apis))
+            assert {i["username"] for i in infos} == {"synthetic_0"}
+            assert sim.stats.total_requests == 1
+    finally:
+        sim.stop()
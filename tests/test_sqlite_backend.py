@@ -0,0 +1,171 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from src import database
+
+
+def test_user_and_token_round_trip(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    updated = database.create_or_update_user("ig-1", "renamed", "page-2")
+    expires = datetime.now(timezone.utc) + timedelta(days=3)
+
+    database.save_token(user.id, "user", "old-token", expires)
+    database.save_token(user.id, "user", "new-token", expires)
+
+    token = database.get_user_token(user.id, "user")
+    assert updated.id == user.id
+    assert database.get_user_by_id(user.id).instagram_username == "renamed"
+    assert [u.instagram_id for u in database.get_all_users()] == ["ig-1"]
+    assert token.access_token == "new-token"
+    assert token.expires_at == expires
+
+
+def test_get_expiring_tokens_filters_by_threshold(sqlite_db):
+    soon = database.create_or_update_user("ig-soon", "soon", "page-soon")
+    later = database.create_or_update_user("ig-later", "later", "page-later")
+    now = datetime.now(timezone.utc)
+    database.save_token(soon.id, "user", "soon-token", now + timedelta(days=2))
+    database.save_token(later.id, "user", "later-token", now + timedelta(days=30))
+    database.save_token(soon.id, "page", "page-token", None)
+
+    expiring = database.get_expiring_token_records(7)
+
+    assert [(u.instagram_id, t.access_token) for u, t in expiring] == [
+        ("ig-soon", "soon-token")
+    ]
+
+
+def test_insights_and_audience_latest_per_key(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    database.save_insights(
+        user.id,
+        [
+            {"metric_name": "reach", "metric_value": 10.0, "period": "day"},
+            {"metric_name": "impressions", "metric_value": 20.0, "period": "day"},
+        ],
+    )
+    database.save_insights(
+        user.id,
+        [
+            {"metric_name": "reach", "metric_value": 15.0, "period": "day"},
+            {"metric_name": "reach", "metric_value": 300.0, "period": "days_28"},
+        ],
+    )
+    database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": 1})
+    database.save_audience_data(user.id, "follower_demographics_city", {"Seoul": 2})
+
+    insights = database.get_insights(user.id, metric_name="reach")
+    latest = database.get_latest_insights(user.id)
+    audience = database.get_latest_audience_data(user.id)
+
+    assert [i.metric_value for i in insights] == [300.0, 15.0, 10.0]
+    assert latest["reach"].metric_value == 15.0
+    assert latest["impressions"].metric_value == 20.0
+    assert database.get_latest_insights(user.id, "days_28")["reach"].metric_value == 300.0
+    assert audience == {"follower_demographics_city": {"Seoul": 2}}
+    assert database.get_insights(
+        user.id, start_date=datetime.now(timezone.utc) + timedelta(minutes=1)
+    ) == []
+
+
+def test_iter_insight_pages_keyset_covers_ties_without_duplicates(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    # Each batch shares one collected_at, so pages must break ties on id
+    for cycle in range(3):
+        database.save_insights(
+            user.id,
+            [
+                {"metric_name": f"m{m}", "metric_value": float(cycle * 10 + m), "period": "day"}
+                for m in range(7)
+            ],
+        )
+
+    pages = list(database.iter_insight_pages(user.id, page_size=4))
+    ids = [r["id"] for page in pages for r in page]
+    frame = database.get_insights_frame(user.id, page_size=4)
+
+    assert [len(p) for p in pages] == [4, 4, 4, 4, 4, 1]
+    assert len(ids) == len(set(ids)) == 21
+    assert ids == sorted(ids, reverse=True)
+    assert list(frame["id"]) == ids
+    assert str(frame["collected_at"].dt.tz) == "UTC"
+    assert frame["metric_value"].dtype == float
+
+
+def test_fleet_pages_do_not_hold_the_connection(sqlite_db):
+    for i in range(3):
+        user = database.create_or_update_user(f"ig-{i}", f"user{i}", f"page-{i}")
+        database.save_insights(
+            user.id, [{"metric_name": "reach", "metric_value": float(m), "period": "day"} for m in range(5)]
+        )
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+
+    rows = []
+    for page in sqlite_db.iter_fleet_insight_pages(start, ["reach"], page_size=4):
+        rows.extend(page)
+        # Other reads and writes on this thread and others work mid-iteration
+        database.log_collection(1, "insights", "success")
+        thread = threading.Thread(target=database.get_all_users)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+    assert len(rows) == len({r["id"] for r in rows}) == 15
+    assert len(database.get_fleet_insights_frame(start, ["reach"], page_size=4)) == 15
+
+
+def test_columnar_reads_match_model_reads(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    database.save_insights(
+        user.id,
+        [
+            {"metric_name": "reach", "metric_value": 10.0, "period": "day"},
+            {"metric_name": "impressions", "metric_value": 20.0, "period": "day"},
+        ],
+    )
+
+    columns = database.get_insights_columns(user.id)
+    empty = database.get_insights_columns(user.id, metric_name="missing")
+
+    models = database.get_insights(user.id)
+    assert list(columns["id"]) == [i.id for i in models]
+    assert columns["metric_value"].dtype == float
+    assert columns["collected_at"].dtype == "datetime64[ns]"
+    assert len(empty["id"]) == 0
+
+
+def test_record_reads_match_model_reads(sqlite_db):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    expires = datetime.now(timezone.utc) + timedelta(days=2)
+    database.save_token(user.id, "user", "user-token", expires)
+
+    [record] = database.get_all_user_records()
+    token = database.get_user_token_record(user.id, "user")
+    [(expiring_user, expiring_token)] = database.get_expiring_token_records(7)
+
+    model = database.get_user_by_id(user.id)
+    assert (record.id, record.instagram_id, record.facebook_page_id, record.tier) == (
+        model.id,
+        model.instagram_id,
+        model.facebook_page_id,
+        model.tier,
+    )
+    assert token.access_token == "user-token"
+    assert token.expires_at == expires
+    assert expiring_user == record
+    assert expiring_token == token
+    assert not hasattr(record, "__dict__")
+
+
+def test_metric_capabilities_recheck_rejected_metrics(sqlite_db, monkeypatch):
+    user = database.create_or_update_user("ig-1", "first", "page-1")
+    database.save_metric_capabilities(
+        user.id, {("reach", "day"): True, ("profile_views", "day"): False}
+    )
+
+    assert database.get_metric_capabilities(user.id) == {
+        user.id: {("reach", "day"): True, ("profile_views", "day"): False}
+    }
+
+    monkeypatch.setattr(database.config, "METRIC_CAPABILITY_RECHECK_DAYS", -1)
+    assert database.get_metric_capabilities() == {user.id: {("reach", "day"): True}}